@@ -2,6 +2,9 @@ __author__ = 'David'
 
 import asyncio
 import functools
+import io
+
+from yieldfrom.botocore.compat import StopAsyncIteration
 
 def async_test(f):
 
@@ -42,3 +45,45 @@ def future_wrapped(data):
     f.set_result(data)
     return f
 
+
+class AsyncSource(object):
+    """An asynchronous iterator of ``pieces`` of bytes.
+
+    ``produced`` counts the pieces produced so far.
+
+    """
+    def __init__(self, *pieces):
+        self.pieces = list(pieces)
+        self.produced = 0
+
+    @classmethod
+    def split(cls, data, size):
+        """Produces ``data`` in pieces of ``size`` bytes."""
+        return cls(*[data[i:i + size] for i in range(0, len(data), size)])
+
+    def __aiter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __anext__(self):
+        yield from asyncio.sleep(0)
+        if not self.pieces:
+            raise StopAsyncIteration()
+        self.produced += 1
+        return self.pieces.pop(0)
+
+
+class FakeRawStream(object):
+    """The raw stream of a ``StreamingBody``, reading ``data``."""
+
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+        self.closed = False
+
+    @asyncio.coroutine
+    def read(self, amt=None):
+        yield from asyncio.sleep(0)
+        return self._data.read(amt)
+
+    def close(self):
+        self.closed = True
@@ -25,6 +25,7 @@ import yieldfrom.botocore.auth
 import yieldfrom.botocore.credentials
 from yieldfrom.botocore.compat import HTTPHeaders, urlsplit, parse_qs
 from yieldfrom.botocore.awsrequest import AWSRequest
+from yieldfrom.botocore.streaming import AsyncRequestBody
 from yieldfrom.requests.models import Request
 
 
@@ -292,6 +293,28 @@ class TestS3SigV4Auth(BaseTestWithFixedDate):
         self.assertEqual(self.request.headers.get_all('Authorization'),
                          [original_auth])
 
+    def test_async_body_sent_aws_chunked(self):
+        body = AsyncRequestBody(mock.Mock(), 100)
+        self.request.data = body
+        self.request.headers['Content-Encoding'] = 'gzip'
+        self.auth.add_auth(self.request)
+        headers = self.request.headers
+        self.assertEqual(headers['X-Amz-Content-SHA256'],
+                         'STREAMING-AWS4-HMAC-SHA256-PAYLOAD')
+        self.assertEqual(headers['Content-Encoding'], 'aws-chunked,gzip')
+        self.assertEqual(headers['X-Amz-Decoded-Content-Length'], '100')
+        self.assertIn('x-amz-decoded-content-length',
+                      headers['Authorization'])
+        # The chunk signatures chain from the request's signature.
+        signature = headers['Authorization'].split('Signature=')[1]
+        self.assertEqual(body._seed_signature, signature)
+        self.assertEqual(len(body), 100 + 87 + 86)
+
+        # Resigning doesn't encode it twice.
+        self.auth.add_auth(self.request)
+        self.assertEqual(headers.get_all('Content-Encoding'),
+                         ['aws-chunked,gzip'])
+
     def test_signature_is_not_normalized(self):
         request = AWSRequest()
         request.url = 'https://s3.amazonaws.com/bucket/foo/./bar/../bar'
@@ -435,6 +458,61 @@ class TestSigV4Resign(BaseTestWithFixedDate):
                          [original_auth])
 
 
+class TestSigV4SigningKey(BaseTestWithFixedDate):
+    def setUp(self):
+        super(TestSigV4SigningKey, self).setUp()
+        self.credentials = yieldfrom.botocore.credentials.Credentials(
+            access_key='foo', secret_key='bar')
+        self.auth = yieldfrom.botocore.auth.SigV4Auth(
+            self.credentials, 'ec2', 'us-west-2')
+
+    def sign(self, auth=None):
+        request = AWSRequest()
+        request.method = 'GET'
+        request.url = 'https://ec2.amazonaws.com/?Action=DescribeRegions'
+        (auth or self.auth).add_auth(request)
+        return request.headers['Authorization']
+
+    def fresh_signature(self):
+        # The signature of a signer that has no signing key cached yet.
+        return self.sign(yieldfrom.botocore.auth.SigV4Auth(
+            self.credentials, 'ec2', 'us-west-2'))
+
+    def test_signing_key_derived_once_per_day(self):
+        with mock.patch.object(self.auth, '_sign',
+                               wraps=self.auth._sign) as sign:
+            first = self.sign()
+            self.assertEqual(sign.call_count, 5)
+            self.assertEqual(self.sign(), first)
+            # Only the string to sign is signed for the second request.
+            self.assertEqual(sign.call_count, 6)
+        self.assertIn('SignedHeaders=host;x-amz-date,', first)
+
+    def test_signing_key_rotates_with_secret_key(self):
+        self.sign()
+        self.credentials.secret_key = 'rotated'
+        self.assertEqual(self.sign(), self.fresh_signature())
+
+    def test_signing_key_rotates_with_date(self):
+        self.sign()
+        self.datetime_mock.datetime.utcnow.return_value = datetime.datetime(
+            2014, 3, 11, 0, 0, 1, 0)
+        signature = self.sign()
+        self.assertIn('/20140311/us-west-2/ec2/aws4_request', signature)
+        self.assertEqual(signature, self.fresh_signature())
+
+    def test_signed_headers_match_canonical_request(self):
+        request = AWSRequest()
+        request.method = 'GET'
+        request.url = 'https://ec2.amazonaws.com/'
+        request.headers['X-Amz-Meta'] = 'b'
+        headers_to_sign = self.auth.headers_to_sign(request)
+        self.assertEqual(self.auth.signed_headers(headers_to_sign),
+                         'host;x-amz-meta')
+        self.assertEqual(self.auth.canonical_headers(headers_to_sign),
+                         'host:ec2.amazonaws.com\nx-amz-meta:b')
+
+
 class BasePresignTest(unittest.TestCase):
     def get_parsed_query_string(self, request):
         query_string_dict = parse_qs(urlsplit(request.url).query)
@@ -25,12 +25,16 @@ import asyncio
 
 import sys
 sys.path.append('..')
-from asyncio_test_utils import async_test, future_wrapped
+from asyncio_test_utils import async_test, future_wrapped, AsyncSource
 
 from yieldfrom.botocore.exceptions import UnseekableStreamError
 from yieldfrom.botocore.awsrequest import AWSRequest
 from yieldfrom.botocore.awsrequest import AWSHTTPConnection, prepare_request_dict, create_request_object
+from yieldfrom.botocore.awsrequest import AWSHTTPConnectionPool
+from yieldfrom.botocore import awsrequest
 from yieldfrom.botocore.compat import file_type
+from yieldfrom.botocore.streaming import AsyncRequestBody
+from yieldfrom.urllib3.exceptions import EmptyPoolError
 
 os.environ['PYTHONASYNCIODEBUG'] = '1'
 import logging
@@ -45,10 +49,20 @@ class IgnoreCloseBytesIO(io.BytesIO):
 class FakeStreamWriter():
     def __init__(self, parent):
         self._parent = parent
+        # The buffers of every writelines() call, and the data of every
+        # write() call.
+        self.writes = []
+        self.written = []
 
     def write(self, data):
+        self.written.append(data)
         self._parent.sent_data += data
 
+    def writelines(self, buffers):
+        self.writes.append(buffers)
+        for data in buffers:
+            self._parent.sent_data += data
+
     def can_write_eof(self):
         return True
     def write_eof(self):
@@ -335,6 +349,87 @@ class TestAWSHTTPConnection(unittest.TestCase):
         response = yield from conn.getresponse()
         self.assertEqual(response.status, 200)
 
+    @async_test
+    def test_message_body_is_async(self):
+        body = AsyncRequestBody(AsyncSource(b'body ', b'contents'), 13)
+        s = FakeNotSocket(b'HTTP/1.1 200 OK\r\n\r\n')
+        conn = AWSHTTPConnection('s3.amazonaws.com', 443)
+        conn.notSock = s
+        yield from conn.request('PUT', '/bucket/foo', body,
+                                {'Content-Length': str(len(body))})
+        response = yield from conn.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertTrue(s.sent_data.endswith(b'\r\n\r\nbody contents'))
+        body.close()
+
+    @async_test
+    def test_bytes_body_sent_with_headers_uncopied(self):
+        body = b'body contents'
+        s = FakeNotSocket(b'HTTP/1.1 200 OK\r\n\r\n')
+        conn = AWSHTTPConnection('s3.amazonaws.com', 443)
+        conn.notSock = s
+        yield from conn.request('PUT', '/bucket/foo', body)
+        response = yield from conn.getresponse()
+        self.assertEqual(response.status, 200)
+        # The headers and the body are handed over in one call, the body
+        # as a view of the bytes given.
+        self.assertEqual(len(s.writer.writes), 1)
+        header, sent = s.writer.writes[0]
+        self.assertTrue(header.endswith(b'\r\n\r\n'))
+        self.assertIs(sent.obj, body)
+        self.assertTrue(s.sent_data.endswith(b'\r\n\r\nbody contents'))
+
+    @async_test
+    def test_large_body_sent_in_slices(self):
+        body = bytearray(b'0123456789')
+        s = FakeNotSocket(b'HTTP/1.1 200 OK\r\n\r\n')
+        conn = AWSHTTPConnection('s3.amazonaws.com', 443)
+        conn.notSock = s
+        with patch.object(awsrequest, 'SEND_SLICE_SIZE', 4):
+            yield from conn.request('PUT', '/bucket/foo', memoryview(body))
+        # Only the first slice is handed over with the headers, to be
+        # joined with them.  The others are written as they are.
+        self.assertEqual(len(s.writer.writes), 1)
+        header, first = s.writer.writes[0]
+        self.assertTrue(header.endswith(b'\r\n\r\n'))
+        self.assertEqual(bytes(first), b'0123')
+        self.assertEqual([bytes(data) for data in s.writer.written],
+                         [b'4567', b'89'])
+        self.assertTrue(all(isinstance(data, memoryview)
+                            for data in s.writer.written))
+
+    @async_test
+    def test_stream_body_sent_from_its_position(self):
+        body = io.BytesIO(b'skipped body contents')
+        body.seek(8)
+        s = FakeNotSocket(b'HTTP/1.1 200 OK\r\n\r\n')
+        conn = AWSHTTPConnection('s3.amazonaws.com', 443)
+        conn.notSock = s
+        yield from conn.request('PUT', '/bucket/foo', body,
+                                {'Content-Length': '13'})
+        response = yield from conn.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertTrue(s.sent_data.endswith(b'\r\n\r\nbody contents'))
+        # Left at its end, as if it was read, and resizable again once
+        # the transport is done with it.
+        self.assertEqual(body.tell(), 21)
+        del s.writer.writes[:]
+        del s.writer.written[:]
+        body.write(b'!')
+
+    @async_test
+    def test_body_sent_after_100_continue(self):
+        s = FakeNotSocket(
+            b'HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 200 OK\r\n\r\n')
+        conn = AWSHTTPConnection('s3.amazonaws.com', 443)
+        conn.notSock = s
+        yield from conn.request('PUT', '/bucket/foo', io.BytesIO(b'body'),
+                                {'Expect': b'100-continue',
+                                 'Content-Length': '4'})
+        response = yield from conn.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(bytes(s.writer.written[-1]), b'body')
+
     @async_test
     def test_no_expect_header_set(self):
         # Shows the server first sending a 100 continue response
@@ -411,6 +506,79 @@ class TestAWSHTTPConnection(unittest.TestCase):
         self.assertEqual(response.status, 200)
 
 
+class TestAWSHTTPConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.dropped_patch = patch(
+            'yieldfrom.urllib3.connectionpool.is_connection_dropped',
+            return_value=False)
+        self.dropped_patch.start()
+
+    def tearDown(self):
+        self.dropped_patch.stop()
+
+    @async_test
+    def test_idle_connection_closed_after_keepalive_timeout(self):
+        pool = AWSHTTPConnectionPool('localhost', maxsize=1,
+                                     keepalive_timeout=10)
+        conn = Mock()
+        with patch('time.time', return_value=100):
+            yield from pool._get_conn()
+            pool._put_conn(conn)
+        with patch('time.time', return_value=111):
+            reused = yield from pool._get_conn()
+        self.assertIs(reused, conn)
+        self.assertTrue(conn.close.called)
+
+    @async_test
+    def test_recently_used_connection_kept_open(self):
+        pool = AWSHTTPConnectionPool('localhost', maxsize=1,
+                                     keepalive_timeout=10)
+        conn = Mock()
+        with patch('time.time', return_value=100):
+            yield from pool._get_conn()
+            pool._put_conn(conn)
+        with patch('time.time', return_value=105):
+            reused = yield from pool._get_conn()
+        self.assertIs(reused, conn)
+        self.assertFalse(conn.close.called)
+
+    @async_test
+    def test_exhausted_pool_opens_throwaway_connection(self):
+        pool = AWSHTTPConnectionPool('localhost', maxsize=1, block=False)
+        pool._new_conn = Mock(side_effect=lambda: Mock())
+        first = yield from pool._get_conn()
+        extra = yield from asyncio.wait_for(pool._get_conn(), 1)
+        self.assertIsNot(extra, first)
+        self.assertEqual(pool._new_conn.call_count, 2)
+        pool._put_conn(first)
+        pool._put_conn(extra)
+        # The pool is full again, so the extra connection is discarded.
+        self.assertFalse(first.close.called)
+        self.assertTrue(extra.close.called)
+
+    @async_test
+    def test_exhausted_blocking_pool_fails_after_timeout(self):
+        pool = AWSHTTPConnectionPool('localhost', maxsize=1, block=True,
+                                     pool_timeout=0.01)
+        pool._new_conn = Mock(side_effect=lambda: Mock())
+        yield from pool._get_conn()
+        with self.assertRaises(EmptyPoolError):
+            yield from asyncio.wait_for(pool._get_conn(), 1)
+        self.assertEqual(pool._new_conn.call_count, 1)
+
+    @async_test
+    def test_exhausted_blocking_pool_waits_for_release(self):
+        pool = AWSHTTPConnectionPool('localhost', maxsize=1, block=True,
+                                     pool_timeout=1)
+        pool._new_conn = Mock(side_effect=lambda: Mock())
+        conn = yield from pool._get_conn()
+        asyncio.get_event_loop().call_later(0.01, pool._put_conn, conn)
+        reused = yield from pool._get_conn()
+        self.assertIs(reused, conn)
+        self.assertEqual(pool._new_conn.call_count, 1)
+
+
 class TestPrepareRequestDict(unittest.TestCase):
     def setUp(self):
         self.user_agent = 'botocore/1.0'
@@ -110,7 +110,8 @@ class TestAutoGeneratedClient(unittest.TestCase):
     def create_client_creator(self, endpoint_creator=None, event_emitter=None,
                               retry_handler_factory=None,
                               retry_config_translator=None,
-                              response_parser_factory=None):
+                              response_parser_factory=None,
+                              client_class_cache=None):
         if event_emitter is None:
             event_emitter = hooks.HierarchicalEmitter()
         if retry_handler_factory is None:
@@ -123,7 +124,7 @@ class TestAutoGeneratedClient(unittest.TestCase):
         creator = client.ClientCreator(
             self.loader, self.resolver, 'user-agent', event_emitter,
             retry_handler_factory, retry_config_translator,
-            response_parser_factory)
+            response_parser_factory, client_class_cache=client_class_cache)
         return creator
 
     @async_test
@@ -217,6 +218,73 @@ class TestAutoGeneratedClient(unittest.TestCase):
         client_class = yield from creator.create_client_class('myservice')
         self.assertTrue(hasattr(client_class, 'test_operation'))
 
+    @async_test
+    def test_creating_client_class_handler_can_replace_methods(self):
+        def wrap_operation(class_attributes, **kwargs):
+            original = class_attributes['test_operation']
+
+            @asyncio.coroutine
+            def test_operation(self, **kwargs):
+                return ('wrapped', (yield from original(self, **kwargs)))
+            class_attributes['test_operation'] = test_operation
+
+        event_emitter = hooks.HierarchicalEmitter()
+        event_emitter.register('creating-client-class', wrap_operation)
+        creator = self.create_client_creator(event_emitter=event_emitter)
+        service_client = yield from creator.create_client(
+            'myservice', 'us-west-2', credentials=self.credentials)
+        response = yield from service_client.test_operation(
+            Foo='one', Bar='two')
+        self.assertEqual(response[0], 'wrapped')
+
+    @async_test
+    def test_operation_methods_not_shadowed_by_base_classes(self):
+        class Mixin(object):
+            def test_operation(self, **kwargs):
+                return 'from the mixin'
+
+        def add_mixin(base_classes, **kwargs):
+            base_classes.insert(0, Mixin)
+
+        event_emitter = hooks.HierarchicalEmitter()
+        event_emitter.register('creating-client-class', add_mixin)
+        creator = self.create_client_creator(event_emitter=event_emitter)
+        client_class = yield from creator.create_client_class('myservice')
+        self.assertTrue(issubclass(client_class, Mixin))
+        self.assertIn('test_operation', client_class.__dict__)
+
+    @async_test
+    def test_operation_methods_created_on_first_access(self):
+        creator = self.create_client_creator()
+        with mock.patch('yieldfrom.botocore.client._create_api_method',
+                        wraps=client._create_api_method) as create_method:
+            service_client = yield from creator.create_client(
+                'myservice', 'us-west-2', credentials=self.credentials)
+            self.assertFalse(create_method.called)
+            first = service_client.test_operation
+            second = service_client.test_operation
+        create_method.assert_called_once_with('test_operation',
+                                              'TestOperation')
+        self.assertEqual(first, second)
+
+    @async_test
+    def test_operation_methods_listed_in_dir(self):
+        creator = self.create_client_creator()
+        service_client = yield from creator.create_client(
+            'myservice', 'us-west-2', credentials=self.credentials)
+        self.assertIn('test_operation', dir(service_client))
+        self.assertIn('test_operation', dir(type(service_client)))
+        self.assertIn('get_paginator', dir(service_client))
+
+    @async_test
+    def test_unknown_attribute_raises_attribute_error(self):
+        creator = self.create_client_creator()
+        service_client = yield from creator.create_client(
+            'myservice', 'us-west-2', credentials=self.credentials)
+        self.assertFalse(hasattr(service_client, 'not_an_operation'))
+        with self.assertRaises(AttributeError):
+            service_client.not_an_operation
+
     @async_test
     def test_create_client_class_forwards_api_version(self):
         creator = self.create_client_creator()
@@ -226,6 +294,60 @@ class TestAutoGeneratedClient(unittest.TestCase):
         self.loader.load_service_model.assert_called_with(
             'myservice', 'service-2', api_version=specific_api_version)
 
+    @async_test
+    def test_client_class_cached(self):
+        cache = client.ClientClassCache()
+        creator = self.create_client_creator(client_class_cache=cache)
+        first = yield from creator.create_client('myservice', 'us-west-2')
+        second = yield from creator.create_client('myservice', 'us-west-2')
+        self.assertIs(first.__class__, second.__class__)
+        self.assertIs(first.meta.service_model, second.meta.service_model)
+        self.assertEqual(self.loader.load_service_model.call_count, 1)
+
+    @async_test
+    def test_client_class_cache_keyed_by_api_version(self):
+        cache = client.ClientClassCache()
+        creator = self.create_client_creator(client_class_cache=cache)
+        first = yield from creator.create_client('myservice', 'us-west-2')
+        second = yield from creator.create_client(
+            'myservice', 'us-west-2', api_version='2014-01-01')
+        self.assertIsNot(first.__class__, second.__class__)
+
+    @async_test
+    def test_client_class_cache_invalidate(self):
+        cache = client.ClientClassCache()
+        creator = self.create_client_creator(client_class_cache=cache)
+        first = yield from creator.create_client('myservice', 'us-west-2')
+        cache.invalidate('myservice')
+        second = yield from creator.create_client('myservice', 'us-west-2')
+        self.assertIsNot(first.__class__, second.__class__)
+
+    @async_test
+    def test_client_class_cache_keyed_by_data_path(self):
+        cache = client.ClientClassCache()
+        self.loader.search_paths = ['/first/data/path']
+        creator = self.create_client_creator(client_class_cache=cache)
+        first = yield from creator.create_client('myservice', 'us-west-2')
+        self.loader.search_paths = ['/second/data/path']
+        second = yield from creator.create_client('myservice', 'us-west-2')
+        self.assertIsNot(first.__class__, second.__class__)
+        self.loader.search_paths = ['/first/data/path']
+        third = yield from creator.create_client('myservice', 'us-west-2')
+        self.assertIs(first.__class__, third.__class__)
+
+    @async_test
+    def test_cached_client_class_registers_retries_on_new_emitter(self):
+        cache = client.ClientClassCache()
+        creator = self.create_client_creator(client_class_cache=cache)
+        yield from creator.create_client('myservice', 'us-west-2')
+        event_emitter = hooks.HierarchicalEmitter()
+        creator = self.create_client_creator(
+            event_emitter=event_emitter, client_class_cache=cache)
+        yield from creator.create_client('myservice', 'us-west-2')
+        self.assertEqual(
+            len(event_emitter._handlers.prefix_search(
+                'needs-retry.myservice')), 1)
+
     @async_test
     def test_client_uses_region_from_client_config(self):
         client_config = client.Config()
@@ -303,7 +425,8 @@ class TestAutoGeneratedClient(unittest.TestCase):
             'myservice', 'us-west-2', credentials=self.credentials,
             scoped_config={})
         request_signer.assert_called_with(
-            mock.ANY, mock.ANY, mock.ANY, 'v4', mock.ANY, mock.ANY)
+            mock.ANY, mock.ANY, mock.ANY, 'v4', mock.ANY, mock.ANY,
+            payload_hasher=mock.ANY)
 
     @mock.patch('yieldfrom.botocore.client.RequestSigner')
     @async_test
@@ -316,7 +439,8 @@ class TestAutoGeneratedClient(unittest.TestCase):
             'myservice', 'us-west-2', credentials=self.credentials,
             scoped_config=config)
         request_signer.assert_called_with(
-            mock.ANY, mock.ANY, mock.ANY, 'foo', mock.ANY, mock.ANY)
+            mock.ANY, mock.ANY, mock.ANY, 'foo', mock.ANY, mock.ANY,
+            payload_hasher=mock.ANY)
 
     @mock.patch('yieldfrom.botocore.client.RequestSigner')
     def test_client_signature_override_arg(self, request_signer):
@@ -326,7 +450,8 @@ class TestAutoGeneratedClient(unittest.TestCase):
             'myservice', 'us-west-2', credentials=self.credentials,
             client_config=config)
         request_signer.assert_called_with(
-            mock.ANY, mock.ANY, mock.ANY, 'foo', mock.ANY, mock.ANY)
+            mock.ANY, mock.ANY, mock.ANY, 'foo', mock.ANY, mock.ANY,
+            payload_hasher=mock.ANY)
 
     @async_test
     def test_client_method_to_api_mapping(self):
@@ -468,6 +593,61 @@ class TestAutoGeneratedClient(unittest.TestCase):
             # Missing required 'Foo' param.
             yield from service_client.test_operation(Bar='two')
 
+    @async_test
+    def test_client_params_validation_off(self):
+        creator = self.create_client_creator()
+        service_client = yield from creator.create_client(
+            'myservice', 'us-west-2', credentials=self.credentials,
+            client_config=client.Config(parameter_validation='off'))
+        self.assertEqual(service_client.meta.config.parameter_validation,
+                         'off')
+        # Missing required 'Foo' param, left to the service to reject.
+        yield from service_client.test_operation(Bar='two')
+        self.assertTrue(self.endpoint.make_request.called)
+
+    @async_test
+    def test_client_params_validation_type_only(self):
+        creator = self.create_client_creator()
+        service_client = yield from creator.create_client(
+            'myservice', 'us-west-2', credentials=self.credentials,
+            client_config=client.Config(parameter_validation='type-only'))
+        with self.assertRaises(ParamValidationError):
+            yield from service_client.test_operation(Foo=1)
+
+    @async_test
+    def test_client_payload_hashing_config(self):
+        creator = self.create_client_creator()
+        service_client = yield from creator.create_client(
+            'myservice', 'us-west-2', credentials=self.credentials,
+            client_config=client.Config(payload_hashing_threshold=1024,
+                                        payload_hashing_max_workers=2))
+        hasher = service_client._request_signer.payload_hasher
+        self.assertEqual(hasher.threshold, 1024)
+        self.assertEqual(hasher._executor._max_workers, 2)
+        self.assertEqual(
+            service_client.meta.config.payload_hashing_threshold, 1024)
+
+    @async_test
+    def test_clients_share_payload_hashing_pool(self):
+        creator = self.create_client_creator()
+        config = client.Config(payload_hashing_max_workers=3)
+        first = yield from creator.create_client(
+            'myservice', 'us-west-2', credentials=self.credentials,
+            client_config=config)
+        second = yield from creator.create_client(
+            'myservice', 'us-west-2', credentials=self.credentials,
+            client_config=config)
+        self.assertIs(first._request_signer.payload_hasher._executor,
+                      second._request_signer.payload_hasher._executor)
+
+    @async_test
+    def test_invalid_params_validation_level(self):
+        creator = self.create_client_creator()
+        with self.assertRaises(exceptions.InvalidValidationLevelError):
+            yield from creator.create_client(
+                'myservice', 'us-west-2',
+                client_config=client.Config(parameter_validation='some'))
+
     @async_test
     def test_client_with_custom_params(self):
         creator = self.create_client_creator()
@@ -477,7 +657,11 @@ class TestAutoGeneratedClient(unittest.TestCase):
         self.endpoint_creator.create_endpoint.assert_called_with(
             mock.ANY, 'us-west-2', is_secure=False,
             endpoint_url=None, verify=False,
-            response_parser_factory=None)
+            response_parser_factory=None,
+            max_pools=10, max_pool_connections=10,
+            pool_keepalive_timeout=None, pool_block=False,
+            pool_timeout=60, pool_registry=None, max_in_flight_requests=None,
+            operation_concurrency_limits=None)
 
     @async_test
     def test_client_with_endpoint_url(self):
@@ -488,7 +672,11 @@ class TestAutoGeneratedClient(unittest.TestCase):
         self.endpoint_creator.create_endpoint.assert_called_with(
             mock.ANY, 'us-west-2', is_secure=True,
             endpoint_url='http://custom.foo', verify=None,
-            response_parser_factory=None)
+            response_parser_factory=None,
+            max_pools=10, max_pool_connections=10,
+            pool_keepalive_timeout=None, pool_block=False,
+            pool_timeout=60, pool_registry=None, max_in_flight_requests=None,
+            operation_concurrency_limits=None)
 
     @async_test
     def test_client_with_response_parser_factory(self):
@@ -498,7 +686,38 @@ class TestAutoGeneratedClient(unittest.TestCase):
         self.endpoint_creator.create_endpoint.assert_called_with(
             mock.ANY, 'us-west-2', is_secure=True,
             endpoint_url=None, verify=None,
-            response_parser_factory=factory)
+            response_parser_factory=factory,
+            max_pools=10, max_pool_connections=10,
+            pool_keepalive_timeout=None, pool_block=False,
+            pool_timeout=60, pool_registry=None, max_in_flight_requests=None,
+            operation_concurrency_limits=None)
+
+    @async_test
+    def test_client_with_pool_config(self):
+        client_config = client.Config(max_pool_connections=50,
+                                      pool_keepalive_timeout=30,
+                                      pool_block=True, pool_timeout=5)
+        creator = self.create_client_creator()
+        service_client = yield from creator.create_client(
+            'myservice', 'us-west-2', client_config=client_config)
+        self.endpoint_creator.create_endpoint.assert_called_with(
+            mock.ANY, 'us-west-2', is_secure=True,
+            endpoint_url=None, verify=None,
+            response_parser_factory=None,
+            max_pools=10, max_pool_connections=50,
+            pool_keepalive_timeout=30, pool_block=True,
+            pool_timeout=5, pool_registry=None, max_in_flight_requests=None,
+            operation_concurrency_limits=None)
+        self.assertEqual(service_client.meta.config.max_pool_connections, 50)
+
+    @async_test
+    def test_client_with_shared_connection_pools(self):
+        client_config = client.Config(share_connection_pools=True)
+        creator = self.create_client_creator()
+        yield from creator.create_client(
+            'myservice', 'us-west-2', client_config=client_config)
+        kwargs = self.endpoint_creator.create_endpoint.call_args[1]
+        self.assertIs(kwargs['pool_registry'], client.SHARED_POOL_REGISTRY)
 
     @async_test
     def test_operation_cannot_paginate(self):
@@ -690,6 +909,40 @@ class TestAutoGeneratedClient(unittest.TestCase):
         for call in event_emitter.register.call_args_list:
             self.assertNotIn('needs-retry', call[0][0])
 
+    @async_test
+    def test_adaptive_retry_mode_replaces_retry_handler(self):
+        creator = self.create_client_creator()
+        service_client = yield from creator.create_client(
+            'myservice', 'us-west-2',
+            client_config=client.Config(retry_mode='adaptive'))
+        handlers = service_client.meta.events._handlers.prefix_search(
+            'needs-retry.myservice')
+        self.assertEqual(len(handlers), 1)
+        self.assertIsInstance(handlers[0], retryhandler.AdaptiveRetryHandler)
+        self.assertEqual(service_client.meta.config.retry_mode, 'adaptive')
+
+    @async_test
+    def test_adaptive_retry_mode_is_per_client(self):
+        creator = self.create_client_creator()
+        yield from creator.create_client(
+            'myservice', 'us-west-2',
+            client_config=client.Config(retry_mode='adaptive'))
+        service_client = yield from creator.create_client(
+            'myservice', 'us-west-2')
+        handlers = service_client.meta.events._handlers.prefix_search(
+            'needs-retry.myservice')
+        self.assertEqual(len(handlers), 1)
+        self.assertNotIsInstance(handlers[0],
+                                 retryhandler.AdaptiveRetryHandler)
+
+    @async_test
+    def test_invalid_retry_mode(self):
+        creator = self.create_client_creator()
+        with self.assertRaises(exceptions.InvalidRetryModeError):
+            yield from creator.create_client(
+                'myservice', 'us-west-2',
+                client_config=client.Config(retry_mode='bogus'))
+
     @async_test
     def test_try_to_paginate_non_paginated(self):
         self.loader.load_service_model.side_effect = [
@@ -725,6 +978,46 @@ class TestAutoGeneratedClient(unittest.TestCase):
         # but we can at least make sure it looks like a paginator.
         self.assertTrue(hasattr(paginator, 'paginate'))
 
+    @async_test
+    def test_stream_result_items_uses_paginator_result_key(self):
+        pagination_config = {
+            'pagination': {
+                'TestOperation': {
+                    "input_token": "Marker",
+                    "output_token": "Marker",
+                    "more_results": "IsTruncated",
+                    "limit_key": "MaxItems",
+                    "result_key": ["Users", "Groups"]
+                }
+            }
+        }
+        self.loader.load_service_model.side_effect = [
+            self.service_description,
+            pagination_config
+        ]
+        creator = self.create_client_creator()
+        service_client = yield from creator.create_client(
+            'myservice', 'us-west-2', credentials=self.credentials)
+        stream = service_client.stream_result_items(
+            'test_operation', Foo='one', Bar='two')
+        self.assertEqual(stream.result_key, 'Users')
+        self.assertIsNone((yield from stream.next()))
+        kwargs = self.endpoint.make_request.call_args[1]
+        self.assertIs(kwargs['result_stream'], stream)
+        self.assertEqual(stream.result(), {})
+
+    @async_test
+    def test_stream_result_items_non_paginated(self):
+        self.loader.load_service_model.side_effect = [
+            self.service_description,
+            exceptions.DataNotFoundError(data_path='/foo')
+        ]
+        creator = self.create_client_creator()
+        service_client = yield from creator.create_client(
+            'myservice', 'us-west-2')
+        with self.assertRaises(exceptions.OperationNotPageableError):
+            service_client.stream_result_items('test_operation')
+
     @async_test
     def test_can_set_credentials_in_client_init(self):
         creator = self.create_client_creator()
@@ -26,7 +26,14 @@ from yieldfrom.requests import ConnectionError
 
 from yieldfrom.botocore.endpoint import Endpoint, DEFAULT_TIMEOUT
 from yieldfrom.botocore.endpoint import EndpointCreator, PreserveAuthSession
+from yieldfrom.botocore.endpoint import AWSHTTPAdapter, DEFAULT_MAX_POOLS
+from yieldfrom.botocore.endpoint import DEFAULT_MAX_POOL_CONNECTIONS
+from yieldfrom.botocore.endpoint import ConnectionPoolRegistry
+from yieldfrom.botocore.endpoint import ConcurrencyLimiter
 from yieldfrom.botocore.exceptions import EndpointConnectionError, BaseEndpointResolverError
+from yieldfrom.botocore.exceptions import StreamingResultRetryError
+from yieldfrom.botocore.response import ResultItemStream
+from yieldfrom.botocore import model
 from yieldfrom.botocore.awsrequest import AWSRequest
 
 sys.path.append('..')
@@ -140,6 +147,174 @@ class TestEndpointFeatures(TestEndpointBase):
             yield from self.endpoint.make_request(self.op, request_dict())
 
 
+class TestEndpointConnectionPool(unittest.TestCase):
+
+    def test_default_pool_settings(self):
+        endpoint = Endpoint('https://ec2.us-west-2.amazonaws.com/',
+                            endpoint_prefix='ec2', event_emitter=Mock())
+        adapter = endpoint.http_session.get_adapter(endpoint.host)
+        self.assertIsInstance(adapter, AWSHTTPAdapter)
+        self.assertEqual(adapter._pool_connections, DEFAULT_MAX_POOLS)
+        self.assertEqual(adapter._pool_maxsize, DEFAULT_MAX_POOL_CONNECTIONS)
+        self.assertFalse(adapter._pool_block)
+
+    def test_pool_settings_passed_to_connection_pools(self):
+        endpoint = Endpoint('https://ec2.us-west-2.amazonaws.com/',
+                            endpoint_prefix='ec2', event_emitter=Mock(),
+                            max_pools=2, max_pool_connections=50,
+                            pool_keepalive_timeout=30, pool_block=True,
+                            pool_timeout=5)
+        adapter = endpoint.http_session.get_adapter(endpoint.host)
+        pool = adapter.poolmanager.connection_from_url(endpoint.host)
+        self.assertEqual(adapter.poolmanager.pools._maxsize, 2)
+        self.assertEqual(pool.pool.maxsize, 50)
+        self.assertTrue(pool.block)
+        self.assertEqual(pool.keepalive_timeout, 30)
+        self.assertEqual(pool.pool_timeout, 5)
+
+
+class TestConnectionPoolRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = ConnectionPoolRegistry()
+
+    def create_endpoint(self, host='https://ec2.us-west-2.amazonaws.com/',
+                        **kwargs):
+        return Endpoint(host, endpoint_prefix='ec2', event_emitter=Mock(),
+                        pool_registry=self.registry, **kwargs)
+
+    def get_adapter(self, endpoint):
+        return endpoint.http_session.get_adapter(endpoint.host)
+
+    def test_endpoints_for_same_host_share_adapter(self):
+        first = self.create_endpoint()
+        second = self.create_endpoint()
+        self.assertIsNot(first.http_session, second.http_session)
+        self.assertIs(self.get_adapter(first), self.get_adapter(second))
+
+    def test_explicit_default_port_shares_adapter(self):
+        first = self.create_endpoint('https://ec2.us-west-2.amazonaws.com/')
+        second = self.create_endpoint(
+            'https://ec2.us-west-2.amazonaws.com:443/')
+        self.assertIs(self.get_adapter(first), self.get_adapter(second))
+
+    def test_different_hosts_do_not_share_adapter(self):
+        first = self.create_endpoint('https://ec2.us-west-2.amazonaws.com/')
+        second = self.create_endpoint('https://ec2.us-east-1.amazonaws.com/')
+        self.assertIsNot(self.get_adapter(first), self.get_adapter(second))
+
+    def test_different_tls_settings_do_not_share_adapter(self):
+        first = self.create_endpoint(verify=True)
+        second = self.create_endpoint(verify=False)
+        self.assertIsNot(self.get_adapter(first), self.get_adapter(second))
+
+    def test_different_pool_settings_do_not_share_adapter(self):
+        first = self.create_endpoint()
+        second = self.create_endpoint(max_pool_connections=50)
+        self.assertIsNot(self.get_adapter(first), self.get_adapter(second))
+
+    def test_clear_closes_adapters(self):
+        endpoint = self.create_endpoint()
+        adapter = self.get_adapter(endpoint)
+        with patch.object(adapter, 'close') as close:
+            self.registry.clear()
+        self.assertTrue(close.called)
+        self.assertIsNot(self.get_adapter(self.create_endpoint()), adapter)
+
+
+class TestConcurrencyLimiter(unittest.TestCase):
+
+    @async_test
+    def test_requests_under_limit_start_immediately(self):
+        limiter = ConcurrencyLimiter(max_in_flight=2)
+        yield from limiter.acquire('PutItem')
+        yield from limiter.acquire('PutItem')
+        self.assertEqual(limiter.in_flight, 2)
+        self.assertEqual(limiter.queue_depth, 0)
+
+    @async_test
+    def test_requests_over_limit_wait_in_fifo_order(self):
+        limiter = ConcurrencyLimiter(max_in_flight=1)
+        started = []
+
+        @asyncio.coroutine
+        def request(name):
+            yield from limiter.acquire('PutItem')
+            started.append(name)
+
+        yield from limiter.acquire('PutItem')
+        tasks = [asyncio.Task(request(name)) for name in 'abc']
+        yield from asyncio.sleep(0)
+        self.assertEqual(limiter.queue_depth, 3)
+        self.assertEqual(started, [])
+        for _ in range(3):
+            limiter.release('PutItem')
+            yield from asyncio.sleep(0)
+        yield from asyncio.wait(tasks)
+        self.assertEqual(started, ['a', 'b', 'c'])
+        self.assertEqual(limiter.in_flight, 1)
+        self.assertEqual(limiter.total_queued, 3)
+
+    @async_test
+    def test_operation_limit_does_not_block_other_operations(self):
+        limiter = ConcurrencyLimiter(max_in_flight=10,
+                                     operation_limits={'PutItem': 1})
+        yield from limiter.acquire('PutItem')
+        blocked = asyncio.Task(limiter.acquire('PutItem'))
+        yield from asyncio.sleep(0)
+        yield from limiter.acquire('GetItem')
+        self.assertFalse(blocked.done())
+        self.assertEqual(limiter.operation_in_flight('PutItem'), 1)
+        self.assertEqual(limiter.operation_in_flight('GetItem'), 1)
+        limiter.release('PutItem')
+        yield from blocked
+        self.assertEqual(limiter.operation_in_flight('PutItem'), 1)
+
+    @async_test
+    def test_cancelled_waiter_leaves_queue(self):
+        limiter = ConcurrencyLimiter(max_in_flight=1)
+        yield from limiter.acquire('PutItem')
+        waiter = asyncio.Task(limiter.acquire('PutItem'))
+        yield from asyncio.sleep(0)
+        waiter.cancel()
+        yield from asyncio.sleep(0)
+        self.assertEqual(limiter.queue_depth, 0)
+        limiter.release('PutItem')
+        self.assertEqual(limiter.in_flight, 0)
+
+
+class TestEndpointConcurrencyLimit(TestEndpointBase):
+
+    @async_test
+    def test_no_limiter_by_default(self):
+        self.assertIsNone(self.endpoint.limiter)
+
+    @async_test
+    def test_make_request_releases_slot(self):
+        self.endpoint.limiter = ConcurrencyLimiter(max_in_flight=1)
+        self.op.name = 'DescribeInstances'
+        yield from self.endpoint.make_request(self.op, request_dict())
+        self.assertEqual(self.endpoint.limiter.in_flight, 0)
+
+    @async_test
+    def test_make_request_releases_slot_on_error(self):
+        self.endpoint.limiter = ConcurrencyLimiter(max_in_flight=1)
+        self.op.name = 'DescribeInstances'
+        self.http_session.send.side_effect = ValueError()
+        with self.assertRaises(ValueError):
+            yield from self.endpoint.make_request(self.op, request_dict())
+        self.assertEqual(self.endpoint.limiter.in_flight, 0)
+
+    def test_limiter_created_from_settings(self):
+        endpoint = Endpoint('https://ec2.us-west-2.amazonaws.com/',
+                            endpoint_prefix='ec2', event_emitter=Mock(),
+                            max_in_flight_requests=5,
+                            operation_concurrency_limits={'RunInstances': 1})
+        self.assertEqual(endpoint.limiter.max_in_flight, 5)
+        self.assertEqual(endpoint.limiter.operation_limits,
+                         {'RunInstances': 1})
+
+
 class TestRetryInterface(TestEndpointBase):
     def setUp(self):
         super(TestRetryInterface, self).setUp()
@@ -237,6 +412,72 @@ class TestRetryInterface(TestEndpointBase):
                          'needs-retry.ec2.DescribeInstances')
 
 
+class TestEndpointIncrementalParsing(unittest.TestCase):
+
+    def setUp(self):
+        self.op = Mock()
+        self.op.name = 'ListThings'
+        self.op.has_streaming_output = False
+        self.op.metadata = {'protocol': 'rest-xml'}
+        self.op.output_shape = model.StructureShape('OutputShape', {
+            'type': 'structure',
+            'members': {
+                'Things': {'shape': 'ThingList'},
+                'Marker': {'shape': 'StringType'},
+            },
+        }, model.ShapeResolver({
+            'StringType': {'type': 'string'},
+            'ThingList': {'type': 'list', 'flattened': True,
+                          'member': {'shape': 'StringType'}},
+        }))
+        self.needs_retry = []
+        self.event_emitter = Mock()
+        self.event_emitter.emit.side_effect = self.emit
+        self.endpoint = Endpoint(
+            'https://example.amazonaws.com/', endpoint_prefix='example',
+            event_emitter=self.event_emitter)
+        self.http_session = Mock()
+        self.http_session.send.side_effect = self.send
+        self.endpoint.http_session = self.http_session
+
+    def emit(self, event_name, **kwargs):
+        if event_name.startswith('needs-retry') and self.needs_retry:
+            return future_wrapped([(None, self.needs_retry.pop(0))])
+        return future_wrapped([])
+
+    def send(self, *args, **kwargs):
+        body = (b'<Result><Things>a</Things><Things>b</Things>'
+                b'<Marker>m</Marker></Result>')
+        chunks = [body[:30], body[30:], b'']
+        raw = Mock()
+        raw.read.side_effect = lambda *args, **kwargs: future_wrapped(
+            chunks.pop(0))
+        return future_wrapped(Mock(
+            status_code=200, raw=raw,
+            headers={'content-length': str(len(body))}))
+
+    @async_test
+    def test_items_put_on_result_stream(self):
+        stream = ResultItemStream('Things')
+        http, parsed = yield from self.endpoint.make_request(
+            self.op, request_dict(), result_stream=stream)
+        self.assertTrue(self.http_session.send.call_args[1]['stream'])
+        self.assertEqual(stream.item_count, 2)
+        self.assertEqual((yield from stream.next()), 'a')
+        self.assertEqual((yield from stream.next()), 'b')
+        self.assertEqual(parsed['Marker'], 'm')
+        self.assertNotIn('Things', parsed)
+        self.assertIsInstance(http.body_crc32, int)
+
+    @async_test
+    def test_no_retry_once_items_produced(self):
+        self.needs_retry = [0]
+        stream = ResultItemStream('Things')
+        with self.assertRaises(StreamingResultRetryError):
+            yield from self.endpoint.make_request(
+                self.op, request_dict(), result_stream=stream)
+
+
 class TestS3ResetStreamOnRetry(TestEndpointBase):
     def setUp(self):
         super(TestS3ResetStreamOnRetry, self).setUp()
@@ -339,6 +580,14 @@ class TestEndpointCreator(unittest.TestCase):
         # /path/cacerts.pem wins over the value from the env var.
         self.assertEqual(endpoint.verify, '/path/cacerts.pem')
 
+    def test_pool_settings_passed_to_endpoint(self):
+        endpoint = self.creator.create_endpoint(
+            self.service_model, 'us-west-2', max_pool_connections=50,
+            pool_keepalive_timeout=30)
+        self.assertEqual(endpoint.max_pool_connections, 50)
+        self.assertEqual(endpoint.pool_keepalive_timeout, 30)
+        self.assertEqual(endpoint.max_pools, DEFAULT_MAX_POOLS)
+
 class TestAWSSession(unittest.TestCase):
     def test_auth_header_preserved_from_s3_redirects(self):
         request = AWSRequest()
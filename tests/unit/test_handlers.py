@@ -19,6 +19,7 @@ import logging
 import sys, os
 import io
 import base64
+import hashlib
 import mock
 import copy
 import unittest
@@ -32,10 +33,13 @@ from yieldfrom.botocore.model import OperationModel, ServiceModel
 from yieldfrom.botocore import handlers
 from yieldfrom.botocore.credentials import Credentials
 from yieldfrom.botocore.signers import RequestSigner
+from yieldfrom.botocore.exceptions import ParamValidationError
+from yieldfrom.botocore.streaming import AsyncRequestBody
+from yieldfrom.botocore.utils import PayloadHasher
 #from yieldfrom.botocore.hooks import first_non_none_response
 
 sys.path.extend(['..', '../..'])
-from asyncio_test_utils import async_test, future_wrapped
+from asyncio_test_utils import async_test, future_wrapped, AsyncSource
 from tests import BaseSessionTest
 
 
@@ -216,6 +220,34 @@ class TestHandlers(BaseSessionTest):
         self.assertEqual(params['SSECustomerKeyMD5'],
                          'N7UdGUp1E+RbVvZSTy1R8g==')
 
+    @async_test
+    def test_async_body_converted(self):
+        body = AsyncSource()
+        for op in ('PutObject', 'UploadPart'):
+            event = 'before-parameter-build.s3.%s' % op
+            params = {'Body': body, 'ContentLength': 10}
+            yield from self.session.emit(event, params=params,
+                                         model=mock.Mock())
+            self.assertIsInstance(params['Body'], AsyncRequestBody)
+            self.assertEqual(params['Body'].content_length, 10)
+            self.assertNotIn('ContentLength', params)
+            params['Body'].close()
+
+    @async_test
+    def test_async_body_needs_content_length(self):
+        params = {'Body': AsyncSource()}
+        with self.assertRaises(ParamValidationError):
+            yield from self.session.emit(
+                'before-parameter-build.s3.PutObject', params=params,
+                model=mock.Mock())
+
+    @async_test
+    def test_sync_body_not_converted(self):
+        params = {'Body': b'foo', 'ContentLength': 3}
+        yield from self.session.emit('before-parameter-build.s3.PutObject',
+                                     params=params, model=mock.Mock())
+        self.assertEqual(params, {'Body': b'foo', 'ContentLength': 3})
+
     @async_test
     def test_route53_resource_id(self):
         event = 'before-parameter-build.route53.GetHostedZone'
@@ -439,6 +471,21 @@ class TestHandlers(BaseSessionTest):
         # And verify that the body can still be read.
         self.assertEqual(request_dict['body'].read(), b'hello world')
 
+    def test_glacier_checksums_read_body_once(self):
+        body = io.BytesIO(b'a' * (3 * 1024 * 1024))
+        request_dict = {'headers': {}, 'body': body}
+        with mock.patch.object(body, 'read', wraps=body.read) as read:
+            handlers.add_glacier_checksums(request_dict)
+        # Three 1MB chunks and the empty read at the end.
+        self.assertEqual(read.call_count, 4)
+        self.assertEqual(
+            request_dict['headers']['x-amz-content-sha256'],
+            '6f850bc94ae6f7de14297c01616c36d712d22864497b28a63b81d776b035e656')
+        self.assertEqual(
+            request_dict['headers']['x-amz-sha256-tree-hash'],
+            '70239f4f2ead7561f69d48b956b547edef52a1280a93c262c0b582190be7db17')
+        self.assertEqual(body.tell(), 0)
+
     def test_tree_hash_added_only_if_not_exists(self):
         request_dict = {
             'headers': {
@@ -461,6 +508,43 @@ class TestHandlers(BaseSessionTest):
         self.assertEqual(request_dict['headers']['x-amz-content-sha256'],
                          'pre-exists')
 
+    @async_test
+    def test_glacier_checksums_of_large_body_hashed_off_loop(self):
+        request_dict = {
+            'headers': {},
+            'body': io.BytesIO(b'hello world'),
+        }
+        hasher = PayloadHasher(threshold=4)
+        with mock.patch.object(hasher, 'run', wraps=hasher.run) as run:
+            coro = handlers.add_glacier_checksums(
+                request_dict, payload_hasher=hasher)
+            self.assertEqual(request_dict['headers'], {})
+            yield from coro
+        self.assertTrue(run.called)
+        self.assertEqual(
+            request_dict['headers']['x-amz-sha256-tree-hash'],
+            'b94d27b9934d3e08a52e52d7da7dabfac484efe37a5380ee9088f7ace2efcde9')
+        self.assertEqual(request_dict['body'].read(), b'hello world')
+
+    def test_glacier_checksums_of_small_body_hashed_in_place(self):
+        request_dict = {
+            'headers': {},
+            'body': io.BytesIO(b'hello world'),
+        }
+        result = handlers.add_glacier_checksums(
+            request_dict, payload_hasher=PayloadHasher(threshold=1024))
+        self.assertIsNone(result)
+        self.assertIn('x-amz-content-sha256', request_dict['headers'])
+
+    @async_test
+    def test_md5_of_large_body_calculated_off_loop(self):
+        request_dict = {'headers': {}, 'body': '<Delete/>'}
+        yield from handlers.calculate_md5(
+            request_dict, payload_hasher=PayloadHasher(threshold=4))
+        self.assertEqual(request_dict['headers']['Content-MD5'],
+                         base64.b64encode(hashlib.md5(
+                             b'<Delete/>').digest()).decode('utf-8'))
+
     def test_glacier_checksums_support_raw_bytes(self):
         request_dict = {
             'headers': {},
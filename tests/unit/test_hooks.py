@@ -23,6 +23,7 @@ import unittest
 import logging
 from functools import partial
 from yieldfrom.botocore.hooks import HierarchicalEmitter, first_non_none_response
+from yieldfrom.botocore.hooks import EventNameCache
 
 sys.path.append('..')
 from asyncio_test_utils import async_test, future_wrapped
@@ -77,6 +78,69 @@ class TestHierarchicalEventEmitter(unittest.TestCase):
         self.assertEqual(calls, ['foo.bar.baz', 'foo.bar', 'foo'])
 
 
+class TestDispatchPlan(unittest.TestCase):
+    def setUp(self):
+        self.emitter = HierarchicalEmitter()
+        self.hook_calls = []
+
+    def hook(self, **kwargs):
+        self.hook_calls.append(kwargs)
+
+    @asyncio.coroutine
+    def coroutine_hook(self, **kwargs):
+        yield from asyncio.sleep(0)
+        self.hook_calls.append(kwargs)
+        return 'async'
+
+    def test_has_handlers(self):
+        self.assertFalse(self.emitter.has_handlers('foo.bar'))
+        self.emitter.register('foo', self.hook)
+        self.assertTrue(self.emitter.has_handlers('foo.bar'))
+        self.assertFalse(self.emitter.has_handlers('other.bar'))
+
+    @async_test
+    def test_plan_invalidated_on_register(self):
+        yield from self.emitter.emit('foo.bar')
+        self.emitter.register('foo.bar', self.hook)
+        yield from self.emitter.emit('foo.bar')
+        self.assertEqual(len(self.hook_calls), 1)
+
+    @async_test
+    def test_plan_invalidated_on_unregister(self):
+        self.emitter.register('foo.bar', self.hook)
+        yield from self.emitter.emit('foo.bar')
+        self.emitter.unregister('foo.bar', self.hook)
+        self.assertFalse(self.emitter.has_handlers('foo.bar'))
+        yield from self.emitter.emit('foo.bar')
+        self.assertEqual(len(self.hook_calls), 1)
+
+    @async_test
+    def test_sync_and_coroutine_handlers(self):
+        self.emitter.register('foo', self.hook)
+        self.emitter.register('foo', self.coroutine_hook)
+        responses = yield from self.emitter.emit('foo')
+        self.assertEqual([r[1] for r in responses], [None, 'async'])
+        self.assertEqual(len(self.hook_calls), 2)
+
+    @async_test
+    def test_plain_callable_returning_coroutine(self):
+        self.emitter.register('foo', partial(self.coroutine_hook))
+        responses = yield from self.emitter.emit('foo')
+        self.assertEqual(responses[0][1], 'async')
+
+
+class TestEventNameCache(unittest.TestCase):
+    def test_formats_event_name(self):
+        names = EventNameCache('s3')
+        self.assertEqual(names.get('before-call', 'ListObjects'),
+                         'before-call.s3.ListObjects')
+
+    def test_names_are_reused(self):
+        names = EventNameCache('s3')
+        first = names.get('before-call', 'ListObjects')
+        self.assertIs(names.get('before-call', 'ListObjects'), first)
+
+
 class TestStopProcessing(unittest.TestCase):
     def setUp(self):
         self.emitter = HierarchicalEmitter()
@@ -603,6 +667,40 @@ class TestWildcardHandlers(unittest.TestCase):
         self.assertEqual((yield from copied.emit_until_response(
             'a.b', b='return-val'))[1], 'return-val')
 
+    def test_copy_shares_handler_trie(self):
+        self.emitter.register('foo.bar', self.hook)
+        copied = copy.copy(self.emitter)
+        self.assertIs(copied._handlers._root, self.emitter._handlers._root)
+
+    @async_test
+    def test_copy_on_write_isolates_both_emitters(self):
+        first = []
+        second = []
+        third = []
+        self.emitter.register('foo.bar', lambda **kwargs: first.append(1))
+        copied = copy.copy(self.emitter)
+        copied.register('foo.bar', lambda **kwargs: second.append(1))
+        self.emitter.register('foo.bar', lambda **kwargs: third.append(1))
+
+        yield from copied.emit('foo.bar')
+        self.assertEqual((first, second, third), ([1], [1], []))
+        yield from self.emitter.emit('foo.bar')
+        self.assertEqual((first, second, third), ([1, 1], [1], [1]))
+
+    @async_test
+    def test_unregister_on_copy_does_not_affect_original(self):
+        calls = []
+
+        def handler(**kwargs):
+            calls.append(kwargs['event_name'])
+
+        self.emitter.register('foo.bar.baz', handler)
+        copied = copy.copy(self.emitter)
+        copied.unregister('foo.bar.baz', handler)
+        yield from copied.emit('foo.bar.baz')
+        yield from self.emitter.emit('foo.bar.baz')
+        self.assertEqual(calls, ['foo.bar.baz'])
+
 
 if __name__ == '__main__':
     unittest.main()
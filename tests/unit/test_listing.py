@@ -0,0 +1,170 @@
+# Copyright 2015 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+import asyncio
+import sys
+import unittest
+
+import mock
+
+from yieldfrom.botocore.paginate import Paginator
+from yieldfrom.botocore.listing import PrefixPartitionedLister
+
+sys.path.append('..')
+from asyncio_test_utils import async_test
+
+
+LIST_OBJECTS_PAGINATION = {
+    'more_results': 'IsTruncated',
+    'limit_key': 'MaxKeys',
+    'output_token': 'NextMarker || Contents[-1].Key',
+    'input_token': 'Marker',
+    'result_key': ['Contents', 'CommonPrefixes'],
+}
+
+
+class FakeBucket(object):
+    """Answers ListObjects calls from a list of keys, like S3 would."""
+
+    def __init__(self, keys, max_keys=2):
+        self.keys = sorted(keys)
+        self.max_keys = max_keys
+        self.calls = []
+        self.fail_prefix = None
+
+    @asyncio.coroutine
+    def list_objects(self, Bucket, Prefix='', Delimiter=None, Marker='',
+                     MaxKeys=None):
+        self.calls.append((Prefix, Delimiter, Marker))
+        # Let other partitions run in between pages.
+        yield from asyncio.sleep(0)
+        if self.fail_prefix is not None and Prefix == self.fail_prefix:
+            raise RuntimeError("listing %s failed" % Prefix)
+        max_keys = MaxKeys or self.max_keys
+        contents = []
+        prefixes = []
+        last = None
+        for key in self.keys:
+            if not key.startswith(Prefix) or key <= Marker:
+                continue
+            if Delimiter and Marker.endswith(Delimiter) and \
+                    key.startswith(Marker):
+                continue
+            rest = key[len(Prefix):]
+            if Delimiter and Delimiter in rest:
+                common = Prefix + rest[:rest.index(Delimiter) + 1]
+                if prefixes and prefixes[-1]['Prefix'] == common:
+                    continue
+                entry = common
+            else:
+                entry = key
+            if len(contents) + len(prefixes) == max_keys:
+                response = {'Contents': contents, 'CommonPrefixes': prefixes,
+                            'IsTruncated': True}
+                if Delimiter:
+                    response['NextMarker'] = last
+                return response
+            if entry is key:
+                contents.append({'Key': key})
+            else:
+                prefixes.append({'Prefix': common})
+            last = entry
+        return {'Contents': contents, 'CommonPrefixes': prefixes,
+                'IsTruncated': False}
+
+
+@asyncio.coroutine
+def list_all(lister):
+    keys = []
+    obj = yield from lister.next()
+    while obj is not None:
+        keys.append(obj['Key'])
+        obj = yield from lister.next()
+    return keys
+
+
+class TestPrefixPartitionedLister(unittest.TestCase):
+    def setUp(self):
+        self.bucket = FakeBucket([
+            'a.txt', 'a/1', 'a/2', 'a/3', 'b/1', 'b/2/x', 'c', 'd/1',
+            'e/1', 'e/2', 'e/3', 'e/4', 'f',
+        ])
+        self.client = mock.Mock()
+        self.client.get_paginator.side_effect = self.get_paginator
+
+    def get_paginator(self, operation_name):
+        self.assertEqual(operation_name, 'list_objects')
+        return Paginator(self.bucket.list_objects, LIST_OBJECTS_PAGINATION)
+
+    @async_test
+    def test_lexicographic_order_matches_sequential_listing(self):
+        lister = PrefixPartitionedLister(self.client, 'bucket',
+                                         max_concurrency=2)
+        keys = yield from list_all(lister)
+        self.assertEqual(keys, self.bucket.keys)
+        self.assertEqual(lister.partitions, ['a/', 'b/', 'd/', 'e/'])
+
+    @async_test
+    def test_arrival_order_lists_every_key(self):
+        lister = PrefixPartitionedLister(self.client, 'bucket',
+                                         max_concurrency=3, order='arrival')
+        keys = yield from list_all(lister)
+        self.assertEqual(sorted(keys), self.bucket.keys)
+        self.assertEqual(len(keys), len(self.bucket.keys))
+
+    @async_test
+    def test_one_paginator_per_prefix(self):
+        lister = PrefixPartitionedLister(self.client, 'bucket')
+        yield from list_all(lister)
+        partition_prefixes = set(
+            prefix for prefix, delimiter, _ in self.bucket.calls
+            if delimiter is None)
+        self.assertEqual(partition_prefixes, set(['a/', 'b/', 'd/', 'e/']))
+
+    @async_test
+    def test_partitions_listed_concurrently(self):
+        lister = PrefixPartitionedLister(self.client, 'bucket',
+                                         max_concurrency=4)
+        first = yield from lister.next()
+        self.assertEqual(first['Key'], 'a.txt')
+        for _ in range(20):
+            yield from asyncio.sleep(0)
+        # Every partition has started listing before the consumer got
+        # past the first one.
+        started = [prefix for prefix, delimiter, _ in self.bucket.calls
+                   if delimiter is None]
+        self.assertEqual(sorted(set(started)), ['a/', 'b/', 'd/', 'e/'])
+        keys = yield from list_all(lister)
+        self.assertEqual(keys, self.bucket.keys[1:])
+
+    @async_test
+    def test_listing_under_prefix(self):
+        lister = PrefixPartitionedLister(self.client, 'bucket', prefix='b/')
+        keys = yield from list_all(lister)
+        self.assertEqual(keys, ['b/1', 'b/2/x'])
+        self.assertEqual(lister.partitions, ['b/2/'])
+
+    @async_test
+    def test_partition_error_is_raised(self):
+        self.bucket.fail_prefix = 'd/'
+        lister = PrefixPartitionedLister(self.client, 'bucket')
+        with self.assertRaises(RuntimeError):
+            yield from list_all(lister)
+        yield from asyncio.sleep(0)
+
+    def test_invalid_order(self):
+        with self.assertRaises(ValueError):
+            PrefixPartitionedLister(self.client, 'bucket', order='random')
+
+
+if __name__ == '__main__':
+    unittest.main()
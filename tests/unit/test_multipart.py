@@ -0,0 +1,591 @@
+# Copyright 2015 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+import asyncio
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import mock
+
+from yieldfrom.botocore import multipart
+from yieldfrom.botocore.exceptions import IncompleteReadError
+from yieldfrom.botocore.exceptions import RangeMismatchError
+from yieldfrom.botocore.multipart import GlacierMultipartUploader
+from yieldfrom.botocore.multipart import MappedPart
+from yieldfrom.botocore.multipart import PartReader
+from yieldfrom.botocore.multipart import PartWriter
+from yieldfrom.botocore.multipart import S3RangedDownloader
+from yieldfrom.botocore.multipart import S3MultipartUploader
+from yieldfrom.botocore.multipart import glacier_part_size
+from yieldfrom.botocore.multipart import s3_part_size
+from yieldfrom.botocore.response import StreamingBody
+from yieldfrom.botocore.utils import calculate_tree_hash
+
+sys.path.append('..')
+from asyncio_test_utils import async_test, FakeRawStream
+
+
+MB = 1024 * 1024
+
+
+class FakeVault(object):
+    """Answers Glacier multipart upload calls, like a vault would."""
+
+    def __init__(self):
+        self.parts = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failures = {}
+        self.aborted = []
+        self.completed = None
+
+    @asyncio.coroutine
+    def initiate_multipart_upload(self, accountId, vaultName, partSize,
+                                  archiveDescription=None):
+        self.part_size = int(partSize)
+        self.description = archiveDescription
+        return {'uploadId': 'upload-id', 'location': '/-/vaults/x/upload-id'}
+
+    @asyncio.coroutine
+    def upload_multipart_part(self, accountId, vaultName, uploadId, range,
+                              checksum, body):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Take long enough for the other parts to be read and start.
+            yield from asyncio.sleep(0.05)
+            if self.failures.get(range):
+                self.failures[range] -= 1
+                raise RuntimeError("upload of %s failed" % range)
+            if calculate_tree_hash(io.BytesIO(body)) != checksum:
+                raise RuntimeError("tree hash mismatch for %s" % range)
+            self.parts[range] = body
+            return {'checksum': checksum}
+        finally:
+            self.in_flight -= 1
+
+    @asyncio.coroutine
+    def complete_multipart_upload(self, accountId, vaultName, uploadId,
+                                  archiveSize, checksum):
+        self.completed = (int(archiveSize), checksum)
+        return {'archiveId': 'archive-id', 'checksum': checksum}
+
+    @asyncio.coroutine
+    def abort_multipart_upload(self, accountId, vaultName, uploadId):
+        self.aborted.append(uploadId)
+
+    def archive(self):
+        def start(content_range):
+            return int(content_range.split()[1].split('-')[0])
+        return b''.join(self.parts[r] for r in sorted(self.parts, key=start))
+
+
+class FakeS3(object):
+    """Answers S3 multipart upload calls, like a bucket would."""
+
+    def __init__(self):
+        self.parts = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failures = {}
+        self.aborted = []
+        self.completed = None
+
+    @asyncio.coroutine
+    def create_multipart_upload(self, **kwargs):
+        self.created = kwargs
+        return {'Bucket': kwargs['Bucket'], 'Key': kwargs['Key'],
+                'UploadId': 'upload-id'}
+
+    @asyncio.coroutine
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body,
+                    **kwargs):
+        self.part_kwargs = kwargs
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            # Read some of the part, then fail or take long enough for
+            # the other parts to start.
+            data = Body.read(1024)
+            yield from asyncio.sleep(0.05)
+            if self.failures.get(PartNumber):
+                self.failures[PartNumber] -= 1
+                raise RuntimeError("upload of part %s failed" % PartNumber)
+            self.parts[PartNumber] = data + Body.read()
+            return {'ETag': '"etag-%s"' % PartNumber}
+        finally:
+            self.in_flight -= 1
+
+    @asyncio.coroutine
+    def complete_multipart_upload(self, Bucket, Key, UploadId,
+                                  MultipartUpload, **kwargs):
+        self.completed = MultipartUpload['Parts']
+        return {'ETag': '"etag"', 'Key': Key}
+
+    @asyncio.coroutine
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        self.aborted.append(UploadId)
+
+    def object(self):
+        return b''.join(self.parts[number] for number in sorted(self.parts))
+
+
+class FakeObject(object):
+    """Answers HeadObject and ranged GetObject calls for one object."""
+
+    def __init__(self, data):
+        self.data = data
+        self.ranges = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # The number of times to cut each range short, by its start.
+        self.truncations = {}
+        # The bytes appended to each range, by its start.
+        self.overruns = {}
+        self.ignore_range = False
+        self.streams = []
+
+    @asyncio.coroutine
+    def head_object(self, Bucket, Key, **kwargs):
+        self.head_kwargs = kwargs
+        return {'ContentLength': len(self.data), 'ETag': '"etag"'}
+
+    @asyncio.coroutine
+    def get_object(self, Bucket, Key, Range, IfMatch, **kwargs):
+        self.ranges.append(Range)
+        self.if_match = IfMatch
+        self.get_kwargs = kwargs
+        start, end = [int(i) for i in Range.split('=')[1].split('-')]
+        status_code = 206
+        data = self.data[start:end + 1]
+        if self.ignore_range:
+            status_code = 200
+            data = self.data
+        content_length = len(data)
+        if self.truncations.get(start):
+            self.truncations[start] -= 1
+            data = data[:len(data) // 2]
+        data += self.overruns.get(start, b'')
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        yield from asyncio.sleep(0.05)
+        self.in_flight -= 1
+        stream = FakeRawStream(data)
+        self.streams.append((start, stream))
+        return {'ResponseMetadata': {'HTTPStatusCode': status_code},
+                'ContentLength': content_length,
+                'Body': StreamingBody(stream, content_length)}
+
+
+class TestGlacierPartSize(unittest.TestCase):
+    def test_default_part_size(self):
+        self.assertEqual(glacier_part_size(100 * MB), 8 * MB)
+
+    def test_part_size_doubled_for_large_archives(self):
+        self.assertEqual(glacier_part_size(10000 * MB, MB), MB)
+        self.assertEqual(glacier_part_size(10000 * MB + 1, MB), 2 * MB)
+        self.assertEqual(glacier_part_size(50000 * MB, MB), 8 * MB)
+
+    def test_invalid_part_size(self):
+        for part_size in [1024, 3 * MB, MB + 1, 8192 * MB]:
+            with self.assertRaises(ValueError):
+                glacier_part_size(MB, part_size)
+
+    def test_archive_too_large(self):
+        with self.assertRaises(ValueError):
+            glacier_part_size(4096 * MB * 10000 + 1)
+
+
+class TestS3PartSize(unittest.TestCase):
+    def test_default_part_size(self):
+        self.assertEqual(s3_part_size(100 * MB), 8 * MB)
+
+    def test_part_size_grown_for_large_objects(self):
+        self.assertEqual(s3_part_size(50000 * MB, 5 * MB), 5 * MB)
+        self.assertEqual(s3_part_size(50000 * MB + 1, 5 * MB), 5 * MB + 1)
+
+    def test_invalid_part_size(self):
+        for part_size in [MB, 6 * 1024 * MB]:
+            with self.assertRaises(ValueError):
+                s3_part_size(MB, part_size)
+
+    def test_object_too_large(self):
+        with self.assertRaises(ValueError):
+            s3_part_size(5 * 1024 * MB * 10000 + 1)
+
+
+class TestMappedPart(unittest.TestCase):
+    def setUp(self):
+        self.part = MappedPart(b'0123456789', 2, 5)
+
+    def test_read(self):
+        self.assertEqual(len(self.part), 5)
+        self.assertEqual(self.part.read(2), b'23')
+        self.assertEqual(self.part.read(), b'456')
+        self.assertEqual(self.part.read(), b'')
+
+    def test_seek_and_tell(self):
+        self.part.read(3)
+        self.assertEqual(self.part.tell(), 3)
+        self.part.seek(0)
+        self.assertEqual(self.part.read(), b'23456')
+        self.part.seek(-2, 2)
+        self.assertEqual(self.part.read(), b'56')
+        with self.assertRaises(ValueError):
+            self.part.seek(-1)
+
+    def test_getbuffer(self):
+        self.part.read(1)
+        self.assertEqual(bytes(self.part.getbuffer()), b'23456')
+        self.assertEqual(self.part.tell(), 1)
+
+
+class TestPartReader(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'archive')
+        with open(self.filename, 'wb') as f:
+            f.write(b'0123456789')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def test_reads_ranges_without_moving_position(self):
+        with open(self.filename, 'rb') as f:
+            f.seek(3)
+            reader = PartReader(f)
+            self.assertEqual(reader.size, 10)
+            self.assertEqual(reader.read(0, 4), b'0123')
+            self.assertEqual(reader.read(8, 4), b'89')
+            self.assertEqual(f.tell(), 3)
+            reader.close()
+
+    def test_mmap_without_pread(self):
+        with mock.patch.object(multipart, 'os', mock.Mock(wraps=os,
+                                                          spec=['fstat'])):
+            with open(self.filename, 'rb') as f:
+                reader = PartReader(f)
+                self.assertIsNotNone(reader._mmap)
+                self.assertEqual(reader.read(4, 3), b'456')
+                reader.close()
+
+    def test_writer_preallocates_file(self):
+        with open(self.filename, 'wb') as f:
+            writer = PartWriter(f, 8)
+            self.assertEqual(os.fstat(f.fileno()).st_size, 8)
+            writer.write(4, b'4567')
+            writer.write(0, memoryview(b'0123'))
+            writer.close()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'01234567')
+
+    def test_writer_mmap_without_pwrite(self):
+        fake_os = mock.Mock(wraps=os, spec=['fstat', 'ftruncate'])
+        with mock.patch.object(multipart, 'os', fake_os):
+            with open(self.filename, 'r+b') as f:
+                writer = PartWriter(f, 4)
+                self.assertIsNotNone(writer._mmap)
+                writer.write(1, b'ab')
+                writer.close()
+        with open(self.filename, 'rb') as f:
+            self.assertEqual(f.read(), b'0ab3')
+
+    def test_view_of_mapped_file(self):
+        with open(self.filename, 'rb') as f:
+            reader = PartReader(f)
+            part = reader.view(4, 3)
+            self.assertEqual(part.read(), b'456')
+            part.close()
+            reader.close()
+
+
+class TestGlacierMultipartUploader(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'archive')
+        self.data = b''.join(bytes([i]) * MB for i in range(5)) + b'tail'
+        with open(self.filename, 'wb') as f:
+            f.write(self.data)
+        self.vault = FakeVault()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def uploader(self, **kwargs):
+        kwargs.setdefault('part_size', MB)
+        kwargs.setdefault('retry_delay', 0)
+        return GlacierMultipartUploader(self.vault, 'vault', **kwargs)
+
+    @async_test
+    def test_upload_combines_part_tree_hashes(self):
+        response = yield from self.uploader(part_size=2 * MB).upload(
+            self.filename, description='my archive')
+        expected = calculate_tree_hash(io.BytesIO(self.data))
+        self.assertEqual(response['checksum'], expected)
+        self.assertEqual(self.vault.completed, (len(self.data), expected))
+        self.assertEqual(self.vault.part_size, 2 * MB)
+        self.assertEqual(self.vault.description, 'my archive')
+        self.assertEqual(sorted(self.vault.parts), [
+            'bytes 0-2097151/*', 'bytes 2097152-4194303/*',
+            'bytes 4194304-5242883/*'])
+        self.assertEqual(self.vault.archive(), self.data)
+
+    @async_test
+    def test_upload_file_object(self):
+        with open(self.filename, 'rb') as f:
+            f.seek(10)
+            yield from self.uploader().upload(f)
+        self.assertEqual(self.vault.archive(), self.data)
+
+    @async_test
+    def test_parts_uploaded_concurrently(self):
+        yield from self.uploader(max_concurrency=3).upload(self.filename)
+        self.assertEqual(self.vault.max_in_flight, 3)
+
+    @async_test
+    def test_in_flight_bytes_bound_concurrency(self):
+        yield from self.uploader(max_concurrency=4,
+                                 max_in_flight_bytes=2 * MB).upload(
+            self.filename)
+        self.assertEqual(self.vault.max_in_flight, 2)
+
+    @async_test
+    def test_failed_part_is_retried(self):
+        self.vault.failures['bytes 1048576-2097151/*'] = 2
+        response = yield from self.uploader(max_part_attempts=3).upload(
+            self.filename)
+        self.assertEqual(response['archiveId'], 'archive-id')
+        self.assertEqual(self.vault.archive(), self.data)
+        self.assertEqual(self.vault.aborted, [])
+
+    @async_test
+    def test_upload_aborted_when_part_fails(self):
+        self.vault.failures['bytes 1048576-2097151/*'] = 3
+        with self.assertRaises(RuntimeError):
+            yield from self.uploader(max_part_attempts=3).upload(
+                self.filename)
+        self.assertEqual(self.vault.aborted, ['upload-id'])
+        self.assertIsNone(self.vault.completed)
+
+    @async_test
+    def test_empty_file_not_uploaded(self):
+        with open(self.filename, 'wb'):
+            pass
+        with self.assertRaises(ValueError):
+            yield from self.uploader().upload(self.filename)
+        # Never initiated.
+        self.assertFalse(hasattr(self.vault, 'part_size'))
+        self.assertIsNone(self.vault.completed)
+
+
+
+class TestS3MultipartUploader(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'object')
+        self.data = b''.join(bytes([i]) * 5 * MB for i in range(3)) + b'tail'
+        with open(self.filename, 'wb') as f:
+            f.write(self.data)
+        self.s3 = FakeS3()
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def uploader(self, **kwargs):
+        kwargs.setdefault('part_size', 5 * MB)
+        kwargs.setdefault('retry_delay', 0)
+        return S3MultipartUploader(self.s3, 'bucket', **kwargs)
+
+    @async_test
+    def test_upload(self):
+        response = yield from self.uploader().upload(
+            self.filename, 'key', {'ContentType': 'text/plain'})
+        self.assertEqual(response['ETag'], '"etag"')
+        self.assertEqual(self.s3.created, {'Bucket': 'bucket', 'Key': 'key',
+                                           'ContentType': 'text/plain'})
+        self.assertEqual(self.s3.completed, [
+            {'ETag': '"etag-%s"' % number, 'PartNumber': number}
+            for number in range(1, 5)])
+        self.assertEqual(self.s3.object(), self.data)
+
+    @async_test
+    def test_sse_customer_args_passed_to_parts(self):
+        extra_args = {'SSECustomerAlgorithm': 'AES256',
+                      'SSECustomerKey': 'key', 'StorageClass': 'STANDARD'}
+        yield from self.uploader().upload(self.filename, 'key', extra_args)
+        self.assertEqual(self.s3.part_kwargs, {
+            'SSECustomerAlgorithm': 'AES256', 'SSECustomerKey': 'key'})
+
+    @async_test
+    def test_in_flight_bytes_bound_concurrency(self):
+        yield from self.uploader(max_concurrency=4,
+                                 max_in_flight_bytes=10 * MB).upload(
+            self.filename, 'key')
+        self.assertEqual(self.s3.max_in_flight, 2)
+
+    @async_test
+    def test_failed_part_is_sent_again_from_its_start(self):
+        self.s3.failures[2] = 2
+        yield from self.uploader(max_part_attempts=3).upload(
+            self.filename, 'key')
+        self.assertEqual(self.s3.object(), self.data)
+        self.assertEqual(self.s3.aborted, [])
+
+    @async_test
+    def test_upload_aborted_when_part_fails(self):
+        self.s3.failures[2] = 3
+        with self.assertRaises(RuntimeError):
+            yield from self.uploader(max_part_attempts=3).upload(
+                self.filename, 'key')
+        self.assertEqual(self.s3.aborted, ['upload-id'])
+        self.assertIsNone(self.s3.completed)
+
+    @async_test
+    def test_callback_reports_throughput(self):
+        reports = []
+        callback = lambda stats: reports.append(
+            (stats.bytes_transferred, stats.parts_transferred,
+             stats.retries, stats.throughput))
+        self.s3.failures[1] = 1
+        yield from self.uploader(callback=callback).upload(
+            self.filename, 'key')
+        self.assertEqual([report[1] for report in reports], [1, 2, 3, 4])
+        self.assertEqual(reports[-1][:3], (len(self.data), 4, 1))
+        self.assertGreater(reports[-1][3], 0)
+
+    @async_test
+    def test_empty_file_uploaded_as_one_part(self):
+        with open(self.filename, 'wb'):
+            pass
+        yield from self.uploader().upload(self.filename, 'key')
+        self.assertEqual(self.s3.parts, {1: b''})
+
+
+
+class TestS3RangedDownloader(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tempdir, 'object')
+        self.object = FakeObject(
+            b''.join(bytes([i]) * 1000 for i in range(10)) + b'tail')
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def downloader(self, **kwargs):
+        kwargs.setdefault('part_size', 3000)
+        kwargs.setdefault('retry_delay', 0)
+        return S3RangedDownloader(self.object, 'bucket', **kwargs)
+
+    def downloaded(self):
+        with open(self.filename, 'rb') as f:
+            return f.read()
+
+    @async_test
+    def test_download(self):
+        head = yield from self.downloader().download(
+            'key', self.filename, {'VersionId': 'v1'})
+        self.assertEqual(head['ContentLength'], len(self.object.data))
+        self.assertEqual(self.downloaded(), self.object.data)
+        self.assertEqual(sorted(self.object.ranges), [
+            'bytes=0-2999', 'bytes=3000-5999', 'bytes=6000-8999',
+            'bytes=9000-10003'])
+        self.assertEqual(self.object.head_kwargs, {'VersionId': 'v1'})
+        self.assertEqual(self.object.if_match, '"etag"')
+
+    @async_test
+    def test_get_object_only_args_not_passed_to_head(self):
+        yield from self.downloader().download(
+            'key', self.filename,
+            {'VersionId': 'v1', 'ResponseContentType': 'text/plain'})
+        self.assertEqual(self.object.head_kwargs, {'VersionId': 'v1'})
+        self.assertEqual(self.object.get_kwargs, {
+            'VersionId': 'v1', 'ResponseContentType': 'text/plain'})
+
+    @async_test
+    def test_existing_file_kept_when_it_cannot_be_opened(self):
+        with self.assertRaises(IOError):
+            yield from self.downloader().download('key', self.tempdir)
+        self.assertTrue(os.path.isdir(self.tempdir))
+
+    @async_test
+    def test_ranges_downloaded_concurrently(self):
+        yield from self.downloader(max_concurrency=3).download(
+            'key', self.filename)
+        self.assertEqual(self.object.max_in_flight, 3)
+
+    @async_test
+    def test_short_range_is_retried(self):
+        self.object.truncations[3000] = 2
+        reports = []
+        yield from self.downloader(callback=lambda stats: reports.append(
+            stats.retries)).download('key', self.filename)
+        self.assertEqual(self.downloaded(), self.object.data)
+        self.assertEqual(reports[-1], 2)
+
+    @async_test
+    def test_short_range_fails_download(self):
+        self.object.truncations[3000] = 3
+        with self.assertRaises(IncompleteReadError):
+            yield from self.downloader().download('key', self.filename)
+        self.assertFalse(os.path.exists(self.filename))
+        failed = [stream for start, stream in self.object.streams
+                  if start == 3000]
+        self.assertEqual(len(failed), 3)
+        self.assertTrue(all(stream.closed for stream in failed))
+
+    @async_test
+    def test_whole_object_response_fails_before_writing(self):
+        self.object.ignore_range = True
+        writer = mock.Mock()
+        with self.assertRaises(RangeMismatchError):
+            yield from self.downloader()._get_range(
+                writer, {'Bucket': 'bucket', 'Key': 'key', 'IfMatch': 'e'},
+                3000, 3000, 'bytes=3000-5999')
+        self.assertFalse(writer.write.called)
+        self.assertTrue(self.object.streams[0][1].closed)
+
+    @async_test
+    def test_overlong_range_never_written_past_its_end(self):
+        self.object.overruns[3000] = b'extra'
+        writes = []
+        writer = mock.Mock()
+        writer.write.side_effect = lambda offset, data: writes.append(
+            (offset, len(data)))
+        with self.assertRaises(RangeMismatchError):
+            yield from self.downloader()._get_range(
+                writer, {'Bucket': 'bucket', 'Key': 'key', 'IfMatch': 'e'},
+                3000, 3000, 'bytes=3000-5999')
+        self.assertEqual(max(offset + size for offset, size in writes), 6000)
+        self.assertTrue(self.object.streams[0][1].closed)
+
+    @async_test
+    def test_mismatched_range_fails_download(self):
+        self.object.ignore_range = True
+        with self.assertRaises(RangeMismatchError):
+            yield from self.downloader().download('key', self.filename)
+        self.assertFalse(os.path.exists(self.filename))
+
+    @async_test
+    def test_empty_object(self):
+        self.object.data = b''
+        yield from self.downloader().download('key', self.filename)
+        self.assertEqual(self.downloaded(), b'')
+        self.assertEqual(self.object.ranges, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
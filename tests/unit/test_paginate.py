@@ -21,9 +21,15 @@ os.environ['PYTHONASYNCIODEBUG'] = '1'
 import logging
 logging.basicConfig(level=logging.DEBUG)
 
+import io
+import json
+import datetime
 import unittest
 from yieldfrom.botocore.paginate import Paginator
 from yieldfrom.botocore.paginate import PaginatorModel
+from yieldfrom.botocore.paginate import ResultKeyIterator
+from yieldfrom.botocore.paginate import NDJSONSink
+from yieldfrom.botocore.compat import StopAsyncIteration
 from yieldfrom.botocore.exceptions import PaginationError
 #from yieldfrom.botocore.operation import Operation
 
@@ -868,6 +874,231 @@ class TestSearchOverResults(unittest.TestCase):
         result = yield from self.paginator.paginate().search('Foo[].b')
         self.assertEqual([2, 4], result)
 
+    def test_search_is_a_coroutine(self):
+        # So that run_until_complete(), asyncio.async() and wait_for()
+        # take it on every Python version.
+        search = self.paginator.paginate().search('Foo[].a')
+        self.assertTrue(asyncio.iscoroutine(search))
+        loop = asyncio.get_event_loop()
+        self.assertEqual(loop.run_until_complete(search), [1, 3, 5])
+
+    @async_test
+    def test_search_as_async_iterator(self):
+        search = self.paginator.paginate().iter_search('Foo[].a')
+        self.assertIs(search.__aiter__(), search)
+        results = []
+        while True:
+            try:
+                results.append((yield from search.__anext__()))
+            except StopAsyncIteration:
+                break
+        self.assertEqual(results, [1, 3, 5])
+
+
+@asyncio.coroutine
+def drain_async_iterator(iterator):
+    results = []
+    while True:
+        try:
+            results.append((yield from iterator.__anext__()))
+        except StopAsyncIteration:
+            return results
+
+
+class TestAsyncIteration(unittest.TestCase):
+    def setUp(self):
+        self.method = mock.Mock()
+        self.paginate_config = {
+            'output_token': 'Marker',
+            'input_token': 'Marker',
+            'result_key': 'Users',
+        }
+        self.paginator = Paginator(self.method, self.paginate_config)
+        self.responses = [
+            {'Users': ['User1', 'User2'], 'Marker': 'm1'},
+            {'Users': [], 'Marker': 'm2'},
+            {'Users': ['User3']},
+        ]
+
+    @async_test
+    def test_page_iterator_anext(self):
+        self.method.side_effect = [future_wrapped(r) for r in self.responses]
+        pages = self.paginator.paginate()
+        self.assertIs(pages.__aiter__(), pages)
+        actual = yield from drain_async_iterator(pages)
+        self.assertEqual(actual, self.responses)
+
+    @async_test
+    def test_result_key_iterator_anext(self):
+        self.method.side_effect = [future_wrapped(r) for r in self.responses]
+        pages = self.paginator.paginate()
+        users = ResultKeyIterator(pages, self.paginator.result_keys[0])
+        actual = yield from drain_async_iterator(users)
+        self.assertEqual(actual, ['User1', 'User2', 'User3'])
+
+
+class TestPrefetch(unittest.TestCase):
+    def setUp(self):
+        self.method = mock.Mock()
+        self.paginate_config = {
+            'output_token': 'NextToken',
+            'input_token': 'NextToken',
+            'result_key': 'Foo',
+        }
+        self.paginator = Paginator(self.method, self.paginate_config)
+
+    @async_test
+    def test_prefetch_returns_all_pages_in_order(self):
+        responses = [{'Foo': [1], 'NextToken': 'token1'},
+                     {'Foo': [2], 'NextToken': 'token2'},
+                     {'Foo': [3]}]
+        self.method.side_effect = [future_wrapped(r) for r in responses]
+        pages = self.paginator.paginate(PaginationConfig={'Prefetch': 2})
+        actual = yield from pump_paginator(pages)
+        self.assertEqual(actual, responses)
+        self.assertEqual(self.method.call_args_list,
+                         [mock.call(), mock.call(NextToken='token1'),
+                          mock.call(NextToken='token2')])
+
+    @async_test
+    def test_prefetch_fetches_ahead_of_consumer(self):
+        responses = [{'Foo': [1], 'NextToken': 'token1'},
+                     {'Foo': [2], 'NextToken': 'token2'},
+                     {'Foo': [3], 'NextToken': 'token3'},
+                     {'Foo': [4]}]
+        self.method.side_effect = [future_wrapped(r) for r in responses]
+        pages = self.paginator.paginate(PaginationConfig={'Prefetch': 2})
+        first = yield from pages.next()
+        self.assertEqual(first, responses[0])
+        for _ in range(10):
+            yield from asyncio.sleep(0)
+        # One page consumed, two buffered ahead of it and the request
+        # for the next page in flight.
+        self.assertEqual(self.method.call_count, 4)
+        pages.close()
+        yield from asyncio.sleep(0)
+
+    @async_test
+    def test_prefetch_stopped_when_iterator_dropped(self):
+        responses = [{'Foo': [1], 'NextToken': 'token1'},
+                     {'Foo': [2], 'NextToken': 'token2'},
+                     {'Foo': [3], 'NextToken': 'token3'},
+                     {'Foo': [4]}]
+        self.method.side_effect = [future_wrapped(r) for r in responses]
+        pages = self.paginator.paginate(PaginationConfig={'Prefetch': 1})
+        yield from pages.next()
+        for _ in range(10):
+            yield from asyncio.sleep(0)
+        task = pages._prefetch_task
+        self.assertFalse(task.done())
+        del pages
+        for _ in range(10):
+            yield from asyncio.sleep(0)
+        self.assertTrue(task.cancelled())
+        self.assertEqual(self.method.call_count, 3)
+
+    @async_test
+    def test_prefetch_respects_max_items(self):
+        responses = [{'Foo': [1, 2], 'NextToken': 'token1'},
+                     {'Foo': [3, 4], 'NextToken': 'token2'},
+                     {'Foo': [5]}]
+        self.method.side_effect = [future_wrapped(r) for r in responses]
+        pages = self.paginator.paginate(
+            PaginationConfig={'Prefetch': 3, 'MaxItems': 3})
+        result = yield from pages.build_full_result()
+        self.assertEqual(result['Foo'], [1, 2, 3])
+        self.assertEqual(result['NextToken'], 'token1___1')
+        self.assertEqual(self.method.call_count, 2)
+
+    @async_test
+    def test_prefetch_respects_starting_token(self):
+        responses = [{'Foo': [1, 2, 3], 'NextToken': 'token2'},
+                     {'Foo': [4]}]
+        self.method.side_effect = [future_wrapped(r) for r in responses]
+        pages = self.paginator.paginate(
+            PaginationConfig={'Prefetch': 2, 'StartingToken': 'token1___1'})
+        result = yield from pages.build_full_result()
+        self.assertEqual(result['Foo'], [2, 3, 4])
+
+    @async_test
+    def test_prefetch_raises_on_duplicate_token(self):
+        responses = [{'NextToken': 'token1'},
+                     {'NextToken': 'token2'},
+                     {'NextToken': 'token2'}]
+        self.method.side_effect = [future_wrapped(r) for r in responses]
+        pages = self.paginator.paginate(PaginationConfig={'Prefetch': 2})
+        with self.assertRaises(PaginationError):
+            yield from pump_paginator(pages)
+
+
+class TestStreamFullResult(unittest.TestCase):
+    def setUp(self):
+        self.method = mock.Mock()
+        self.paginate_config = {
+            'output_token': 'NextToken',
+            'input_token': 'NextToken',
+            'result_key': ['Users', 'Groups'],
+            'non_aggregate_keys': ['Owner'],
+        }
+        self.paginator = Paginator(self.method, self.paginate_config)
+        self.responses = [
+            {'Users': ['User1'], 'Groups': ['Group1'], 'Owner': 'me',
+             'NextToken': 'token1'},
+            {'Users': ['User2', 'User3'], 'Groups': [], 'Owner': 'me'},
+        ]
+
+    @async_test
+    def test_stream_yields_items_as_pages_arrive(self):
+        self.method.side_effect = [future_wrapped(r) for r in self.responses]
+        stream = self.paginator.paginate().stream_full_result()
+        first = yield from stream.__anext__()
+        self.assertEqual(first, ('Users', 'User1'))
+        # Only the first page has been requested so far.
+        self.assertEqual(self.method.call_count, 1)
+        rest = yield from drain_async_iterator(stream)
+        self.assertEqual(rest, [('Groups', 'Group1'), ('Users', 'User2'),
+                                ('Users', 'User3')])
+        self.assertEqual(stream.result(), {'Owner': 'me'})
+
+    @async_test
+    def test_yield_from_drains_and_returns_summary(self):
+        self.method.side_effect = [future_wrapped(r) for r in self.responses]
+        pages = self.paginator.paginate(PaginationConfig={'MaxItems': 1})
+        summary = yield from pages.stream_full_result()
+        self.assertEqual(summary, {'Owner': 'me', 'NextToken': 'token1'})
+
+    @async_test
+    def test_ndjson_sink(self):
+        self.method.side_effect = [future_wrapped(r) for r in self.responses]
+        fileobj = io.StringIO()
+        sink = NDJSONSink(fileobj, include_result_key=True)
+        yield from self.paginator.paginate().stream_full_result(sink=sink)
+        lines = fileobj.getvalue().splitlines()
+        self.assertEqual([json.loads(line) for line in lines],
+                         [{'Users': 'User1'}, {'Groups': 'Group1'},
+                          {'Users': 'User2'}, {'Users': 'User3'}])
+        self.assertEqual(sink.items_written, 4)
+
+    def test_ndjson_sink_writes_timestamps(self):
+        fileobj = io.StringIO()
+        sink = NDJSONSink(fileobj)
+        sink.write('Contents', {
+            'Key': 'foo',
+            'LastModified': datetime.datetime(2015, 1, 1, 12, 30)})
+        self.assertEqual(
+            json.loads(fileobj.getvalue()),
+            {'Key': 'foo', 'LastModified': '2015-01-01T12:30:00'})
+
+    def test_ndjson_sink_writes_blobs(self):
+        fileobj = io.StringIO()
+        sink = NDJSONSink(fileobj)
+        sink.write('Items', {'Id': {'S': 'a'}, 'Data': {'B': b'\x00\xff'},
+                             'Set': {'BS': [b'foo', bytearray(b'bar')]}})
+        self.assertEqual(
+            json.loads(fileobj.getvalue()),
+            {'Id': {'S': 'a'}, 'Data': {'B': 'AP8='},
+             'Set': {'BS': ['Zm9v', 'YmFy']}})
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -16,13 +16,16 @@
 # asyncio.
 #
 import os, sys
+import gc
 import logging
 import datetime
+import weakref
 from dateutil.tz import tzutc
 from yieldfrom.botocore import parsers, model
 
 #sys.path.extend(['..', '../..'])
 import unittest
+import mock
 
 os.environ['PYTHONASYNCIODEBUG'] = '1'
 logging.basicConfig(level=logging.DEBUG)
@@ -412,6 +415,75 @@ class TestCanDecorateResponseParsing(unittest.TestCase):
         self.assertEqual(parsed, expected_parsed)
 
 
+class TestCompiledParsers(unittest.TestCase):
+    def setUp(self):
+        self.shape = model.StructureShape('OutputShape', {
+            'type': 'structure',
+            'members': {
+                'Name': {'shape': 'StringType'},
+                'Children': {'shape': 'NodeList'},
+            },
+        }, model.ShapeResolver({
+            'StringType': {'type': 'string'},
+            'Node': {
+                'type': 'structure',
+                'members': {
+                    'Name': {'shape': 'StringType'},
+                    'Children': {'shape': 'NodeList'},
+                },
+            },
+            'NodeList': {'type': 'list', 'member': {'shape': 'Node'}},
+        }))
+
+    def parse(self, parser, body):
+        return parser.parse({'body': body, 'headers': {},
+                             'status_code': 200}, self.shape)
+
+    def test_shape_compiled_once_per_parser_class(self):
+        parser = parsers.JSONParser()
+        body = b'{"Name": "a"}'
+        with mock.patch.object(parsers.JSONParser, '_compile_shape',
+                               wraps=parser._compile_shape) as compile_shape:
+            self.parse(parser, body)
+            calls = compile_shape.call_count
+            self.assertTrue(calls > 0)
+            self.parse(parsers.JSONParser(), body)
+            self.assertEqual(compile_shape.call_count, calls)
+        # Other parser classes compile their own handlers.
+        self.assertEqual(self.parse(parsers.RestJSONParser(), body),
+                         {'Name': 'a', 'ResponseMetadata': {
+                             'HTTPStatusCode': 200}})
+
+    def test_compiled_parsers_do_not_keep_shape_alive(self):
+        self.parse(parsers.JSONParser(), b'{"Name": "a"}')
+        shape = weakref.ref(self.shape)
+        del self.shape
+        gc.collect()
+        self.assertIsNone(shape())
+
+    def test_recursive_shapes(self):
+        body = (b'<Result xmlns="http://example.com/doc/"><Name>a</Name>'
+                b'<Children><member><Name>b</Name><Children><member>'
+                b'<Name>c</Name></member></Children></member></Children>'
+                b'</Result>')
+        parsed = self.parse(parsers.RestXMLParser(), body)
+        self.assertEqual(parsed['Name'], 'a')
+        self.assertEqual(parsed['Children'], [
+            {'Name': 'b', 'Children': [{'Name': 'c'}]}])
+
+    def test_overridden_handlers_are_used(self):
+        class UpperCaseParser(parsers.RestXMLParser):
+            def _handle_string(self, shape, node):
+                return node.text.upper()
+
+        parsed = self.parse(UpperCaseParser(),
+                            b'<Result><Name>a</Name></Result>')
+        self.assertEqual(parsed['Name'], 'A')
+        parsed = self.parse(parsers.RestXMLParser(),
+                            b'<Result><Name>a</Name></Result>')
+        self.assertEqual(parsed['Name'], 'a')
+
+
 class TestHandlesNoOutputShape(unittest.TestCase):
     """Verify that each protocol handles no output shape properly."""
 
@@ -487,3 +559,237 @@ class TestHandlesInvalidXMLResponses(unittest.TestCase):
             parser.parse(
                 {'body': invalid_xml, 'headers': {}, 'status_code': 200},
                 output_shape)
+
+
+def parse_incrementally(parser, body, shape, result_key, chunk_size=7):
+    # Returns the list of items produced after each fed chunk, and the
+    # parsed remainder of the response.
+    incremental = parser.create_incremental_parser(shape, result_key)
+    produced = []
+    for i in range(0, len(body), chunk_size):
+        produced.append(incremental.feed(body[i:i + chunk_size]))
+    produced.append(incremental.close())
+    rest = parser.parse({'body': incremental.parsed_body, 'headers': {},
+                         'status_code': 200}, shape)
+    return produced, rest
+
+
+class TestIncrementalXMLParsing(unittest.TestCase):
+    def setUp(self):
+        self.resolver = model.ShapeResolver({
+            'StringType': {'type': 'string'},
+            'IntegerType': {'type': 'integer'},
+            'BooleanType': {'type': 'boolean'},
+            'Object': {
+                'type': 'structure',
+                'members': {
+                    'Key': {'shape': 'StringType'},
+                    'Size': {'shape': 'IntegerType'},
+                },
+            },
+            'FlattenedObjects': {
+                'type': 'list',
+                'member': {'shape': 'Object'},
+                'flattened': True,
+            },
+            'Objects': {
+                'type': 'list',
+                'member': {'shape': 'Object', 'locationName': 'item'},
+            },
+            'Listing': {
+                'type': 'structure',
+                'members': {
+                    'Items': {'shape': 'Objects'},
+                    'Count': {'shape': 'IntegerType'},
+                },
+            },
+        })
+
+    def test_rest_xml_flattened_list(self):
+        parser = parsers.RestXMLParser()
+        shape = model.StructureShape('OutputShape', {
+            'type': 'structure',
+            'members': {
+                'IsTruncated': {'shape': 'BooleanType'},
+                'Contents': {'shape': 'FlattenedObjects'},
+                'NextMarker': {'shape': 'StringType'},
+            },
+        }, self.resolver)
+        body = (
+            b'<ListBucketResult xmlns="http://s3.amazonaws.com/doc/">'
+            b'<IsTruncated>true</IsTruncated>'
+            b'<Contents><Key>a</Key><Size>1</Size></Contents>'
+            b'<Contents><Key>b</Key><Size>2</Size></Contents>'
+            b'<Contents><Key>c</Key><Size>3</Size></Contents>'
+            b'<NextMarker>c</NextMarker>'
+            b'</ListBucketResult>')
+        produced, rest = parse_incrementally(parser, body, shape, 'Contents')
+        items = [item for chunk in produced for item in chunk]
+        self.assertEqual(items, [{'Key': 'a', 'Size': 1},
+                                 {'Key': 'b', 'Size': 2},
+                                 {'Key': 'c', 'Size': 3}])
+        # Items are produced as they complete, not all at the end.
+        self.assertTrue(all(len(chunk) <= 1 for chunk in produced))
+        self.assertEqual(rest['IsTruncated'], True)
+        self.assertEqual(rest['NextMarker'], 'c')
+        self.assertNotIn('Contents', rest)
+
+    def test_query_result_wrapper_list(self):
+        parser = parsers.QueryParser()
+        shape = model.StructureShape('OutputShape', {
+            'type': 'structure',
+            'resultWrapper': 'ListThingsResult',
+            'members': {
+                'Things': {'shape': 'Objects'},
+                'Marker': {'shape': 'StringType'},
+            },
+        }, self.resolver)
+        body = (
+            b'<ListThingsResponse>'
+            b'<ListThingsResult>'
+            b'<Things><item><Key>a</Key></item><item><Key>b</Key></item>'
+            b'</Things>'
+            b'<Marker>m</Marker>'
+            b'</ListThingsResult>'
+            b'<ResponseMetadata><RequestId>id</RequestId></ResponseMetadata>'
+            b'</ListThingsResponse>')
+        produced, rest = parse_incrementally(parser, body, shape, 'Things')
+        items = [item for chunk in produced for item in chunk]
+        self.assertEqual(items, [{'Key': 'a'}, {'Key': 'b'}])
+        self.assertEqual(rest, {'Things': [], 'Marker': 'm',
+                                'ResponseMetadata': {
+                                    'RequestId': 'id',
+                                    'HTTPStatusCode': 200}})
+
+    def test_nested_result_key(self):
+        parser = parsers.RestXMLParser()
+        shape = model.StructureShape('OutputShape', {
+            'type': 'structure',
+            'members': {'Listing': {'shape': 'Listing'}},
+        }, self.resolver)
+        body = (
+            b'<Result><Listing><Count>2</Count>'
+            b'<Items><item><Key>a</Key></item><item><Key>b</Key></item>'
+            b'</Items></Listing></Result>')
+        produced, rest = parse_incrementally(parser, body, shape,
+                                             'Listing.Items')
+        items = [item for chunk in produced for item in chunk]
+        self.assertEqual(items, [{'Key': 'a'}, {'Key': 'b'}])
+        self.assertEqual(rest['Listing'], {'Count': 2, 'Items': []})
+
+    def test_invalid_result_key(self):
+        parser = parsers.RestXMLParser()
+        shape = model.StructureShape('OutputShape', {
+            'type': 'structure',
+            'members': {'NextMarker': {'shape': 'StringType'}},
+        }, self.resolver)
+        with self.assertRaises(ValueError):
+            parser.create_incremental_parser(shape, 'Contents')
+        with self.assertRaises(ValueError):
+            parser.create_incremental_parser(shape, 'NextMarker')
+
+    def test_invalid_xml(self):
+        parser = parsers.RestXMLParser()
+        shape = model.StructureShape('OutputShape', {
+            'type': 'structure',
+            'members': {'Contents': {'shape': 'FlattenedObjects'}},
+        }, self.resolver)
+        incremental = parser.create_incremental_parser(shape, 'Contents')
+        incremental.feed(b'<Result><Contents>')
+        with self.assertRaises(parsers.ResponseParserError):
+            incremental.close()
+
+
+class TestIncrementalJSONParsing(unittest.TestCase):
+    def setUp(self):
+        self.resolver = model.ShapeResolver({
+            'StringType': {'type': 'string'},
+            'IntegerType': {'type': 'integer'},
+            'AttributeMap': {
+                'type': 'map',
+                'key': {'shape': 'StringType'},
+                'value': {'shape': 'StringType'},
+            },
+            'ItemList': {
+                'type': 'list',
+                'member': {'shape': 'AttributeMap'},
+            },
+            'Listing': {
+                'type': 'structure',
+                'members': {
+                    'Items': {'shape': 'ItemList'},
+                    'Count': {'shape': 'IntegerType'},
+                },
+            },
+        })
+        self.scan_shape = model.StructureShape('OutputShape', {
+            'type': 'structure',
+            'members': {
+                'Items': {'shape': 'ItemList'},
+                'Count': {'shape': 'IntegerType'},
+                'LastEvaluatedKey': {'shape': 'AttributeMap'},
+            },
+        }, self.resolver)
+
+    def test_json_result_list(self):
+        parser = parsers.JSONParser()
+        body = (
+            b'{"Count": 3, "Items": [{"id": "a"}, {"id": "b\\"]"}, '
+            b'{"id": "\xc3\xa9"}], "LastEvaluatedKey": {"id": "c"}}')
+        produced, rest = parse_incrementally(parser, body, self.scan_shape,
+                                             'Items')
+        items = [item for chunk in produced for item in chunk]
+        self.assertEqual(items, [{'id': 'a'}, {'id': 'b"]'},
+                                 {'id': u'\xe9'}])
+        self.assertTrue(all(len(chunk) <= 1 for chunk in produced))
+        self.assertEqual(rest, {'Count': 3, 'LastEvaluatedKey': {'id': 'c'}})
+
+    def test_any_chunk_size(self):
+        parser = parsers.JSONParser()
+        body = (b'{"LastEvaluatedKey": {"id": "]["}, "Items": '
+                b'[ {"id": "\xc3\xa9"} ,{} ], "Count": 10}')
+        for chunk_size in range(1, len(body) + 1):
+            produced, rest = parse_incrementally(
+                parser, body, self.scan_shape, 'Items', chunk_size)
+            items = [item for chunk in produced for item in chunk]
+            self.assertEqual(items, [{'id': u'\xe9'}, {}])
+            self.assertEqual(rest, {'Count': 10,
+                                    'LastEvaluatedKey': {'id': ']['}})
+
+    def test_rest_json_payload_nested_result_key(self):
+        parser = parsers.RestJSONParser()
+        shape = model.StructureShape('OutputShape', {
+            'type': 'structure',
+            'payload': 'Listing',
+            'members': {
+                'Listing': {'shape': 'Listing'},
+                'RequestCount': {'shape': 'IntegerType',
+                                 'location': 'header',
+                                 'locationName': 'x-count'},
+            },
+        }, self.resolver)
+        body = b'{"Count": 2, "Items": [{"id": "a"}, {"id": "b"}]}'
+        produced, rest = parse_incrementally(parser, body, shape,
+                                             'Listing.Items')
+        items = [item for chunk in produced for item in chunk]
+        self.assertEqual(items, [{'id': 'a'}, {'id': 'b'}])
+        self.assertEqual(rest['Listing'], {'Count': 2})
+        with self.assertRaises(ValueError):
+            parser.create_incremental_parser(shape, 'RequestCount')
+
+    def test_missing_result_list(self):
+        parser = parsers.JSONParser()
+        body = b'{"Count": 0, "Items": null}'
+        produced, rest = parse_incrementally(parser, body, self.scan_shape,
+                                             'Items')
+        self.assertEqual([item for chunk in produced for item in chunk], [])
+        self.assertEqual(rest, {'Count': 0})
+
+    def test_incomplete_json(self):
+        parser = parsers.JSONParser()
+        incremental = parser.create_incremental_parser(self.scan_shape,
+                                                       'Items')
+        self.assertEqual(incremental.feed(b'{"Items": [{"id": "a"}, {"i'),
+                         [{'id': 'a'}])
+        with self.assertRaises(parsers.ResponseParserError):
+            incremental.close()
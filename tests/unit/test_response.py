@@ -85,6 +85,79 @@ class TestStreamWrapper(unittest.TestCase):
         with self.assertRaises(IncompleteReadError):
             yield from stream.read()
 
+    @async_test
+    def test_readinto_reuses_buffer(self):
+        stream = response.StreamingBody(TestReader(b'1234567890'),
+                                        content_length=10)
+        buf = bytearray(4)
+        chunks = []
+        amount = yield from stream.readinto(buf)
+        while amount:
+            chunks.append(bytes(buf[:amount]))
+            amount = yield from stream.readinto(memoryview(buf))
+        self.assertEqual(b''.join(chunks), b'1234567890')
+
+    @async_test
+    def test_readinto_validates_content_length(self):
+        stream = response.StreamingBody(TestReader(b'123456789'),
+                                        content_length=10)
+        buf = bytearray(16)
+        self.assertEqual((yield from stream.readinto(buf)), 9)
+        with self.assertRaises(IncompleteReadError):
+            yield from stream.readinto(buf)
+
+    @async_test
+    def test_iter_chunks(self):
+        stream = response.StreamingBody(TestReader(b'1234567890'),
+                                        content_length=10)
+        chunks = []
+        iterator = stream.iter_chunks(4)
+        chunk = yield from iterator.next()
+        while chunk is not None:
+            chunks.append(chunk)
+            chunk = yield from iterator.next()
+        self.assertEqual(chunks, [b'1234', b'5678', b'90'])
+
+    @async_test
+    def test_iter_chunks_validates_content_length(self):
+        stream = response.StreamingBody(TestReader(b'123456789'),
+                                        content_length=10)
+        iterator = stream.__aiter__()
+        self.assertEqual((yield from iterator.__anext__()), b'123456789')
+        with self.assertRaises(IncompleteReadError):
+            yield from iterator.__anext__()
+
+    @async_test
+    def test_iter_lines(self):
+        body = b'first\nsecond\r\nthird\r\rfifth\n\nseventh'
+        stream = response.StreamingBody(TestReader(body),
+                                        content_length=len(body))
+        lines = []
+        # Chunks of 3 split lines and line endings between chunks.
+        iterator = stream.iter_lines(chunk_size=3)
+        line = yield from iterator.next()
+        while line is not None:
+            lines.append(line)
+            line = yield from iterator.next()
+        self.assertEqual(lines, body.splitlines())
+
+
+    @async_test
+    def test_iter_lines_carriage_return_at_chunk_boundary(self):
+        # A '\r' ending a chunk is held back for a '\n', and the last
+        # chunk after it has no line ending at all.
+        for body, chunk_size in [(b'x\ry', 2), (b'a\nb\rc', 4)]:
+            stream = response.StreamingBody(TestReader(body),
+                                            content_length=len(body))
+            lines = []
+            iterator = stream.iter_lines(chunk_size=chunk_size)
+            line = yield from iterator.next()
+            while line is not None:
+                lines.append(line)
+                line = yield from iterator.next()
+            self.assertEqual(lines, body.splitlines())
+
+
 class TestGetResponse(unittest.TestCase):
     maxDiff = None
 
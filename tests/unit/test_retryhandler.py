@@ -30,6 +30,7 @@ from yieldfrom.urllib3.exceptions import ClosedPoolError
 
 from yieldfrom.botocore import retryhandler
 from yieldfrom.botocore.exceptions import ChecksumError
+from yieldfrom.botocore.exceptions import InvalidRetryModeError
 
 sys.path.append('..')
 from asyncio_test_utils import async_test, future_wrapped
@@ -284,6 +285,7 @@ class TestCreateRetryConfiguration(unittest.TestCase):
             self.retry_config, operation_name='OperationFoo')
         http_response = mock.Mock()
         http_response.status_code = 200
+        http_response.body_crc32 = None
         # This is not the crc32 of b'foo', so this should
         # fail the crc32 check.
         http_response.headers = {'x-amz-crc32': 2356372768}
@@ -333,6 +335,7 @@ class TestCRC32Checker(unittest.TestCase):
     def test_crc32_matches(self):
         http_response = mock.Mock()
         http_response.status_code = 200
+        http_response.body_crc32 = None
         # This is the crc32 of b'foo', so this should
         # pass the crc32 check.
         http_response.headers = {'x-amz-crc32': 2356372769}
@@ -346,6 +349,7 @@ class TestCRC32Checker(unittest.TestCase):
         # It's not an error is the crc32 header is missing.
         http_response = mock.Mock()
         http_response.status_code = 200
+        http_response.body_crc32 = None
         http_response.headers = {}
         r = yield from self.checker(response=(http_response, {}), attempt_number=1, caught_exception=None)
         self.assertIsNone(r)
@@ -354,6 +358,7 @@ class TestCRC32Checker(unittest.TestCase):
     def test_crc32_check_fails(self):
         http_response = mock.Mock()
         http_response.status_code = 200
+        http_response.body_crc32 = None
         # This is not the crc32 of b'foo', so this should
         # fail the crc32 check.
         http_response.headers = {'x-amz-crc32': 2356372768}
@@ -362,6 +367,18 @@ class TestCRC32Checker(unittest.TestCase):
             yield from self.checker(response=(http_response, {}), attempt_number=1,
                          caught_exception=None)
 
+    @async_test
+    def test_crc32_of_incrementally_parsed_body(self):
+        http_response = mock.Mock()
+        http_response.status_code = 200
+        http_response.headers = {'x-amz-crc32': 2356372769}
+        # The body isn't kept, only its checksum, so the content can't
+        # be read.
+        http_response.body_crc32 = 2356372769
+        r = yield from self.checker(response=(http_response, {}), attempt_number=1,
+                                    caught_exception=None)
+        self.assertIsNone(r)
+
 
 class TestDelayExponential(unittest.TestCase):
 
@@ -383,5 +400,224 @@ class TestDelayExponential(unittest.TestCase):
                 base=-1, growth_factor=2, attempts=3)
 
 
+class TestDelayJitter(unittest.TestCase):
+
+    def test_full_jitter_within_range(self):
+        for _ in range(50):
+            delay = retryhandler.delay_full_jitter(
+                base=1, growth_factor=2, max_delay=20, attempts=3)
+            self.assertTrue(0 <= delay <= 4)
+
+    def test_full_jitter_capped_at_max_delay(self):
+        for _ in range(50):
+            delay = retryhandler.delay_full_jitter(
+                base=1, growth_factor=2, max_delay=20, attempts=10)
+            self.assertTrue(0 <= delay <= 20)
+
+    def test_decorrelated_jitter_within_range(self):
+        for _ in range(50):
+            delay = retryhandler.delay_decorrelated_jitter(
+                base=1, growth_factor=2, max_delay=20, attempts=3)
+            self.assertTrue(1 <= delay <= 9)
+
+    def test_unknown_jitter_raises_error(self):
+        with self.assertRaises(InvalidRetryModeError):
+            retryhandler.create_jittered_delay_function(
+                'bogus', base=1, growth_factor=2)
+
+
+class TestRetryQuota(unittest.TestCase):
+
+    def test_acquire_until_drained(self):
+        quota = retryhandler.RetryQuota(capacity=10, retry_cost=5)
+        self.assertTrue(quota.acquire())
+        self.assertTrue(quota.acquire())
+        self.assertFalse(quota.acquire())
+        self.assertEqual(quota.available, 0)
+
+    def test_connection_errors_cost_more(self):
+        quota = retryhandler.RetryQuota(capacity=10, retry_cost=5,
+                                        timeout_retry_cost=10)
+        self.assertTrue(quota.acquire(ConnectionError()))
+        self.assertEqual(quota.available, 0)
+
+    def test_release_refunds_retry_cost(self):
+        quota = retryhandler.RetryQuota(capacity=10, retry_cost=5)
+        quota.acquire()
+        quota.release(attempts=2)
+        self.assertEqual(quota.available, 10)
+
+    def test_release_never_exceeds_capacity(self):
+        quota = retryhandler.RetryQuota(capacity=10)
+        quota.release(attempts=1)
+        self.assertEqual(quota.available, 10)
+
+
+class TestClientRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0
+        self.time_patch = mock.patch('time.monotonic', lambda: self.now)
+        self.time_patch.start()
+        self.limiter = retryhandler.ClientRateLimiter()
+
+    def tearDown(self):
+        self.time_patch.stop()
+
+    @async_test
+    def test_disabled_until_throttled(self):
+        for _ in range(100):
+            yield from self.limiter.acquire()
+        self.assertFalse(self.limiter.enabled)
+        self.limiter.update(throttled=False)
+        self.assertIsNone(self.limiter.fill_rate)
+
+    @async_test
+    def test_throttle_decreases_rate_multiplicatively(self):
+        for _ in range(100):
+            yield from self.limiter.acquire()
+        self.now = 1
+        self.limiter.update(throttled=True)
+        self.assertTrue(self.limiter.enabled)
+        # 100 requests in one second, cut back by the decrease factor.
+        self.assertAlmostEqual(self.limiter.fill_rate, 70)
+        self.limiter.update(throttled=True)
+        self.assertAlmostEqual(self.limiter.fill_rate, 49)
+
+    @async_test
+    def test_success_increases_rate_additively(self):
+        for _ in range(10):
+            yield from self.limiter.acquire()
+        self.now = 1
+        self.limiter.update(throttled=True)
+        rate = self.limiter.fill_rate
+        self.now = 2
+        self.limiter.update(throttled=False)
+        self.assertAlmostEqual(self.limiter.fill_rate,
+                               rate + self.limiter.increment)
+
+    @async_test
+    def test_many_fast_successes_increase_rate_linearly(self):
+        @asyncio.coroutine
+        def sleep(delay):
+            # Always moves on, like a real clock, even when the delay is
+            # lost to rounding.
+            self.now += max(delay, 1e-6)
+
+        for _ in range(100):
+            yield from self.limiter.acquire()
+        self.now = 1
+        self.limiter.update(throttled=True)
+        rate = self.limiter.fill_rate
+        with mock.patch.object(retryhandler.asyncio, 'sleep', sleep):
+            # Send as fast as the limiter allows, every response a
+            # success, for 20 seconds.
+            while self.now < 21:
+                yield from self.limiter.acquire()
+                self.limiter.update(throttled=False)
+        # Hundreds of successes, but the rate rose by ``increment`` per
+        # second.
+        self.assertAlmostEqual(self.limiter.fill_rate,
+                               rate + 20 * self.limiter.increment, delta=1)
+
+    @async_test
+    def test_rate_capped_by_measured_send_rate(self):
+        for _ in range(10):
+            yield from self.limiter.acquire()
+        self.now = 1
+        self.limiter.update(throttled=True)
+        # Successes keep coming for a minute, but nothing more is sent.
+        for _ in range(60):
+            self.now += 1
+            self.limiter.update(throttled=False)
+        # Without the cap it would be 7 + 60 * 0.5 requests per second,
+        # over twice the 10 requests per second ever sent.
+        self.assertLessEqual(self.limiter.fill_rate, 2 * 10)
+
+    def test_rate_never_below_minimum(self):
+        self.limiter.update(throttled=True)
+        self.assertEqual(self.limiter.fill_rate, self.limiter.min_rate)
+
+
+class TestAdaptiveRetryHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.quota = retryhandler.RetryQuota(capacity=10, retry_cost=5)
+        self.rate_limiter = mock.Mock()
+        checker = retryhandler.MaxAttemptsDecorator(
+            retryhandler.ServiceErrorCodeChecker(400, 'Throttling'),
+            max_attempts=5)
+        self.handler = retryhandler.AdaptiveRetryHandler(
+            checker, lambda attempts: 1, self.quota, self.rate_limiter)
+        self.throttled = (HTTP_400_RESPONSE, {'Error': {'Code': 'Throttling'}})
+
+    @async_test
+    def test_retry_stops_when_quota_drained(self):
+        self.assertEqual((yield from self.handler(
+            response=self.throttled, attempts=1, caught_exception=None)), 1)
+        self.assertEqual((yield from self.handler(
+            response=self.throttled, attempts=1, caught_exception=None)), 1)
+        self.assertIsNone((yield from self.handler(
+            response=self.throttled, attempts=1, caught_exception=None)))
+
+    @async_test
+    def test_success_refills_quota(self):
+        yield from self.handler(
+            response=self.throttled, attempts=1, caught_exception=None)
+        yield from self.handler(
+            response=(HTTP_200_RESPONSE, {}), attempts=2,
+            caught_exception=None)
+        self.assertEqual(self.quota.available, 10)
+
+    @async_test
+    def test_rate_limiter_told_about_throttling(self):
+        yield from self.handler(
+            response=self.throttled, attempts=1, caught_exception=None)
+        self.rate_limiter.update.assert_called_with(True)
+        yield from self.handler(
+            response=(HTTP_200_RESPONSE, {}), attempts=2,
+            caught_exception=None)
+        self.rate_limiter.update.assert_called_with(False)
+
+    def test_create_adaptive_retry_handler(self):
+        config = {
+            '__default__': {
+                'max_attempts': 5,
+                'delay': {'type': 'exponential', 'base': 'rand',
+                          'growth_factor': 2},
+                'policies': {
+                    'throttling': {
+                        'applies_when': {'response': {
+                            'service_error_code': 'Throttling',
+                            'http_status_code': 400}}
+                    }
+                }
+            }
+        }
+        handler = retryhandler.create_adaptive_retry_handler(
+            config, jitter='decorrelated')
+        self.assertIsInstance(handler, retryhandler.AdaptiveRetryHandler)
+        self.assertIsInstance(handler.retry_quota, retryhandler.RetryQuota)
+
+
+class TestIsThrottlingError(unittest.TestCase):
+
+    def test_throttling_error_code(self):
+        self.assertTrue(retryhandler.is_throttling_error(
+            (HTTP_400_RESPONSE,
+             {'Error': {'Code': 'ProvisionedThroughputExceededException'}})))
+
+    def test_429_status_code(self):
+        response = mock.Mock()
+        response.status_code = 429
+        self.assertTrue(retryhandler.is_throttling_error((response, {})))
+
+    def test_other_errors_are_not_throttling(self):
+        self.assertFalse(retryhandler.is_throttling_error(
+            (HTTP_500_RESPONSE, {'Error': {'Code': 'InternalError'}})))
+        self.assertFalse(retryhandler.is_throttling_error(
+            None, caught_exception=ConnectionError()))
+
+
 if __name__ == "__main__":
     unittest.main()
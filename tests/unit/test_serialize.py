@@ -17,6 +17,7 @@ spec.  This can happen for a number of reasons:
 # asyncio.
 #
 import os, sys
+import io
 import logging
 import base64
 import json
@@ -24,6 +25,8 @@ import datetime
 import dateutil.tz
 import unittest
 
+import mock
+
 from yieldfrom.botocore.model import ServiceModel
 from yieldfrom.botocore import serialize
 
@@ -130,7 +133,7 @@ class TestBinaryTypesWithRestXML(BaseModelWithBlob):
         }
 
     def test_blob_serialization_with_file_like_object(self):
-        body = six.BytesIO(b'foobar')
+        body = io.BytesIO(b'foobar')
         request = self.serialize_to_request(input_params={'Blob': body})
         self.assertEqual(request['body'], body)
 
@@ -265,3 +268,102 @@ class TestJSONTimestampSerialization(unittest.TestCase):
         body = json.loads(self.serialize_to_request(
             {'Timestamp': '1970-01-01'})['body'].decode('utf-8'))
         self.assertEqual(body['Timestamp'], 0)
+
+
+class TestCompiledSerializers(unittest.TestCase):
+    def setUp(self):
+        self.model = {
+            'metadata': {'protocol': 'query', 'apiVersion': '2014-01-01'},
+            'documentation': '',
+            'operations': {
+                'TestOperation': {
+                    'name': 'TestOperation',
+                    'http': {
+                        'method': 'POST',
+                        'requestUri': '/',
+                    },
+                    'input': {'shape': 'InputShape'},
+                }
+            },
+            'shapes': {
+                'InputShape': {
+                    'type': 'structure',
+                    'members': {
+                        'Name': {'shape': 'StringType'},
+                        'Children': {'shape': 'NodeList'},
+                        'Tags': {'shape': 'TagMap'},
+                    }
+                },
+                'Node': {
+                    'type': 'structure',
+                    'members': {
+                        'Name': {'shape': 'StringType'},
+                        'Children': {'shape': 'NodeList'},
+                    }
+                },
+                'NodeList': {
+                    'type': 'list',
+                    'member': {'shape': 'Node'},
+                },
+                'TagMap': {
+                    'type': 'map',
+                    'key': {'shape': 'StringType'},
+                    'value': {'shape': 'StringType'},
+                },
+                'StringType': {
+                    'type': 'string',
+                }
+            }
+        }
+        self.service_model = ServiceModel(self.model)
+        self.operation_model = self.service_model.operation_model(
+            'TestOperation')
+        self.params = {
+            'Name': 'a',
+            'Children': [{'Name': 'b', 'Children': [{'Name': 'c'}]}],
+            'Tags': {'k': 'v'},
+        }
+
+    def test_recursive_shapes(self):
+        serializer = serialize.QuerySerializer()
+        body = serializer.serialize_to_request(
+            self.params, self.operation_model)['body']
+        self.assertEqual(body, {
+            'Action': 'TestOperation',
+            'Version': '2014-01-01',
+            'Name': 'a',
+            'Children.member.1.Name': 'b',
+            'Children.member.1.Children.member.1.Name': 'c',
+            'Tags.entry.1.key': 'k',
+            'Tags.entry.1.value': 'v',
+        })
+
+    def test_shape_compiled_once_per_serializer_class(self):
+        serializer = serialize.JSONSerializer()
+        self.model['metadata'].update(targetPrefix='Test', jsonVersion='1.0')
+        with mock.patch.object(
+                serialize.JSONSerializer, '_compile_shape',
+                wraps=serializer._compile_shape) as compile_shape:
+            first = serializer.serialize_to_request(
+                self.params, self.operation_model)
+            calls = compile_shape.call_count
+            self.assertTrue(calls > 0)
+            second = serialize.JSONSerializer().serialize_to_request(
+                self.params, self.operation_model)
+            self.assertEqual(compile_shape.call_count, calls)
+        self.assertEqual(first, second)
+        self.assertEqual(json.loads(first['body'].decode('utf-8')),
+                         self.params)
+
+    def test_overridden_serializers_are_used(self):
+        class UpperCaseSerializer(serialize.QuerySerializer):
+            def _default_serialize(self, serialized, value, shape,
+                                   prefix=''):
+                serialized[prefix] = value.upper()
+
+        body = UpperCaseSerializer().serialize_to_request(
+            {'Name': 'a'}, self.operation_model)['body']
+        self.assertEqual(body['Name'], 'A')
+        body = serialize.QuerySerializer().serialize_to_request(
+            {'Name': 'a'}, self.operation_model)['body']
+        self.assertEqual(body['Name'], 'a')
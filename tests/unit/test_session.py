@@ -465,6 +465,49 @@ class TestCreateClient(BaseSessionTest):
         ec2_client = yield from self.session.create_client('ec2')
         self.assertEqual(ec2_client.meta.region_name, 'moon-west-1')
 
+    @async_test
+    def test_client_classes_not_cached_by_default(self):
+        first = yield from self.session.create_client('ec2', 'us-west-2')
+        second = yield from self.session.create_client('ec2', 'us-west-2')
+        self.assertIsNot(first.__class__, second.__class__)
+
+    @async_test
+    def test_clients_reuse_cached_client_class(self):
+        self.session.register_component('client_class_cache',
+                                        client.ClientClassCache())
+        first = yield from self.session.create_client('ec2', 'us-west-2')
+        second = yield from self.session.create_client('ec2', 'us-east-1')
+        self.assertIs(first.__class__, second.__class__)
+        self.assertIs(first.meta.service_model, second.meta.service_model)
+
+    @async_test
+    def test_client_class_cache_can_be_invalidated(self):
+        self.session.register_component('client_class_cache',
+                                        client.ClientClassCache())
+        first = yield from self.session.create_client('ec2', 'us-west-2')
+        self.session.get_component('client_class_cache').invalidate('ec2')
+        second = yield from self.session.create_client('ec2', 'us-west-2')
+        self.assertIsNot(first.__class__, second.__class__)
+
+    @async_test
+    def test_handler_registered_after_first_client_runs(self):
+        self.session.register_component('client_class_cache',
+                                        client.ClientClassCache())
+        yield from self.session.create_client('ec2', 'us-west-2')
+
+        class Mixin(object):
+            pass
+
+        def add_mixin(base_classes, **kwargs):
+            base_classes.insert(0, Mixin)
+
+        self.session.register('creating-client-class.ec2', add_mixin)
+        second = yield from self.session.create_client('ec2', 'us-west-2')
+        self.assertIsInstance(second, Mixin)
+        self.session.unregister('creating-client-class.ec2', add_mixin)
+        third = yield from self.session.create_client('ec2', 'us-west-2')
+        self.assertNotIsInstance(third, Mixin)
+
 
 if __name__ == "__main__":
     unittest.main()
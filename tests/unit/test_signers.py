@@ -21,6 +21,7 @@ os.environ['PYTHONASYNCIODEBUG'] = '1'
 import logging
 logging.basicConfig(level=logging.DEBUG)
 
+import io
 import mock
 import sys
 import asyncio
@@ -36,6 +37,8 @@ from yieldfrom.botocore.credentials import Credentials
 from yieldfrom.botocore.exceptions import NoRegionError, UnknownSignatureVersionError, \
     UnsupportedSignatureVersionError, ParamValidationError, UnknownClientMethodError
 from yieldfrom.botocore.signers import RequestSigner, S3PostPresigner
+from yieldfrom.botocore.awsrequest import AWSRequest
+from yieldfrom.botocore.utils import PayloadHasher
 
 import unittest
 
@@ -169,6 +172,30 @@ class TestSigner(BaseSignerTest):
 
         auth.assert_not_called()
 
+    @async_test
+    def test_payload_hashed_by_payload_hasher(self):
+        hasher = PayloadHasher(threshold=4)
+        self.signer = RequestSigner(
+            'service_name', 'region_name', 'signing_name', 'v4',
+            self.credentials, self.emitter, payload_hasher=hasher)
+        self.emitter.emit.return_value = future_wrapped((None, ))
+        request = AWSRequest(method='PUT', url='https://example.com/',
+                             data=io.BytesIO(b'hello world'))
+        auth = yieldfrom.botocore.auth.SigV4Auth(
+            self.credentials, 'signing_name', 'region_name')
+        expected = auth.payload(request)
+
+        with mock.patch.object(hasher, 'run', wraps=hasher.run) as run:
+            with mock.patch.object(yieldfrom.botocore.auth.SigV4Auth,
+                                   '_hash_payload',
+                                   wraps=auth._hash_payload) as hash_payload:
+                yield from self.signer.sign('operation_name', request)
+        # Hashed once, in the executor, not again by add_auth.
+        run.assert_called_once_with(mock.ANY, request.body)
+        self.assertEqual(hash_payload.call_count, 1)
+        self.assertEqual(request.context['payload_sha256'][2], expected)
+        self.assertIn('Authorization', request.headers)
+
     def test_generate_presigned_url(self):
         auth = mock.Mock()
         auth.REQUIRES_REGION = True
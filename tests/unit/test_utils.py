@@ -17,9 +17,13 @@
 # asyncio.
 #
 import os
+import sys
 import logging
 import unittest
 import io
+import mmap
+import tempfile
+import threading
 import mock
 from dateutil.tz import tzutc, tzoffset
 import datetime
@@ -39,10 +43,16 @@ from yieldfrom.botocore.utils import CachedProperty
 from yieldfrom.botocore.utils import ArgumentGenerator
 from yieldfrom.botocore.utils import calculate_tree_hash
 from yieldfrom.botocore.utils import calculate_sha256
+from yieldfrom.botocore.utils import calculate_glacier_checksums
+from yieldfrom.botocore.utils import combine_tree_hashes
 from yieldfrom.botocore.utils import is_valid_endpoint_url
+from yieldfrom.botocore.utils import PayloadHasher
 from yieldfrom.botocore.model import DenormalizedStructureBuilder
 from yieldfrom.botocore.model import ShapeResolver
 
+sys.path.append('..')
+from asyncio_test_utils import async_test
+
 os.environ['PYTHONASYNCIODEBUG'] = '1'
 logging.basicConfig(level=logging.DEBUG)
 
@@ -472,6 +482,97 @@ class TestTreeHash(unittest.TestCase):
             '12f3cbd6101b981cde074039f6f728071da8879d6f632de8afc7cdf00661b08f')
 
 
+class TestGlacierChecksums(unittest.TestCase):
+    def setUp(self):
+        # 5 leaves and a bit: an uneven tree with a carried up node.
+        self.data = b''.join(bytes([i]) * (1024 * 1024) for i in range(5))
+        self.data += b'tail'
+        self.expected = (calculate_sha256(io.BytesIO(self.data), as_hex=True),
+                         calculate_tree_hash(io.BytesIO(self.data)))
+
+    def test_file_like_object(self):
+        self.assertEqual(calculate_glacier_checksums(io.BytesIO(self.data)),
+                         self.expected)
+
+    def test_bytes(self):
+        self.assertEqual(calculate_glacier_checksums(self.data),
+                         self.expected)
+
+    def test_mmap_from_current_position(self):
+        with tempfile.TemporaryFile() as f:
+            f.write(b'skipped' + self.data)
+            f.flush()
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                mapped.seek(len(b'skipped'))
+                self.assertEqual(calculate_glacier_checksums(mapped),
+                                 self.expected)
+                self.assertEqual(mapped.tell(), len(mapped))
+            finally:
+                mapped.close()
+
+    def test_empty_body(self):
+        empty_hash = (
+            'e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855')
+        self.assertEqual(calculate_glacier_checksums(io.BytesIO(b'')),
+                         (empty_hash, empty_hash))
+
+
+class TestCombineTreeHashes(unittest.TestCase):
+    def setUp(self):
+        # 7 leaves and a bit, so the last part of any size is partial.
+        self.data = b''.join(bytes([i]) * (1024 * 1024) for i in range(7))
+        self.data += b'tail'
+
+    def part_tree_hashes(self, part_size):
+        return [calculate_tree_hash(io.BytesIO(self.data[i:i + part_size]))
+                for i in range(0, len(self.data), part_size)]
+
+    def test_matches_tree_hash_of_whole_archive(self):
+        expected = calculate_tree_hash(io.BytesIO(self.data))
+        for megabytes in [1, 2, 4, 8]:
+            part_size = megabytes * 1024 * 1024
+            self.assertEqual(
+                combine_tree_hashes(self.part_tree_hashes(part_size),
+                                    part_size),
+                expected)
+
+    def test_invalid_part_size(self):
+        for part_size in [0, 1024, 3 * 1024 * 1024, 1024 * 1024 + 1]:
+            with self.assertRaises(ValueError):
+                combine_tree_hashes([], part_size)
+
+
+class TestPayloadHasher(unittest.TestCase):
+    def test_offloads_bodies_from_threshold(self):
+        hasher = PayloadHasher(threshold=4)
+        self.assertFalse(hasher.should_offload(b'abc'))
+        self.assertTrue(hasher.should_offload(b'abcd'))
+        self.assertTrue(hasher.should_offload('abcd'))
+
+    def test_file_size_counted_from_current_position(self):
+        hasher = PayloadHasher(threshold=4)
+        body = io.BytesIO(b'abcdef')
+        self.assertTrue(hasher.should_offload(body))
+        body.seek(3)
+        self.assertFalse(hasher.should_offload(body))
+        self.assertEqual(body.tell(), 3)
+
+    def test_offloads_bodies_of_unknown_size(self):
+        self.assertTrue(PayloadHasher().should_offload(object()))
+
+    @async_test
+    def test_run_in_executor(self):
+        hasher = PayloadHasher()
+        thread = yield from hasher.run(threading.current_thread)
+        self.assertIsNot(thread, threading.current_thread())
+        digest = yield from hasher.run(calculate_sha256,
+                                       io.BytesIO(b'hello world'), True)
+        self.assertEqual(
+            digest,
+            'b94d27b9934d3e08a52e52d7da7dabfac484efe37a5380ee9088f7ace2efcde9')
+
+
 class TestIsValidEndpointURL(unittest.TestCase):
     def test_dns_name_is_valid(self):
         self.assertTrue(is_valid_endpoint_url('https://s3.amazonaws.com/'))
@@ -10,8 +10,12 @@ from datetime import datetime
 import decimal
 import io
 
+import mock
+
 from yieldfrom.botocore.model import ShapeResolver
 from yieldfrom.botocore.validate import ParamValidator
+from yieldfrom.botocore.validate import ParamValidationDecorator
+from yieldfrom.botocore.serialize import create_serializer
 
 os.environ['PYTHONASYNCIODEBUG'] = '1'
 logging.basicConfig(level=logging.DEBUG)
@@ -463,3 +467,86 @@ class TestValidateTypeBlob(BaseTestValidate):
                 'Invalid type for parameter Blob',
             ]
         )
+
+
+class TestValidationLevels(BaseTestValidate):
+    def setUp(self):
+        self.shapes = {
+            'Input': {
+                'type': 'structure',
+                'required': ['Name'],
+                'members': {
+                    'Name': {'shape': 'NameType'},
+                    'Count': {'shape': 'CountType'},
+                    'When': {'shape': 'TimestampType'},
+                    'Next': {'shape': 'Input'},
+                }
+            },
+            'NameType': {'type': 'string', 'min': 2, 'max': 4},
+            'CountType': {'type': 'integer', 'min': 1},
+            'TimestampType': {'type': 'timestamp'},
+        }
+        self.input_shape = ShapeResolver(self.shapes).get_shape_by_name(
+            'Input')
+
+    def validate(self, params, level):
+        validator = ParamValidator(level=level)
+        return validator.validate(params, self.input_shape).generate_report()
+
+    def test_full_checks_constraints_of_recursive_shapes(self):
+        report = self.validate(
+            {'Name': 'abcde', 'Next': {'Name': 'a', 'Count': 0}}, 'full')
+        self.assertEqual(report.splitlines(), [
+            'Invalid length for parameter Name, value: 5, '
+            'valid range: 2-4',
+            'Invalid length for parameter Next.Name, value: 1, '
+            'valid range: 2-4',
+            'Invalid range for parameter Next.Count, value: 0, '
+            'valid range: 1-inf',
+        ])
+
+    def test_type_only_skips_constraints(self):
+        report = self.validate(
+            {'Name': 'abcde', 'Count': 0, 'When': 'not a timestamp',
+             'Next': {'Name': 'a'}}, 'type-only')
+        self.assertEqual(report, '')
+
+    def test_type_only_checks_types_and_structure(self):
+        report = self.validate(
+            {'Count': 'one', 'Other': 1, 'Next': {'Name': 1}}, 'type-only')
+        self.assertIn('Missing required parameter in input: "Name"', report)
+        self.assertIn('Unknown parameter in input: "Other"', report)
+        self.assertIn('Invalid type for parameter Count', report)
+        self.assertIn('Invalid type for parameter Next.Name', report)
+
+    def test_off_does_not_validate(self):
+        self.assertEqual(self.validate({'Name': 1, 'Other': 1}, 'off'), '')
+
+    def test_invalid_level(self):
+        with self.assertRaises(ValueError):
+            ParamValidator(level='some')
+
+    def test_validator_compiled_once_per_shape(self):
+        validator = ParamValidator()
+        with mock.patch.object(ParamValidator, '_compile_shape',
+                               wraps=validator._compile_shape) as compile:
+            validator.validate({'Name': 'abc'}, self.input_shape)
+            ParamValidator().validate({'Name': 'abcd'}, self.input_shape)
+        self.assertEqual(compile.call_count, 5)
+
+    def test_overridden_validate_method_is_used(self):
+        class StrictCounts(ParamValidator):
+            def _validate_integer(self, param, shape, errors, name):
+                errors.report(name, 'invalid range', param=param,
+                              valid_range=[1, 1])
+        report = StrictCounts().validate(
+            {'Name': 'abc', 'Count': 2}, self.input_shape).generate_report()
+        self.assertIn('Invalid range for parameter Count', report)
+
+    def test_create_serializer_without_validation(self):
+        self.assertIsInstance(create_serializer('json'),
+                              ParamValidationDecorator)
+        for kwargs in [{'include_validation': False},
+                       {'validation_level': 'off'}]:
+            serializer = create_serializer('json', **kwargs)
+            self.assertNotIsInstance(serializer, ParamValidationDecorator)
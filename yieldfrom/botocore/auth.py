@@ -12,6 +12,7 @@
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
 
+import asyncio
 import base64
 import datetime
 from hashlib import sha256
@@ -26,6 +27,7 @@ import calendar
 import json
 
 from .exceptions import NoCredentialsError
+from .streaming import AsyncRequestBody
 from .utils import normalize_url_path, percent_encode_sequence
 from .compat import HTTPHeaders
 from urllib.parse import quote, unquote, urlsplit, parse_qs, urlunsplit
@@ -40,6 +42,9 @@ EMPTY_SHA256_HASH = (
 # Experimenting with various buffer sizes showed that this value generally
 # gave the best result (in terms of performance).
 PAYLOAD_BUFFER = 1024 * 1024
+# The payload hash of requests with aws-chunked bodies, see
+# ``S3SigV4Auth``.
+STREAMING_PAYLOAD = 'STREAMING-AWS4-HMAC-SHA256-PAYLOAD'
 ISO8601 = '%Y-%m-%dT%H:%M:%SZ'
 SIGV4_TIMESTAMP = '%Y%m%dT%H%M%SZ'
 
@@ -50,6 +55,17 @@ class BaseSigner(object):
     def add_auth(self, request):
         raise NotImplementedError("add_auth")
 
+    @asyncio.coroutine
+    def hash_payload(self, request, payload_hasher):
+        """Hash the request body ahead of ``add_auth``, if it needs to be.
+
+        ``add_auth`` runs on the event loop, so signers that hash the body
+        do it here first with ``payload_hasher``
+        (a :class:`~botocore.utils.PayloadHasher`) when it's large.
+
+        """
+        pass
+
 
 class SigV2Auth(BaseSigner):
     """
@@ -138,6 +154,12 @@ class SigV3Auth(BaseSigner):
         request.headers['X-Amzn-Authorization'] = signature
 
 
+def _payload_position(body):
+    if hasattr(body, 'seek'):
+        return body.tell()
+    return None
+
+
 class SigV4Auth(BaseSigner):
     """
     Sign a request with Signature V4.
@@ -151,6 +173,8 @@ class SigV4Auth(BaseSigner):
         # later for real requests.
         self._region_name = region_name
         self._service_name = service_name
+        # The last signing key derived, see ``_signing_key``.
+        self._cached_signing_key = None
 
     def _sign(self, key, msg, hex=False):
         if hex:
@@ -215,51 +239,84 @@ class SigV4Auth(BaseSigner):
         case, sorting them in alphabetical order and then joining
         them into a string, separated by newlines.
         """
+        return self._canonicalize_headers(headers_to_sign)[0]
+
+    def signed_headers(self, headers_to_sign):
+        return self._canonicalize_headers(headers_to_sign)[1]
+
+    def _canonicalize_headers(self, headers_to_sign):
+        # Returns both the canonical headers and the signed headers from a
+        # single sort of the header names.
         headers = []
         sorted_header_names = sorted(set(headers_to_sign))
         for key in sorted_header_names:
             value = ','.join(v.strip() for v in
                              sorted(headers_to_sign.get_all(key)))
             headers.append('%s:%s' % (key, value))
-        return '\n'.join(headers)
-
-    def signed_headers(self, headers_to_sign):
-        l = ['%s' % n.lower().strip() for n in set(headers_to_sign)]
-        l = sorted(l)
-        return ';'.join(l)
+        signed_headers = sorted(n.lower().strip()
+                                for n in sorted_header_names)
+        return '\n'.join(headers), ';'.join(signed_headers)
 
     def payload(self, request):
-        if request.body and hasattr(request.body, 'seek'):
-            position = request.body.tell()
-            read_chunksize = functools.partial(request.body.read,
-                                               PAYLOAD_BUFFER)
+        body = request.body
+        hashed = request.context.get('payload_sha256')
+        if hashed is not None and hashed[:2] == (
+                body, _payload_position(body)):
+            # Already hashed by ``hash_payload``.
+            return hashed[2]
+        return self._hash_payload(body)
+
+    def _hash_payload(self, body):
+        if body and hasattr(body, 'seek'):
+            position = body.tell()
+            read_chunksize = functools.partial(body.read, PAYLOAD_BUFFER)
             checksum = sha256()
             for chunk in iter(read_chunksize, b''):
                 checksum.update(chunk)
             hex_checksum = checksum.hexdigest()
-            request.body.seek(position)
+            body.seek(position)
             return hex_checksum
-        elif request.body:
+        elif body:
             # The request serialization has ensured that
             # request.body is a bytes() type.
-            return sha256(request.body).hexdigest()
+            return sha256(body).hexdigest()
         else:
             return EMPTY_SHA256_HASH
 
+    @asyncio.coroutine
+    def hash_payload(self, request, payload_hasher):
+        body = request.body
+        if not body or self.__class__.payload is not SigV4Auth.payload or \
+                isinstance(body, AsyncRequestBody) or \
+                not payload_hasher.should_offload(body):
+            # Small bodies are left for ``payload`` to hash in place.
+            return
+        position = _payload_position(body)
+        hex_checksum = yield from payload_hasher.run(self._hash_payload, body)
+        # ``payload`` uses this for as long as the request has the same
+        # body, at the same position.
+        request.context['payload_sha256'] = (body, position, hex_checksum)
+
     def canonical_request(self, request):
+        return self._canonical_request(request)[0]
+
+    def _canonical_request(self, request):
+        # Returns the canonical request and its signed headers, which
+        # ``add_auth`` needs again for the Authorization header.
         cr = [request.method.upper()]
         path = self._normalize_url_path(urlsplit(request.url).path)
         cr.append(path)
         cr.append(self.canonical_query_string(request))
-        headers_to_sign = self.headers_to_sign(request)
-        cr.append(self.canonical_headers(headers_to_sign) + '\n')
-        cr.append(self.signed_headers(headers_to_sign))
+        canonical_headers, signed_headers = self._canonicalize_headers(
+            self.headers_to_sign(request))
+        cr.append(canonical_headers + '\n')
+        cr.append(signed_headers)
         if 'X-Amz-Content-SHA256' in request.headers:
             body_checksum = request.headers['X-Amz-Content-SHA256']
         else:
             body_checksum = self.payload(request)
         cr.append(body_checksum)
-        return '\n'.join(cr)
+        return '\n'.join(cr), signed_headers
 
     def _normalize_url_path(self, path):
         normalized_path = quote(normalize_url_path(path), safe='/~')
@@ -294,13 +351,27 @@ class SigV4Auth(BaseSigner):
         return '\n'.join(sts)
 
     def signature(self, string_to_sign, request):
-        key = self.credentials.secret_key
-        k_date = self._sign(('AWS4' + key).encode('utf-8'),
-                            request.context['timestamp'][0:8])
+        k_signing = self._signing_key(request.context['timestamp'][0:8])
+        return self._sign(k_signing, string_to_sign, hex=True)
+
+    def _signing_key(self, datestamp):
+        # Deriving the signing key takes four HMACs, but the key only
+        # changes with the secret key, the day and the scope, so the last
+        # one derived is reused.  The secret key is part of the cache key,
+        # so credentials that are refreshed or rotated get a new signing
+        # key on their first request.
+        secret_key = self.credentials.secret_key
+        cache_key = (secret_key, datestamp, self._region_name,
+                     self._service_name)
+        cached = self._cached_signing_key
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+        k_date = self._sign(('AWS4' + secret_key).encode('utf-8'), datestamp)
         k_region = self._sign(k_date, self._region_name)
         k_service = self._sign(k_region, self._service_name)
         k_signing = self._sign(k_service, 'aws4_request')
-        return self._sign(k_signing, string_to_sign, hex=True)
+        self._cached_signing_key = (cache_key, k_signing)
+        return k_signing
 
     def add_auth(self, request):
         if self.credentials is None:
@@ -310,7 +381,7 @@ class SigV4Auth(BaseSigner):
         # This could be a retry.  Make sure the previous
         # authorization header is removed first.
         self._modify_request_before_signing(request)
-        canonical_request = self.canonical_request(request)
+        canonical_request, signed_headers = self._canonical_request(request)
         logger.debug("Calculating signature using v4 auth.")
         logger.debug('CanonicalRequest:\n%s', canonical_request)
         string_to_sign = self.string_to_sign(request, canonical_request)
@@ -318,12 +389,14 @@ class SigV4Auth(BaseSigner):
         signature = self.signature(string_to_sign, request)
         logger.debug('Signature:\n%s', signature)
 
-        self._inject_signature_to_request(request, signature)
+        self._inject_signature_to_request(request, signature, signed_headers)
 
-    def _inject_signature_to_request(self, request, signature):
+    def _inject_signature_to_request(self, request, signature,
+                                     signed_headers=None):
         l = ['AWS4-HMAC-SHA256 Credential=%s' % self.scope(request)]
-        headers_to_sign = self.headers_to_sign(request)
-        l.append('SignedHeaders=%s' % self.signed_headers(headers_to_sign))
+        if signed_headers is None:
+            signed_headers = self.signed_headers(self.headers_to_sign(request))
+        l.append('SignedHeaders=%s' % signed_headers)
         l.append('Signature=%s' % signature)
         request.headers['Authorization'] = ', '.join(l)
         return request
@@ -356,12 +429,58 @@ class SigV4Auth(BaseSigner):
 
 
 class S3SigV4Auth(SigV4Auth):
+    """
+    Sign an S3 request with Signature V4.
+
+    An ``AsyncRequestBody`` can't be hashed before it is sent, so it is
+    sent ``aws-chunked`` instead, with a signature for every chunk that
+    chains from the signature of the request.
+    """
 
     def _modify_request_before_signing(self, request):
         super(S3SigV4Auth, self)._modify_request_before_signing(request)
         if 'X-Amz-Content-SHA256' in request.headers:
             del request.headers['X-Amz-Content-SHA256']
-        request.headers['X-Amz-Content-SHA256'] = self.payload(request)
+        body = request.body
+        if isinstance(body, AsyncRequestBody):
+            self._set_chunked_headers(request, body)
+            request.headers['X-Amz-Content-SHA256'] = STREAMING_PAYLOAD
+        else:
+            request.headers['X-Amz-Content-SHA256'] = self.payload(request)
+
+    def _set_chunked_headers(self, request, body):
+        content_encoding = request.headers.get('Content-Encoding')
+        if content_encoding is None:
+            request.headers['Content-Encoding'] = 'aws-chunked'
+        elif not content_encoding.startswith('aws-chunked'):
+            del request.headers['Content-Encoding']
+            request.headers['Content-Encoding'] = \
+                'aws-chunked,' + content_encoding
+        if 'X-Amz-Decoded-Content-Length' in request.headers:
+            del request.headers['X-Amz-Decoded-Content-Length']
+        request.headers['X-Amz-Decoded-Content-Length'] = \
+            str(body.content_length)
+
+    def _inject_signature_to_request(self, request, signature,
+                                     signed_headers=None):
+        super(S3SigV4Auth, self)._inject_signature_to_request(
+            request, signature, signed_headers)
+        body = request.body
+        if isinstance(body, AsyncRequestBody):
+            timestamp = request.context['timestamp']
+            body.sign_chunks(
+                functools.partial(self._chunk_signature,
+                                  self._signing_key(timestamp[0:8]),
+                                  timestamp, self.credential_scope(request)),
+                signature)
+        return request
+
+    def _chunk_signature(self, signing_key, timestamp, scope,
+                         previous_signature, data):
+        sts = ['AWS4-HMAC-SHA256-PAYLOAD', timestamp, scope,
+               previous_signature, EMPTY_SHA256_HASH,
+               sha256(data).hexdigest()]
+        return self._sign(signing_key, '\n'.join(sts), hex=True)
 
     def _normalize_url_path(self, path):
         # For S3, we do not normalize the path.
@@ -429,7 +548,8 @@ class SigV4QueryAuth(SigV4Auth):
         new_url_parts = (p[0], p[1], p[2], new_query_string, p[4])
         request.url = urlunsplit(new_url_parts)
 
-    def _inject_signature_to_request(self, request, signature):
+    def _inject_signature_to_request(self, request, signature,
+                                     signed_headers=None):
         # Rather than calculating an "Authorization" header, for the query
         # param quth, we just append an 'X-Amz-Signature' param to the end
         # of the query string.
@@ -12,25 +12,60 @@
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
 import sys
+import time
 import logging
 import functools
 import inspect
 import asyncio
+import mmap
 
 from yieldfrom.requests import models
 from yieldfrom.requests.sessions import REDIRECT_STATI
+from yieldfrom.http.client import NotConnected
 from .compat import HTTPHeaders, HTTPResponse, urlunsplit, urlsplit
 from .utils import percent_encode_sequence
 from .exceptions import UnseekableStreamError
+from .streaming import AsyncRequestBody
 from yieldfrom.urllib3.connection import VerifiedHTTPSConnection
 from yieldfrom.urllib3.connection import HTTPConnection
+from yieldfrom.urllib3 import connectionpool
 from yieldfrom.urllib3.connectionpool import HTTPConnectionPool
 from yieldfrom.urllib3.connectionpool import HTTPSConnectionPool
+from yieldfrom.urllib3.exceptions import ClosedPoolError, EmptyPoolError
+from yieldfrom.urllib3.poolmanager import PoolManager, SSL_KEYWORDS
 
 from . import request_sessions_fixer
 
 logger = logging.getLogger(__name__)
 
+# The size of the reads off an AsyncRequestBody being sent.
+ASYNC_BODY_BLOCKSIZE = 64 * 1024
+# The size of the slices of in memory bodies handed to the transport.
+# The transport is drained after every slice, so at most one slice of a
+# body is in its buffer at a time.
+SEND_SLICE_SIZE = 256 * 1024
+# The number of seconds a blocking connection pool waits for a
+# connection to be released.
+DEFAULT_POOL_TIMEOUT = 60
+
+
+def _body_view(body):
+    # A byte memoryview of what reading ``body`` would return, so it can
+    # be sent without copying, or None.  Streams are viewed from their
+    # current position.
+    if isinstance(body, (bytes, bytearray, memoryview)):
+        view = memoryview(body)
+    elif isinstance(body, mmap.mmap):
+        view = memoryview(body)[body.tell():]
+    elif hasattr(body, 'getbuffer') and hasattr(body, 'tell'):
+        # io.BytesIO, and MappedPart from the multipart uploads.
+        view = body.getbuffer()[body.tell():]
+    else:
+        return None
+    if not view.c_contiguous:
+        return None
+    return view.cast('B')
+
 
 class AWSHTTPResponse(HTTPResponse):
     # The *args, **kwargs is used because the args are slightly
@@ -105,12 +140,16 @@ class AWSHTTPConnection(HTTPConnection):
         self._buffer.extend((b"", b""))
         msg = self._convert_to_bytes(self._buffer)
         del self._buffer[:]
-        # If msg and message_body are sent in a single send() call,
+        # If msg and message_body are handed to the transport together,
         # it will avoid performance problems caused by the interaction
-        # between delayed ack and the Nagle algorithm.
-        if isinstance(message_body, bytes):
-            msg += message_body
-            message_body = None
+        # between delayed ack and the Nagle algorithm.  They are handed
+        # over as separate buffers, so only the start of the body is
+        # copied to do it, by transports that join them.
+        if not self._expect_header_set:
+            view = _body_view(message_body)
+            if view is not None:
+                yield from self._send_view(view, message_body, msg)
+                return
         yield from self.send(msg)
         if self._expect_header_set:
             # This is our custom behavior.  If the Expect header was
@@ -203,9 +242,45 @@ class AWSHTTPConnection(HTTPConnection):
             logger.debug("send() called, but response already received. "
                          "Not sending data.")
             return
+        if isinstance(str, AsyncRequestBody):
+            # HTTPConnection.send() reads file like bodies synchronously.
+            chunk = yield from str.read(ASYNC_BODY_BLOCKSIZE)
+            while chunk:
+                yield from HTTPConnection.send(self, chunk)
+                chunk = yield from str.read(ASYNC_BODY_BLOCKSIZE)
+            return
+        view = _body_view(str)
+        if view is not None:
+            yield from self._send_view(view, str)
+            return
         _r = yield from HTTPConnection.send(self, str)
         return _r
 
+    @asyncio.coroutine
+    def _send_view(self, view, body, header=None):
+        # Hands ``view`` to the transport in slices, the first of them
+        # together with ``header``, and leaves a stream ``body`` at its
+        # end, as if it had been read.  Before Python 3.12 the transport
+        # joins the buffers of a writelines() call, which copies the
+        # header and the first slice.  The other slices are written on
+        # their own, and copied only as far as the socket doesn't take
+        # them at once.
+        if self.notSock is None:
+            if not self.auto_open:
+                raise NotConnected()
+            yield from self.connect()
+        writer = self.notSock.writer
+        start = 0
+        if header:
+            writer.writelines([header, view[:SEND_SLICE_SIZE]])
+            start = SEND_SLICE_SIZE
+            yield from writer.drain()
+        for offset in range(start, len(view), SEND_SLICE_SIZE):
+            writer.write(view[offset:offset + SEND_SLICE_SIZE])
+            yield from writer.drain()
+        if hasattr(body, 'seek'):
+            body.seek(0, 2)
+
     def _is_100_continue_status(self, maybe_status_line):
         parts = maybe_status_line.split(None, 2)
         # Check for HTTP/<version> 100 Continue\r\n
@@ -230,6 +305,109 @@ for name, function in AWSHTTPConnection.__dict__.items():
         setattr(AWSHTTPSConnection, name, function)
 
 
+class AWSHTTPConnectionPool(HTTPConnectionPool):
+    """HTTPConnectionPool that retires connections left idle too long.
+
+    ``keepalive_timeout`` is the number of seconds a connection may sit
+    unused in the pool before it is closed instead of being reused.  Servers
+    (and load balancers in front of them) drop idle keep-alive connections
+    on their own schedule, and reusing one of those costs a failed request.
+    A value of ``None`` keeps idle connections around indefinitely, which
+    is the urllib3 behavior.
+
+    When every connection of the pool is in use, a pool with ``block``
+    set waits up to ``pool_timeout`` seconds for one to be released and
+    then raises ``EmptyPoolError``.  Without ``block``, a new connection
+    is opened right away, and discarded when it is released to the full
+    pool.
+
+    """
+    def __init__(self, *args, **kwargs):
+        self.keepalive_timeout = kwargs.pop('keepalive_timeout', None)
+        self.pool_timeout = kwargs.pop('pool_timeout', DEFAULT_POOL_TIMEOUT)
+        HTTPConnectionPool.__init__(self, *args, **kwargs)
+
+    @asyncio.coroutine
+    def _get_conn(self, timeout=None):
+        # urllib3 waits for a connection for as long as ``timeout``
+        # whether the pool blocks or not, and nothing passes a timeout.
+        if timeout is None:
+            timeout = self.pool_timeout
+        if self.pool is None:
+            raise ClosedPoolError(self, "Pool is closed.")
+        conn = None
+        try:
+            if self.block:
+                conn = yield from asyncio.wait_for(self.pool.get(), timeout)
+            else:
+                conn = self.pool.get_nowait()
+        except asyncio.TimeoutError:
+            raise EmptyPoolError(self, "Pool reached maximum size and no "
+                                       "more connections are allowed.")
+        except asyncio.QueueEmpty:
+            pass
+        if conn and connectionpool.is_connection_dropped(conn):
+            logger.debug("Resetting dropped connection: %s", self.host)
+            conn.close()
+            if getattr(conn, 'auto_open', 1) == 0:
+                # A proxied connection that was tunneled can't be
+                # reopened.
+                conn = None
+        if not conn:
+            # An empty slot of the pool, or a connection beyond it.
+            return self._new_conn()
+        idle_since = getattr(conn, '_idle_since', None)
+        if idle_since is not None and self.keepalive_timeout is not None:
+            if time.time() - idle_since > self.keepalive_timeout:
+                logger.debug("Closing connection idle for more than %s "
+                             "seconds: %s", self.keepalive_timeout, self.host)
+                # The connection object reconnects on its next request.
+                conn.close()
+        conn._idle_since = None
+        return conn
+
+    def _put_conn(self, conn):
+        if conn:
+            conn._idle_since = time.time()
+        HTTPConnectionPool._put_conn(self, conn)
+
+
+class AWSHTTPSConnectionPool(HTTPSConnectionPool):
+
+    def __init__(self, *args, **kwargs):
+        self.keepalive_timeout = kwargs.pop('keepalive_timeout', None)
+        self.pool_timeout = kwargs.pop('pool_timeout', DEFAULT_POOL_TIMEOUT)
+        HTTPSConnectionPool.__init__(self, *args, **kwargs)
+
+
+for name, function in AWSHTTPConnectionPool.__dict__.items():
+    if inspect.isfunction(function) and name != '__init__':
+        setattr(AWSHTTPSConnectionPool, name, function)
+
+
+class AWSPoolManager(PoolManager):
+    """PoolManager that creates keep-alive aware connection pools.
+
+    Any ``keepalive_timeout`` and ``pool_timeout`` given in
+    ``connection_pool_kw`` are passed through to each
+    :class:`AWSHTTPConnectionPool` created.
+
+    """
+    pool_classes_by_scheme = {
+        'http': AWSHTTPConnectionPool,
+        'https': AWSHTTPSConnectionPool,
+    }
+
+    def _new_pool(self, scheme, host, port):
+        pool_cls = self.pool_classes_by_scheme[scheme]
+        kwargs = self.connection_pool_kw
+        if scheme == 'http':
+            kwargs = self.connection_pool_kw.copy()
+            for kw in SSL_KEYWORDS:
+                kwargs.pop(kw, None)
+        return pool_cls(host, port, **kwargs)
+
+
 def prepare_request_dict(request_dict, endpoint_url, user_agent=None):
     """
     This method prepares a request dict to be created into an
@@ -14,29 +14,42 @@ import re
 import copy
 import logging
 import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 
 from .model import ServiceModel
 from .awsrequest import prepare_request_dict
 from .exceptions import DataNotFoundError, OperationNotPageableError, ClientError
+from .exceptions import InvalidRetryModeError, InvalidValidationLevelError
+from .retryhandler import RETRY_MODES, JITTER_TYPES
 from . import waiter, xform_name
 from .paginate import Paginator
-from .utils import CachedProperty
-from .hooks import first_non_none_response
+from .response import ResultItemStream
+from .utils import CachedProperty, PayloadHasher, DEFAULT_HASHING_THRESHOLD
+from .hooks import first_non_none_response, EventNameCache
 from . import validate as botovalidate
 from . import serialize as botoserialize
 # from . import credentials as botocredentials
 from . import parsers as botoparsers
 from .signers import RequestSigner
-from .endpoint import EndpointCreator
+from .endpoint import EndpointCreator, DEFAULT_MAX_POOLS
+from .endpoint import DEFAULT_MAX_POOL_CONNECTIONS, DEFAULT_POOLBLOCK
+from .endpoint import DEFAULT_POOL_TIMEOUT
+from .endpoint import SHARED_POOL_REGISTRY
 
 logger = logging.getLogger(__name__)
 
+# The thread pools large request bodies are hashed in, by their number
+# of threads.  Clients configured alike share one, so creating clients
+# doesn't leave a pool behind for each of them.
+_HASHING_EXECUTORS = {}
+
 
 class ClientCreator(object):
     """Creates client objects for a service."""
     def __init__(self, loader, endpoint_resolver, user_agent, event_emitter,
                  retry_handler_factory, retry_config_translator,
-                 response_parser_factory=None):
+                 response_parser_factory=None, client_class_cache=None):
         self._loader = loader
         self._endpoint_resolver = endpoint_resolver
         self._user_agent = user_agent
@@ -44,14 +57,15 @@ class ClientCreator(object):
         self._retry_handler_factory = retry_handler_factory
         self._retry_config_translator = retry_config_translator
         self._response_parser_factory = response_parser_factory
+        self._client_class_cache = client_class_cache
 
     def create_client(self, service_name, region_name, is_secure=True,
                       endpoint_url=None, verify=None,
                       credentials=None, scoped_config=None,
                       api_version=None,
                       client_config=None):
-        service_model = self._load_service_model(service_name, api_version)
-        cls = yield from self._create_client_class(service_name, service_model)
+        cls, service_model = yield from self._get_client_class(
+            service_name, api_version)
         client_args = self._get_client_args(
             service_model, region_name, is_secure, endpoint_url,
             verify, credentials, scoped_config, client_config)
@@ -59,13 +73,47 @@ class ClientCreator(object):
 
     @asyncio.coroutine
     def create_client_class(self, service_name, api_version=None):
-        service_model = self._load_service_model(service_name, api_version)
-        return (yield from self._create_client_class(service_name, service_model))
+        cls, _ = yield from self._get_client_class(service_name, api_version)
+        return cls
+
+    @asyncio.coroutine
+    def _get_client_class(self, service_name, api_version):
+        cache = self._client_class_cache
+        if cache is None:
+            service_model = self._load_service_model(service_name,
+                                                     api_version)
+            cls = yield from self._create_client_class(service_name,
+                                                       service_model)
+            return cls, service_model
+        data_path = self._data_path()
+        entry = cache.get(service_name, api_version, data_path)
+        if entry is None:
+            service_model = self._load_service_model(service_name,
+                                                     api_version)
+            cls = yield from self._create_client_class(service_name,
+                                                       service_model)
+            entry = cache.put(service_name, api_version, cls, service_model,
+                              data_path)
+            entry.retries_registered.add(self._event_emitter)
+        elif self._event_emitter not in entry.retries_registered:
+            # The class came from another session, whose emitter got
+            # the retry handlers instead of ours.
+            self._register_retries(entry.service_model)
+            entry.retries_registered.add(self._event_emitter)
+        return entry.client_class, entry.service_model
+
+    def _data_path(self):
+        # Loaders searching other paths can load other models, so their
+        # classes are cached apart.
+        search_paths = getattr(self._loader, 'search_paths', None)
+        if isinstance(search_paths, (list, tuple)):
+            return tuple(search_paths)
+        return id(self._loader)
 
     @asyncio.coroutine
     def _create_client_class(self, service_name, service_model):
-        class_attributes = self._create_methods(service_model)
         py_name_to_operation_name = self._create_name_mapping(service_model)
+        class_attributes = self._create_methods(py_name_to_operation_name)
         class_attributes['_PY_TO_OP_NAME'] = py_name_to_operation_name
         bases = [BaseClient]
         yield from self._event_emitter.emit('creating-client-class.%s' % service_name,
@@ -93,24 +141,83 @@ class ClientCreator(object):
 
     def _register_retries(self, service_model):
         endpoint_prefix = service_model.endpoint_prefix
+        retry_config = self._load_retry_config(endpoint_prefix)
+        if retry_config is None:
+            return
+
+        logger.debug("Registering retry handlers for service: %s",
+                     service_model.service_name)
+        handler = self._retry_handler_factory.create_retry_handler(
+            retry_config, endpoint_prefix)
+        unique_id = 'retry-config-%s' % endpoint_prefix
+        self._event_emitter.register('needs-retry.%s' % endpoint_prefix,
+                                     handler, unique_id=unique_id)
 
+    def _load_retry_config(self, endpoint_prefix):
         # First, we load the entire retry config for all services,
         # then pull out just the information we need.
         original_config = self._loader.load_data('_retry')
         if not original_config:
-            return
-
-        retry_config = self._retry_config_translator.build_retry_config(
+            return None
+        return self._retry_config_translator.build_retry_config(
             endpoint_prefix, original_config.get('retry', {}),
             original_config.get('definitions', {}))
 
-        logger.debug("Registering retry handlers for service: %s",
+    def _register_adaptive_retries(self, service_model, event_emitter,
+                                   jitter):
+        # Adaptive retries keep state (the retry quota and send rate) per
+        # client, so unlike the legacy handler they are registered on the
+        # client's own copy of the event emitter, replacing the legacy one.
+        endpoint_prefix = service_model.endpoint_prefix
+        retry_config = self._load_retry_config(endpoint_prefix)
+        if retry_config is None:
+            return
+        logger.debug("Registering adaptive retry handlers for service: %s",
                      service_model.service_name)
-        handler = self._retry_handler_factory.create_retry_handler(
-            retry_config, endpoint_prefix)
+        handler = self._retry_handler_factory.create_adaptive_retry_handler(
+            retry_config, endpoint_prefix, jitter=jitter)
         unique_id = 'retry-config-%s' % endpoint_prefix
-        self._event_emitter.register('needs-retry.%s' % endpoint_prefix,
-                                     handler, unique_id=unique_id)
+        event_emitter.unregister('needs-retry.%s' % endpoint_prefix,
+                                 unique_id=unique_id)
+        event_emitter.register('needs-retry.%s' % endpoint_prefix,
+                               handler, unique_id=unique_id)
+        event_emitter.register_first(
+            'request-created.%s' % endpoint_prefix,
+            handler.on_request_created)
+
+    def _get_retry_mode(self, client_config):
+        retry_mode = 'legacy'
+        jitter = 'full'
+        if client_config is not None:
+            if client_config.retry_mode is not None:
+                retry_mode = client_config.retry_mode
+            if client_config.retry_jitter is not None:
+                jitter = client_config.retry_jitter
+        if retry_mode not in RETRY_MODES:
+            raise InvalidRetryModeError(
+                name='retry_mode', value=retry_mode,
+                valid_values=', '.join(RETRY_MODES))
+        if jitter not in JITTER_TYPES:
+            raise InvalidRetryModeError(
+                name='retry_jitter', value=jitter,
+                valid_values=', '.join(JITTER_TYPES))
+        return retry_mode, jitter
+
+    def _get_validation_level(self, client_config):
+        level = botovalidate.FULL_VALIDATION
+        if client_config is not None and \
+                client_config.parameter_validation is not None:
+            level = client_config.parameter_validation
+            # Booleans turn validation fully on or off.
+            if level is True:
+                level = botovalidate.FULL_VALIDATION
+            elif level is False:
+                level = botovalidate.NO_VALIDATION
+        if level not in botovalidate.VALIDATION_LEVELS:
+            raise InvalidValidationLevelError(
+                value=level,
+                valid_values=', '.join(botovalidate.VALIDATION_LEVELS))
+        return level
 
     def _get_signature_version_and_region(self, service_model, region_name,
                                           is_secure, scoped_config,
@@ -178,17 +285,30 @@ class ClientCreator(object):
                          scoped_config, client_config):
 
         protocol = service_model.metadata['protocol']
+        validation_level = self._get_validation_level(client_config)
         serializer = botoserialize.create_serializer(
-            protocol, include_validation=True)
+            protocol, include_validation=True,
+            validation_level=validation_level)
 
         event_emitter = copy.copy(self._event_emitter)
-
+        retry_mode, retry_jitter = self._get_retry_mode(client_config)
+        if retry_mode == 'adaptive':
+            self._register_adaptive_retries(service_model, event_emitter,
+                                            retry_jitter)
+
+        connection_config = self._get_connection_config(client_config)
+        share_connection_pools = (client_config is not None and
+                                  bool(client_config.share_connection_pools))
+        pool_registry = None
+        if share_connection_pools:
+            pool_registry = SHARED_POOL_REGISTRY
         endpoint_creator = EndpointCreator(self._endpoint_resolver,
                                            region_name, event_emitter)
         endpoint = endpoint_creator.create_endpoint(
             service_model, region_name, is_secure=is_secure,
             endpoint_url=endpoint_url, verify=verify,
-            response_parser_factory=self._response_parser_factory)
+            response_parser_factory=self._response_parser_factory,
+            pool_registry=pool_registry, **connection_config)
         response_parser = botoparsers.create_parser(protocol)
 
         # Determine what region the user provided either via the
@@ -218,17 +338,25 @@ class ClientCreator(object):
             if client_config.user_agent_extra is not None:
                 user_agent += ' %s' % client_config.user_agent_extra
 
+        payload_hasher = self._create_payload_hasher(client_config)
         signer = RequestSigner(service_model.service_name, region_name,
                                service_model.signing_name,
                                signature_version, credentials,
-                               event_emitter)
+                               event_emitter, payload_hasher=payload_hasher)
 
         # Create a new client config to be passed to the client based
         # on the final values. We do not want the user to be able
         # to try to modify an existing client with a client config.
         client_config = Config(
             region_name=region_name, signature_version=signature_version,
-            user_agent=user_agent)
+            user_agent=user_agent,
+            share_connection_pools=share_connection_pools,
+            retry_mode=retry_mode, retry_jitter=retry_jitter,
+            parameter_validation=validation_level,
+            payload_hashing_threshold=payload_hasher.threshold,
+            payload_hashing_max_workers=(
+                client_config and client_config.payload_hashing_max_workers),
+            **connection_config)
 
         return {
             'serializer': serializer,
@@ -241,12 +369,45 @@ class ClientCreator(object):
             'client_config': client_config
         }
 
-    def _create_methods(self, service_model):
+    def _create_payload_hasher(self, client_config):
+        threshold = DEFAULT_HASHING_THRESHOLD
+        executor = None
+        if client_config is not None:
+            if client_config.payload_hashing_threshold is not None:
+                threshold = client_config.payload_hashing_threshold
+            if client_config.payload_hashing_max_workers is not None:
+                executor = _get_hashing_executor(
+                    client_config.payload_hashing_max_workers)
+        return PayloadHasher(threshold=threshold, executor=executor)
+
+    def _get_connection_config(self, client_config):
+        # Connection pool and concurrency settings, with anything not given
+        # in the client config falling back to the endpoint defaults.
+        connection_config = {
+            'max_pools': DEFAULT_MAX_POOLS,
+            'max_pool_connections': DEFAULT_MAX_POOL_CONNECTIONS,
+            'pool_keepalive_timeout': None,
+            'pool_block': DEFAULT_POOLBLOCK,
+            'pool_timeout': DEFAULT_POOL_TIMEOUT,
+            'max_in_flight_requests': None,
+            'operation_concurrency_limits': None,
+        }
+        if client_config is not None:
+            for key in connection_config:
+                value = getattr(client_config, key)
+                if value is not None:
+                    connection_config[key] = value
+        return connection_config
+
+    def _create_methods(self, py_name_to_operation_name):
+        # The names come from the name mapping, so every operation name
+        # goes through xform_name() only once.  The methods themselves
+        # are only built when first used.
         op_dict = {}
-        for operation_name in service_model.operation_names:
-            py_operation_name = xform_name(operation_name)
-            op_dict[py_operation_name] = self._create_api_method(
-                py_operation_name, operation_name, service_model)
+        for py_operation_name, operation_name in \
+                py_name_to_operation_name.items():
+            op_dict[py_operation_name] = _LazyApiMethod(py_operation_name,
+                                                        operation_name)
         return op_dict
 
     def _create_name_mapping(self, service_model):
@@ -258,21 +419,123 @@ class ClientCreator(object):
             mapping[py_operation_name] = operation_name
         return mapping
 
-    def _create_api_method(self, py_operation_name, operation_name, service_model):
-        @asyncio.coroutine
-        def _api_call(self, *args, **kwargs):
-            # We're accepting *args so that we can give a more helpful
-            # error message than TypeError: _api_call takes exactly
-            # 1 argument.
-            if args:
-                raise TypeError(
-                    "%s() only accepts keyword arguments." % py_operation_name)
-            # The "self" in this scope is referring to the BaseClient.
-            return (yield from self._make_api_call(operation_name, kwargs))
 
-        _api_call.__name__ = str(py_operation_name)
-        # TODO: docstrings.
-        return _api_call
+def _get_hashing_executor(max_workers):
+    executor = _HASHING_EXECUTORS.get(max_workers)
+    if executor is None:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        _HASHING_EXECUTORS[max_workers] = executor
+    return executor
+
+
+def _create_api_method(py_operation_name, operation_name):
+    @asyncio.coroutine
+    def _api_call(self, *args, **kwargs):
+        # We're accepting *args so that we can give a more helpful
+        # error message than TypeError: _api_call takes exactly
+        # 1 argument.
+        if args:
+            raise TypeError(
+                "%s() only accepts keyword arguments." % py_operation_name)
+        # The "self" in this scope is referring to the BaseClient.
+        return (yield from self._make_api_call(operation_name, kwargs))
+
+    _api_call.__name__ = str(py_operation_name)
+    # TODO: docstrings.
+    return _api_call
+
+
+class _LazyApiMethod(object):
+    """The method of an operation in the attributes of a client class.
+
+    Services like EC2 have hundreds of operations, most of which a client
+    never calls, so the method of an operation is only created the first
+    time it is looked up, and reused afterwards.
+    """
+    __slots__ = ('py_operation_name', 'operation_name', '_method')
+
+    def __init__(self, py_operation_name, operation_name):
+        self.py_operation_name = py_operation_name
+        self.operation_name = operation_name
+        self._method = None
+
+    def __get__(self, instance, owner=None):
+        if self._method is None:
+            self._method = _create_api_method(self.py_operation_name,
+                                              self.operation_name)
+        if instance is None:
+            return self._method
+        return self._method.__get__(instance, owner)
+
+    def __call__(self, *args, **kwargs):
+        # Handlers of creating-client-class may call the entries of the
+        # class attributes, as they could when these were functions.
+        return self.__get__(None)(*args, **kwargs)
+
+
+class _ClientClassCacheEntry(object):
+    def __init__(self, client_class, service_model):
+        self.client_class = client_class
+        self.service_model = service_model
+        # Event emitters that already have this service's retry handlers.
+        self.retries_registered = weakref.WeakSet()
+
+
+class ClientClassCache(object):
+    """Cache of generated client classes and their service models.
+
+    Building a client class loads and parses the service model and creates
+    a method for every operation, which is wasted work when many clients
+    are created for the same service.  A ``ClientCreator`` given a cache
+    builds each class once per service name, API version and data path
+    and reuses it afterwards.
+
+    Sessions don't cache client classes unless a cache is registered as
+    their ``client_class_cache`` component::
+
+        session.register_component('client_class_cache', ClientClassCache())
+
+    Registering :data:`PROCESS_CLIENT_CLASS_CACHE` instead shares classes
+    across every session in the process that registers it.  A shared class
+    is built with the ``creating-client-class`` handlers of the session
+    that created the first client, so only share it between sessions that
+    register the same handlers.
+
+    Registering or unregistering a ``creating-client-class`` handler with
+    ``Session.register()`` invalidates the session's cache.  Call
+    :meth:`invalidate` after changing handlers on the event emitter
+    directly.
+    """
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, service_name, api_version=None, data_path=None):
+        return self._entries.get((service_name, api_version, data_path))
+
+    def put(self, service_name, api_version, client_class, service_model,
+            data_path=None):
+        entry = _ClientClassCacheEntry(client_class, service_model)
+        self._entries[(service_name, api_version, data_path)] = entry
+        return entry
+
+    def invalidate(self, service_name=None, api_version=None):
+        """Forget cached classes so the next client rebuilds them.
+
+        With no arguments the whole cache is cleared.  With a
+        ``service_name`` only that service's classes are removed, and with
+        an ``api_version`` as well only that version's class is removed.
+        """
+        if service_name is None:
+            self._entries.clear()
+            return
+        for key in list(self._entries):
+            if key[0] != service_name:
+                continue
+            if api_version is None or key[1] == api_version:
+                del self._entries[key]
+
+
+PROCESS_CLIENT_CLASS_CACHE = ClientClassCache()
 
 
 class BaseClient(object):
@@ -297,7 +560,9 @@ class BaseClient(object):
         self._client_config = client_config
         self.meta = ClientMeta(event_emitter, self._client_config,
                                endpoint.host, service_model,
-                               self._PY_TO_OP_NAME)
+                               self._PY_TO_OP_NAME,
+                               concurrency_limiter=endpoint.limiter)
+        self._event_names = EventNameCache(service_model.endpoint_prefix)
         self.meta.events.register('request-created.%s' %
                                   service_model.endpoint_prefix,
                                   self._sign_request)
@@ -307,21 +572,21 @@ class BaseClient(object):
         return self.meta.service_model
 
     @asyncio.coroutine
-    def _make_api_call(self, operation_name, api_params):
+    def _make_api_call(self, operation_name, api_params, result_stream=None):
         operation_model = self._service_model.operation_model(operation_name)
         request_dict = yield from self._convert_to_request_dict(
             api_params, operation_model)
 
         http, parsed_response = yield from self._endpoint.make_request(
-            operation_model, request_dict)
+            operation_model, request_dict, result_stream=result_stream)
 
-        yield from self.meta.events.emit(
-            'after-call.{endpoint_prefix}.{operation_name}'.format(
-                endpoint_prefix=self._service_model.endpoint_prefix,
-                operation_name=operation_name),
-            http_response=http, parsed=parsed_response,
-            model=operation_model
-        )
+        events = self.meta.events
+        event_name = self._event_names.get('after-call', operation_name)
+        if events.has_handlers(event_name):
+            yield from events.emit(
+                event_name, http_response=http, parsed=parsed_response,
+                model=operation_model
+            )
 
         if http.status_code >= 300:
             raise ClientError(parsed_response, operation_name)
@@ -337,33 +602,33 @@ class BaseClient(object):
         # Emit an event that allows users to modify the parameters at the
         # beginning of the method. It allows handlers to modify existing
         # parameters or return a new set of parameters to use.
-        responses = yield from self.meta.events.emit(
-            'provide-client-params.{endpoint_prefix}.{operation_name}'.format(
-                endpoint_prefix=self._service_model.endpoint_prefix,
-                operation_name=operation_name),
-            params=api_params, model=operation_model)
-        api_params = first_non_none_response(responses, default=api_params)
-
-        event_name = (
-            'before-parameter-build.{endpoint_prefix}.{operation_name}')
-        yield from self.meta.events.emit(
-            event_name.format(
-                endpoint_prefix=self._service_model.endpoint_prefix,
-                operation_name=operation_name),
-            params=api_params, model=operation_model)
+        events = self.meta.events
+        event_name = self._event_names.get(
+            'provide-client-params', operation_name)
+        if events.has_handlers(event_name):
+            responses = yield from events.emit(
+                event_name, params=api_params, model=operation_model)
+            api_params = first_non_none_response(
+                responses, default=api_params)
+
+        event_name = self._event_names.get(
+            'before-parameter-build', operation_name)
+        if events.has_handlers(event_name):
+            yield from events.emit(
+                event_name, params=api_params, model=operation_model)
 
         request_dict = self._serializer.serialize_to_request(
             api_params, operation_model)
         prepare_request_dict(request_dict, endpoint_url=self._endpoint.host,
                              user_agent=self._client_config.user_agent)
 
-        yield from self.meta.events.emit(
-            'before-call.{endpoint_prefix}.{operation_name}'.format(
-                endpoint_prefix=self._service_model.endpoint_prefix,
-                operation_name=operation_name),
-            model=operation_model, params=request_dict,
-            request_signer=self._request_signer
-        )
+        event_name = self._event_names.get('before-call', operation_name)
+        if events.has_handlers(event_name):
+            yield from events.emit(
+                event_name, model=operation_model, params=request_dict,
+                request_signer=self._request_signer,
+                payload_hasher=self._request_signer.payload_hasher
+            )
         return request_dict
 
     @asyncio.coroutine
@@ -372,6 +637,49 @@ class BaseClient(object):
         # mutate the request as needed.
         yield from self._request_signer.sign(operation_name, request)
 
+    def stream_result_items(self, operation_name, result_key=None,
+                            **kwargs):
+        """Call an operation, producing its result list items as they arrive.
+
+        Rather than buffering and parsing the whole response, the body is
+        parsed as it is read off the socket, and each member of the
+        result list is produced as soon as it has been parsed::
+
+            stream = client.stream_result_items('list_objects',
+                                                Bucket='mybucket')
+            obj = yield from stream.next()
+            while obj is not None:
+                print(obj['Key'])
+                obj = yield from stream.next()
+            rest = stream.result()  # IsTruncated, NextMarker, ...
+
+        :type operation_name: string
+        :param operation_name: The operation name, the same as the
+            method name on the client.
+
+        :type result_key: string
+        :param result_key: The dotted path of the list member to stream.
+            Defaults to the first ``result_key`` of the operation's
+            paginator.
+
+        :param kwargs: The parameters of the operation.
+
+        :rtype: L{botocore.response.ResultItemStream}
+
+        """
+        actual_operation_name = self._PY_TO_OP_NAME[operation_name]
+        if result_key is None:
+            if not self.can_paginate(operation_name):
+                raise OperationNotPageableError(operation_name=operation_name)
+            result_key = self._cache['page_config'][
+                actual_operation_name]['result_key']
+            if isinstance(result_key, list):
+                result_key = result_key[0]
+        stream = ResultItemStream(result_key)
+        stream.start(self._make_api_call(actual_operation_name, kwargs,
+                                         result_stream=stream))
+        return stream
+
     def get_paginator(self, operation_name):
         """Create a paginator for an operation.
 
@@ -479,8 +787,9 @@ class ClientMeta(object):
     """
 
     def __init__(self, events, client_config, endpoint_url, service_model,
-                 method_to_api_mapping):
+                 method_to_api_mapping, concurrency_limiter=None):
         self.events = events
+        self._concurrency_limiter = concurrency_limiter
         self._client_config = client_config
         self._endpoint_url = endpoint_url
         self._service_model = service_model
@@ -506,6 +815,10 @@ class ClientMeta(object):
     def method_to_api_mapping(self):
         return self._method_to_api_mapping
 
+    @property
+    def concurrency_limiter(self):
+        return self._concurrency_limiter
+
 
 class Config(object):
     """Advanced configuration for Botocore clients.
@@ -516,11 +829,100 @@ class Config(object):
         * Signature version
         * User agent
         * User agent extra
+        * Connection pool sizing, keep-alive behavior and sharing
+        * Limits on concurrent in-flight requests
+        * Retry mode
+        * Parameter validation
+        * Hashing of large request bodies
+
+    :param max_pools: The number of per-host connection pools to keep.
+        Pools for the least recently used hosts are closed beyond this.
+
+    :param max_pool_connections: The maximum number of connections kept
+        open to any one host.
+
+    :param pool_keepalive_timeout: The number of seconds a pooled
+        connection may stay idle before it is closed instead of reused.
+        By default idle connections are kept indefinitely.
+
+    :param pool_block: What to do when every pooled connection to a host
+        is in use.  If ``True``, the request waits for a connection to be
+        released and fails with ``EmptyPoolError`` if none becomes
+        available within ``pool_timeout``.  If ``False`` (the default), a
+        throwaway connection is opened beyond ``max_pool_connections``.
+
+    :param pool_timeout: The number of seconds a request waits for a
+        pooled connection when ``pool_block`` is ``True``, 60 by default.
+
+    :param share_connection_pools: If ``True``, the client's connection
+        pools are shared process-wide with every other client created this
+        way that targets the same host with the same TLS and pool settings.
+        Clients that differ only in credentials then reuse each other's
+        connections instead of each opening their own.
+
+    :param max_in_flight_requests: The maximum number of requests the
+        client sends concurrently.  Further calls wait, in the order they
+        were made, until a running request completes.  The current queue
+        depth, wait times and in-flight count are available from
+        ``client.meta.concurrency_limiter``.  By default there is no limit.
+
+    :param operation_concurrency_limits: A dict mapping operation names
+        (e.g. ``'PutItem'``) to the maximum number of concurrent requests
+        for just that operation.
+
+    :param retry_mode: Either ``'legacy'`` (the default), which retries
+        with the fixed exponential backoff from the retry config, or
+        ``'adaptive'``.  Adaptive mode retries the same errors, but with
+        a jittered backoff, a per-client retry quota that stops retrying
+        once too many requests have failed, and a send rate that is cut
+        back when the service responds with throttling errors.
+
+    :param retry_jitter: The jitter used by the ``'adaptive'`` retry mode,
+        either ``'full'`` (the default) or ``'decorrelated'``.
+
+    :param parameter_validation: How request parameters are validated
+        before they are sent.  ``'full'`` (the default) checks every
+        constraint of the service model.  ``'type-only'`` checks for
+        unknown and missing parameters and invalid types, but skips
+        length and range constraints.  ``'off'`` (or ``False``) sends
+        parameters unvalidated, leaving the service to reject them.
+
+    :param payload_hashing_threshold: Request bodies of at least this
+        many bytes (1 MiB by default) are hashed for signing and checksum
+        headers in a thread pool, so the event loop keeps serving other
+        requests during large uploads.  Smaller bodies are hashed on the
+        event loop.
+
+    :param payload_hashing_max_workers: The number of threads of the
+        pool large bodies are hashed in.  The pool is shared by every
+        client configured with the same number.  By default they are
+        hashed in the event loop's default executor.
 
     """
     def __init__(self, region_name=None, signature_version=None,
-                 user_agent=None, user_agent_extra=None):
+                 user_agent=None, user_agent_extra=None,
+                 max_pools=None, max_pool_connections=None,
+                 pool_keepalive_timeout=None, pool_block=None,
+                 pool_timeout=None,
+                 share_connection_pools=None, max_in_flight_requests=None,
+                 operation_concurrency_limits=None, retry_mode=None,
+                 retry_jitter=None, parameter_validation=None,
+                 payload_hashing_threshold=None,
+                 payload_hashing_max_workers=None):
         self.region_name = region_name
         self.signature_version = signature_version
         self.user_agent = user_agent
         self.user_agent_extra = user_agent_extra
+        self.max_pools = max_pools
+        self.max_pool_connections = max_pool_connections
+        self.pool_keepalive_timeout = pool_keepalive_timeout
+        self.pool_block = pool_block
+        self.pool_timeout = pool_timeout
+        self.share_connection_pools = share_connection_pools
+        self.max_in_flight_requests = max_in_flight_requests
+        self.operation_concurrency_limits = operation_concurrency_limits
+        self.retry_mode = retry_mode
+        self.retry_jitter = retry_jitter
+        self.parameter_validation = parameter_validation
+        self.payload_hashing_threshold = payload_hashing_threshold
+        self.payload_hashing_max_workers = payload_hashing_max_workers
@@ -161,3 +161,13 @@ def total_seconds(delta):
     day_in_seconds = delta.days * 24 * 3600.0
     micro_in_seconds = delta.microseconds / 10.0**6
     return day_in_seconds + delta.seconds + micro_in_seconds
+
+
+try:
+    StopAsyncIteration = StopAsyncIteration
+except NameError:
+    # Python 3.4 has no asynchronous iteration protocol.  Define the
+    # exception so ``__anext__`` implementations still work when called
+    # directly (``yield from it.__anext__()``).
+    class StopAsyncIteration(Exception):
+        pass
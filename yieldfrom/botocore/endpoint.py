@@ -13,10 +13,13 @@
 # language governing permissions and limitations under the License.
 
 import os
+import time
 import logging
 import asyncio
+import collections
 
 from yieldfrom.requests.sessions import Session
+from yieldfrom.requests.adapters import HTTPAdapter, DEFAULT_POOLBLOCK
 from yieldfrom.requests.utils import get_environ_proxies
 from yieldfrom.requests.exceptions import ConnectionError
 
@@ -24,11 +27,13 @@ from . import response as botoresponse
 from . import exceptions as botoexceptions
 from .exceptions import UnknownEndpointError
 from .exceptions import EndpointConnectionError, BaseEndpointResolverError
+from .exceptions import StreamingResultRetryError
 from .awsrequest import AWSRequest, create_request_object, prepare_request_dict
+from .awsrequest import AWSPoolManager, DEFAULT_POOL_TIMEOUT
 from .compat import urljoin, urlsplit, urlunsplit
 from .utils import percent_encode_sequence
-from .hooks import first_non_none_response
-from .response import StreamingBody
+from .hooks import first_non_none_response, EventNameCache
+from .response import StreamingBody, parse_response_incrementally
 from . import parsers
 from .utils import is_valid_endpoint_url
 
@@ -37,6 +42,8 @@ from . import request_sessions_fixer
 
 logger = logging.getLogger(__name__)
 DEFAULT_TIMEOUT = 60
+DEFAULT_MAX_POOLS = 10
+DEFAULT_MAX_POOL_CONNECTIONS = 10
 NOT_SET = object()
 
 
@@ -76,6 +83,190 @@ class PreserveAuthSession(Session):
         pass
 
 
+class AWSHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools honor a keep-alive timeout.
+
+    :param keepalive_timeout: The number of seconds a pooled connection may
+        stay idle before it is closed rather than reused.  ``None`` keeps
+        idle connections open indefinitely.
+    :param pool_timeout: The number of seconds a blocking pool waits for
+        a connection to be released.
+
+    All other arguments are the same as for ``HTTPAdapter``.
+    """
+    __attrs__ = HTTPAdapter.__attrs__ + ['_keepalive_timeout',
+                                         '_pool_timeout']
+
+    def __init__(self, keepalive_timeout=None,
+                 pool_timeout=DEFAULT_POOL_TIMEOUT, **kwargs):
+        # Must be set before HTTPAdapter.__init__, which builds the
+        # pool manager.
+        self._keepalive_timeout = keepalive_timeout
+        self._pool_timeout = pool_timeout
+        HTTPAdapter.__init__(self, **kwargs)
+
+    def init_poolmanager(self, connections, maxsize,
+                         block=DEFAULT_POOLBLOCK, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = AWSPoolManager(
+            num_pools=connections, maxsize=maxsize, block=block,
+            keepalive_timeout=self._keepalive_timeout,
+            pool_timeout=self._pool_timeout, **pool_kwargs)
+
+
+class ConnectionPoolRegistry(object):
+    """Shares HTTP adapters, and their connection pools, across endpoints.
+
+    Without a registry every endpoint owns its connection pools, so clients
+    that differ only in credentials each open their own connections (and
+    pay for their own TLS handshakes) to the same host.  Endpoints created
+    with the same registry instead share one :class:`AWSHTTPAdapter` per
+    scheme, host, port, TLS verification setting and pool configuration.
+
+    Pools are bound to the event loop they were first used on, so a
+    registry should only be shared by endpoints used from one loop.
+    """
+    def __init__(self):
+        self._adapters = {}
+
+    def get_adapter(self, endpoint_url, verify=True,
+                    max_pools=DEFAULT_MAX_POOLS,
+                    max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS,
+                    pool_keepalive_timeout=None, pool_block=DEFAULT_POOLBLOCK,
+                    pool_timeout=DEFAULT_POOL_TIMEOUT):
+        key = self._get_key(endpoint_url, verify, max_pools,
+                            max_pool_connections, pool_keepalive_timeout,
+                            pool_block, pool_timeout)
+        adapter = self._adapters.get(key)
+        if adapter is None:
+            logger.debug("Creating shared connection pool for %s", key)
+            adapter = AWSHTTPAdapter(
+                pool_connections=max_pools,
+                pool_maxsize=max_pool_connections, pool_block=pool_block,
+                keepalive_timeout=pool_keepalive_timeout,
+                pool_timeout=pool_timeout)
+            self._adapters[key] = adapter
+        return adapter
+
+    def _get_key(self, endpoint_url, verify, *pool_settings):
+        split = urlsplit(endpoint_url)
+        scheme = split.scheme.lower()
+        port = split.port
+        if port is None:
+            port = 443 if scheme == 'https' else 80
+        # The TLS settings are part of the key because requests applies
+        # ``verify`` to the connection pool itself, not to each request.
+        return (scheme, split.hostname, port, verify) + pool_settings
+
+    def clear(self):
+        """Close every shared connection pool and forget them."""
+        adapters = list(self._adapters.values())
+        self._adapters.clear()
+        for adapter in adapters:
+            adapter.close()
+
+
+# Registry used by clients created with ``Config(share_connection_pools=True)``.
+SHARED_POOL_REGISTRY = ConnectionPoolRegistry()
+
+
+class ConcurrencyLimiter(object):
+    """Bounds the number of requests an endpoint has in flight.
+
+    Requests beyond ``max_in_flight`` wait in a FIFO queue until a running
+    request finishes.  ``operation_limits`` optionally maps operation names
+    to a lower limit for just that operation.  A queued request whose
+    operation is at its own limit does not hold up queued requests for
+    other operations.
+
+    Either limit may be ``None``, meaning unbounded.
+
+    The following are available for monitoring:
+
+        * ``in_flight`` - requests currently being sent
+        * ``queue_depth`` - requests waiting for a slot
+        * ``total_wait_time`` / ``max_wait_time`` - seconds spent queued
+        * ``total_queued`` - requests that had to wait at all
+    """
+    def __init__(self, max_in_flight=None, operation_limits=None):
+        self.max_in_flight = max_in_flight
+        if operation_limits is None:
+            operation_limits = {}
+        self.operation_limits = operation_limits
+        self.in_flight = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.total_queued = 0
+        self._operation_in_flight = collections.defaultdict(int)
+        self._waiters = collections.deque()
+
+    @property
+    def queue_depth(self):
+        return len(self._waiters)
+
+    def operation_in_flight(self, operation_name):
+        return self._operation_in_flight.get(operation_name, 0)
+
+    @asyncio.coroutine
+    def acquire(self, operation_name):
+        if self._can_start(operation_name):
+            self._start(operation_name)
+            return
+        waiter = asyncio.Future()
+        entry = (operation_name, waiter)
+        self._waiters.append(entry)
+        start_time = time.monotonic()
+        try:
+            yield from waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was granted just before we were cancelled, so
+                # hand it to the next request in line.
+                self.release(operation_name)
+            else:
+                self._waiters.remove(entry)
+            raise
+        waited = time.monotonic() - start_time
+        self.total_queued += 1
+        self.total_wait_time += waited
+        self.max_wait_time = max(self.max_wait_time, waited)
+
+    def release(self, operation_name):
+        self.in_flight -= 1
+        self._operation_in_flight[operation_name] -= 1
+        if not self._operation_in_flight[operation_name]:
+            del self._operation_in_flight[operation_name]
+        self._wake_waiters()
+
+    def _can_start(self, operation_name):
+        if self.max_in_flight is not None and \
+                self.in_flight >= self.max_in_flight:
+            return False
+        limit = self.operation_limits.get(operation_name)
+        if limit is not None and \
+                self.operation_in_flight(operation_name) >= limit:
+            return False
+        return True
+
+    def _start(self, operation_name):
+        self.in_flight += 1
+        self._operation_in_flight[operation_name] += 1
+
+    def _wake_waiters(self):
+        for entry in list(self._waiters):
+            if self.max_in_flight is not None and \
+                    self.in_flight >= self.max_in_flight:
+                break
+            operation_name, waiter = entry
+            if waiter.done() or not self._can_start(operation_name):
+                continue
+            self._waiters.remove(entry)
+            self._start(operation_name)
+            waiter.set_result(None)
+
+
 class Endpoint(object):
     """
     Represents an endpoint for a particular service in a specific
@@ -85,20 +276,69 @@ class Endpoint(object):
         service.
     :ivar host: The fully qualified endpoint hostname.
     :ivar session: The session object.
+    :ivar max_pools: The number of per-host connection pools kept.
+    :ivar max_pool_connections: The number of connections kept open to
+        any one host.
+    :ivar pool_keepalive_timeout: Seconds an idle pooled connection is
+        kept before it is closed.  ``None`` means no limit.
+    :ivar pool_block: When ``True``, a request made while every pooled
+        connection to its host is busy waits for one to be released (and
+        fails once ``pool_timeout`` elapses).  When ``False``, an extra
+        connection is opened and discarded after use.
+    :ivar pool_timeout: Seconds a request waits for a pooled connection
+        when ``pool_block`` is ``True``.
+
+    If a ``pool_registry`` (a :class:`ConnectionPoolRegistry`) is given, the
+    endpoint's connection pools come from the registry and are shared with
+    every other endpoint that uses the same registry, host, TLS settings
+    and pool settings.
+
+    :ivar limiter: A :class:`ConcurrencyLimiter` bounding how many
+        requests are in flight at once, or ``None`` if unbounded.
     """
 
     def __init__(self, host, endpoint_prefix,
                  event_emitter, proxies=None, verify=True,
-                 timeout=DEFAULT_TIMEOUT, response_parser_factory=None):
+                 timeout=DEFAULT_TIMEOUT, response_parser_factory=None,
+                 max_pools=DEFAULT_MAX_POOLS,
+                 max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS,
+                 pool_keepalive_timeout=None, pool_block=DEFAULT_POOLBLOCK,
+                 pool_timeout=DEFAULT_POOL_TIMEOUT,
+                 pool_registry=None, max_in_flight_requests=None,
+                 operation_concurrency_limits=None):
         self._endpoint_prefix = endpoint_prefix
+        self._event_names = EventNameCache(endpoint_prefix)
         self._event_emitter = event_emitter
         self.host = host
         self.verify = verify
         if proxies is None:
             proxies = {}
         self.proxies = proxies
+        self.max_pools = max_pools
+        self.max_pool_connections = max_pool_connections
+        self.pool_keepalive_timeout = pool_keepalive_timeout
+        self.pool_block = pool_block
+        self.pool_timeout = pool_timeout
         self.http_session = PreserveAuthSession()
+        if pool_registry is not None:
+            adapter = pool_registry.get_adapter(
+                host, verify, max_pools=max_pools,
+                max_pool_connections=max_pool_connections,
+                pool_keepalive_timeout=pool_keepalive_timeout,
+                pool_block=pool_block, pool_timeout=pool_timeout)
+        else:
+            adapter = AWSHTTPAdapter(
+                pool_connections=max_pools,
+                pool_maxsize=max_pool_connections, pool_block=pool_block,
+                keepalive_timeout=pool_keepalive_timeout,
+                pool_timeout=pool_timeout)
+        self.http_session.mount('https://', adapter)
+        self.http_session.mount('http://', adapter)
         self.timeout = timeout
+        self.limiter = None
+        if max_in_flight_requests is not None or operation_concurrency_limits:
+            self.limiter = ConcurrencyLimiter(max_in_flight_requests,
+                                              operation_concurrency_limits)
         #self._lock = threading.Lock()  # perhaps eliminate
         if response_parser_factory is None:
             response_parser_factory = parsers.ResponseParserFactory()
@@ -108,20 +348,39 @@ class Endpoint(object):
         return '%s(%s)' % (self._endpoint_prefix, self.host)
 
     @asyncio.coroutine
-    def make_request(self, operation_model, request_dict):
+    def make_request(self, operation_model, request_dict, result_stream=None):
+        """Send a request, returning ``(http_response, parsed)``.
+
+        If a ``result_stream`` (a ``ResultItemStream``) is given, a
+        successful response is parsed while it is read off the socket,
+        and the members of the stream's result key are put on the stream
+        rather than in the parsed response.
+
+        """
         logger.debug("Making request for %s (verify_ssl=%s) with params: %s",
                      operation_model, self.verify, request_dict)
-        return (yield from self._send_request(request_dict, operation_model))
+        if self.limiter is None:
+            return (yield from self._send_request(request_dict,
+                                                  operation_model,
+                                                  result_stream))
+        yield from self.limiter.acquire(operation_model.name)
+        try:
+            return (yield from self._send_request(request_dict,
+                                                  operation_model,
+                                                  result_stream))
+        finally:
+            self.limiter.release(operation_model.name)
 
     @asyncio.coroutine
     def create_request(self, params, operation_model=None):
         request = create_request_object(params)
         if operation_model:
-            event_name = 'request-created.{endpoint_prefix}.{op_name}'.format(
-                endpoint_prefix=self._endpoint_prefix,
-                op_name=operation_model.name)
-            yield from self._event_emitter.emit(event_name, request=request,
-                operation_name=operation_model.name)
+            event_name = self._event_names.get('request-created',
+                                               operation_model.name)
+            if self._event_emitter.has_handlers(event_name):
+                yield from self._event_emitter.emit(
+                    event_name, request=request,
+                    operation_name=operation_model.name)
         prepared_request = self.prepare_request(request)
         return prepared_request
 
@@ -136,13 +395,19 @@ class Endpoint(object):
         return request.prepare()
 
     @asyncio.coroutine
-    def _send_request(self, request_dict, operation_model):
+    def _send_request(self, request_dict, operation_model, result_stream=None):
         attempts = 1
         request = yield from self.create_request(request_dict, operation_model)
         response, exception = yield from self._get_response(
-            request, operation_model, attempts)
+            request, operation_model, attempts, result_stream)
         while (yield from self._needs_retry(attempts, operation_model,
                                 response, exception)):
+            if result_stream is not None and result_stream.item_count:
+                # The consumer has already seen items from this response,
+                # a retry would produce them again.
+                raise StreamingResultRetryError(
+                    operation_name=operation_model.name,
+                    item_count=result_stream.item_count)
             attempts += 1
             # If there is a stream associated with the request, we need
             # to reset it before attempting to send the request again.
@@ -152,8 +417,8 @@ class Endpoint(object):
             # Create a new request when retried (including a new signature).
             request = yield from self.create_request(
                 request_dict, operation_model=operation_model)
-            response, exception = yield from self._get_response(request, operation_model,
-                                                     attempts)
+            response, exception = yield from self._get_response(
+                request, operation_model, attempts, result_stream)
 
         if exception is not None:
             raise exception
@@ -161,7 +426,8 @@ class Endpoint(object):
             return response
 
     @asyncio.coroutine
-    def _get_response(self, request, operation_model, attempts):
+    def _get_response(self, request, operation_model, attempts,
+                      result_stream=None):
         # This will return a tuple of (success_response, exception)
         # and success_response is itself a tuple of
         # (http_response, parsed_dict).
@@ -169,9 +435,11 @@ class Endpoint(object):
         # If no exception occurs then exception is None.
         try:
             logger.debug("Sending http request: %s", request)
+            # Incremental parsing needs the body left unread on the socket.
+            stream = operation_model.has_streaming_output or \
+                result_stream is not None
             http_response = yield from self.http_session.send(
-                request, verify=self.verify,
-                stream=operation_model.has_streaming_output,
+                request, verify=self.verify, stream=stream,
                 proxies=self.proxies, timeout=self.timeout)
         except ConnectionError as e:
             # For a connection error, if it looks like it's a DNS
@@ -189,11 +457,18 @@ class Endpoint(object):
             logger.debug("Exception received when sending HTTP request.",
                          exc_info=True)
             return (None, e)
+        # Set by parse_response_incrementally(), which doesn't keep the
+        # body for the CRC32 check.
+        http_response.body_crc32 = None
+        parser = self._response_parser_factory.create_parser(
+            operation_model.metadata['protocol'])
+        if result_stream is not None and http_response.status_code < 300:
+            parsed = yield from parse_response_incrementally(
+                http_response, operation_model, parser, result_stream)
+            return ((http_response, parsed), None)
         # This returns the http_response and the parsed_data.
         response_dict = yield from convert_to_response_dict(http_response,
                                                  operation_model)
-        parser = self._response_parser_factory.create_parser(
-            operation_model.metadata['protocol'])
         return ((http_response, parser.parse(response_dict,
                                              operation_model.output_shape)),
                 None)
@@ -204,7 +479,9 @@ class Endpoint(object):
     @asyncio.coroutine
     def _needs_retry(self, attempts, operation_model, response=None,
                      caught_exception=None):
-        event_name = 'needs-retry.%s.%s' % (self._endpoint_prefix, operation_model.name)
+        event_name = self._event_names.get('needs-retry', operation_model.name)
+        if not self._event_emitter.has_handlers(event_name):
+            return False
         responses = yield from self._event_emitter.emit(
             event_name, response=response, endpoint=self,
             operation=operation_model, attempts=attempts,
@@ -229,7 +506,14 @@ class EndpointCreator(object):
 
     def create_endpoint(self, service_model, region_name=None, is_secure=True,
                         endpoint_url=None, verify=None,
-                        response_parser_factory=None):
+                        response_parser_factory=None,
+                        max_pools=DEFAULT_MAX_POOLS,
+                        max_pool_connections=DEFAULT_MAX_POOL_CONNECTIONS,
+                        pool_keepalive_timeout=None,
+                        pool_block=DEFAULT_POOLBLOCK,
+                        pool_timeout=DEFAULT_POOL_TIMEOUT, pool_registry=None,
+                        max_in_flight_requests=None,
+                        operation_concurrency_limits=None):
         if region_name is None:
             region_name = self._configured_region
         # Use the endpoint resolver heuristics to build the endpoint url.
@@ -256,15 +540,22 @@ class EndpointCreator(object):
         if not is_valid_endpoint_url(final_endpoint_url):
             raise ValueError("Invalid endpoint: %s" % final_endpoint_url)
         return self._get_endpoint(
-            service_model, final_endpoint_url, verify, response_parser_factory)
+            service_model, final_endpoint_url, verify, response_parser_factory,
+            max_pools=max_pools, max_pool_connections=max_pool_connections,
+            pool_keepalive_timeout=pool_keepalive_timeout,
+            pool_block=pool_block, pool_timeout=pool_timeout,
+            pool_registry=pool_registry,
+            max_in_flight_requests=max_in_flight_requests,
+            operation_concurrency_limits=operation_concurrency_limits)
 
     def _get_endpoint(self, service_model, endpoint_url,
-                      verify, response_parser_factory):
+                      verify, response_parser_factory, **kwargs):
         endpoint_prefix = service_model.endpoint_prefix
         event_emitter = self._event_emitter
         return self._get_endpoint_complex(endpoint_prefix, endpoint_url,
                                           verify, event_emitter,
-                                          response_parser_factory)
+                                          response_parser_factory,
+                                          **kwargs)
 
     def _get_proxies(self, url):
         # We could also support getting proxies from a config file,
@@ -287,7 +578,8 @@ class EndpointCreator(object):
     def _get_endpoint_complex(self, endpoint_prefix,
                               endpoint_url, verify,
                               event_emitter,
-                              response_parser_factory=None):
+                              response_parser_factory=None,
+                              **kwargs):
         proxies = self._get_proxies(endpoint_url)
         verify = self._get_verify_value(verify)
         return Endpoint(
@@ -296,4 +588,5 @@ class EndpointCreator(object):
             event_emitter=event_emitter,
             proxies=proxies,
             verify=verify,
-            response_parser_factory=response_parser_factory)
+            response_parser_factory=response_parser_factory,
+            **kwargs)
@@ -264,6 +264,11 @@ class IncompleteReadError(BotoCoreError):
            'expected is {expected_bytes}.')
 
 
+class RangeMismatchError(BotoCoreError):
+    """A ranged GET returned other bytes than the range asked for."""
+    fmt = 'Wrong response to a GET of {range}: {reason}.'
+
+
 class InvalidExpressionError(BotoCoreError):
     """Expression is either invalid or too complex."""
     fmt = 'Invalid expression {expression}: Only dotted lookups are supported.'
@@ -289,6 +294,24 @@ class UnsupportedSignatureVersionError(BotoCoreError):
     fmt = 'Signature version is not supported: {signature_version}'
 
 
+class InvalidRetryModeError(BotoCoreError):
+    """Error when an unknown retry mode or jitter type is configured."""
+    fmt = ('Invalid value for {name}: {value}, valid values are: '
+           '{valid_values}')
+
+
+class InvalidValidationLevelError(BotoCoreError):
+    """Error when an unknown parameter validation level is configured."""
+    fmt = ('Invalid value for parameter_validation: {value}, valid values '
+           'are: {valid_values}')
+
+
+class StreamingResultRetryError(BotoCoreError):
+    """A streamed response needs a retry after items were produced."""
+    fmt = ('The {operation_name} response needs to be retried, but '
+           '{item_count} result items have already been produced.')
+
+
 class ClientError(Exception):
     MSG_TEMPLATE = (
         'An error occurred ({error_code}) when calling the {operation_name} '
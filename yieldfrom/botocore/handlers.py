@@ -29,6 +29,8 @@ from . import retryhandler
 from . import utils
 from . import translate
 from . import UNSIGNED
+from .exceptions import ParamValidationError
+from .streaming import AsyncRequestBody, is_async_source
 #from . import auth as botoauth
 from .signers import add_generate_presigned_url
 from .signers import add_generate_presigned_post
@@ -111,13 +113,29 @@ def json_decode_template_body(parsed, **kwargs):
             logger.debug('error loading JSON', exc_info=True)
 
 
-def calculate_md5(params, **kwargs):
+def calculate_md5(params, payload_hasher=None, **kwargs):
     request_dict = params
     if request_dict['body'] and 'Content-MD5' not in params['headers']:
-        md5 = hashlib.md5()
-        md5.update(params['body'].encode('latin-1'))
-        value = base64.b64encode(md5.digest()).decode('utf-8')
-        params['headers']['Content-MD5'] = value
+        body = params['body']
+        if payload_hasher is not None and payload_hasher.should_offload(body):
+            # The emitter waits for the returned coroutine.
+            return _set_hashed_headers(params['headers'], payload_hasher,
+                                       _content_md5_header, body)
+        params['headers'].update(_content_md5_header(body))
+
+
+def _content_md5_header(body):
+    md5 = hashlib.md5()
+    md5.update(body.encode('latin-1'))
+    value = base64.b64encode(md5.digest()).decode('utf-8')
+    return {'Content-MD5': value}
+
+
+@asyncio.coroutine
+def _set_hashed_headers(headers, payload_hasher, calculate_headers, *args):
+    # Calculates headers with the hasher's executor, but only sets them
+    # from the event loop.
+    headers.update((yield from payload_hasher.run(calculate_headers, *args)))
 
 
 def sse_md5(params, **kwargs):
@@ -139,6 +157,23 @@ def sse_md5(params, **kwargs):
     params['SSECustomerKeyMD5'] = key_md5_str
 
 
+def convert_async_body(params, **kwargs):
+    """
+    Wraps a ``Body`` from an asynchronous source, such as an async generator
+    or the ``Body`` of another GetObject, in an ``AsyncRequestBody``, which
+    sends it as it is read.  Its ``ContentLength`` has to be given, it is
+    needed before the body is read.
+    """
+    body = params.get('Body')
+    if not is_async_source(body):
+        return
+    content_length = params.pop('ContentLength', None)
+    if content_length is None:
+        raise ParamValidationError(
+            report='ContentLength is required with an asynchronous Body.')
+    params['Body'] = AsyncRequestBody(body, content_length)
+
+
 def _needs_s3_sse_customization(params):
     return (params.get('SSECustomerKey') is not None and
             'SSECustomerKeyMD5' not in params)
@@ -356,7 +391,7 @@ def add_glacier_version(model, params, **kwargs):
         'apiVersion']
 
 
-def add_glacier_checksums(params, **kwargs):
+def add_glacier_checksums(params, payload_hasher=None, **kwargs):
     """Add glacier checksums to the http request.
 
     This will add two headers to the http request:
@@ -365,7 +400,8 @@ def add_glacier_checksums(params, **kwargs):
         * x-amz-sha256-tree-hash
 
     These values will only be added if they are not present
-    in the HTTP request.
+    in the HTTP request.  With a ``payload_hasher``, large bodies are
+    hashed off the event loop and a coroutine is returned.
 
     """
     request_dict = params
@@ -378,14 +414,31 @@ def add_glacier_checksums(params, **kwargs):
         # checksums which assume file like objects.  Note that
         # we're not actually changing the body in the request_dict.
         body = io.BytesIO(body)
+    if payload_hasher is not None and payload_hasher.should_offload(body):
+        return _set_hashed_headers(headers, payload_hasher,
+                                   _glacier_checksum_headers, body, headers)
+    headers.update(_glacier_checksum_headers(body, headers))
+
+
+def _glacier_checksum_headers(body, headers):
+    # Returns the checksum headers missing from ``headers``.
     starting_position = body.tell()
+    if 'x-amz-content-sha256' not in headers and \
+            'x-amz-sha256-tree-hash' not in headers:
+        # Both are missing, so read the body once for both.
+        sha256, tree_hash = utils.calculate_glacier_checksums(body)
+        body.seek(starting_position)
+        return {'x-amz-content-sha256': sha256,
+                'x-amz-sha256-tree-hash': tree_hash}
+    checksums = {}
     if 'x-amz-content-sha256' not in headers:
-        headers['x-amz-content-sha256'] = utils.calculate_sha256(
+        checksums['x-amz-content-sha256'] = utils.calculate_sha256(
             body, as_hex=True)
     body.seek(starting_position)
     if 'x-amz-sha256-tree-hash' not in headers:
-        headers['x-amz-sha256-tree-hash'] = utils.calculate_tree_hash(body)
+        checksums['x-amz-sha256-tree-hash'] = utils.calculate_tree_hash(body)
     body.seek(starting_position)
+    return checksums
 
 
 def switch_host_machinelearning(request, **kwargs):
@@ -451,6 +504,8 @@ BUILTIN_HANDLERS = [
     ('before-parameter-build.s3.CopyObject', sse_md5),
     ('before-parameter-build.s3.CreateMultipartUpload', sse_md5),
     ('before-parameter-build.s3.UploadPart', sse_md5),
+    ('before-parameter-build.s3.PutObject', convert_async_body),
+    ('before-parameter-build.s3.UploadPart', convert_async_body),
     ('before-parameter-build.s3.UploadPartCopy', sse_md5),
     ('before-parameter-build.ec2.RunInstances', base64_encode_user_data),
     ('before-parameter-build.autoscaling.CreateLaunchConfiguration',
@@ -64,7 +64,41 @@ def first_non_none_response(responses, default=None):
     return default
 
 
+class EventNameCache(object):
+    """Per-operation event names, formatted once.
+
+    Event names such as ``before-call.s3.ListObjects`` are built on every
+    API call.  This caches them keyed on ``(event, operation_name)`` so
+    each name is only formatted the first time it is needed::
+
+        names = EventNameCache('s3')
+        names.get('before-call', 'ListObjects')  # 'before-call.s3.ListObjects'
+
+    """
+    def __init__(self, prefix):
+        self._prefix = prefix
+        self._names = {}
+
+    def get(self, event, operation_name):
+        key = (event, operation_name)
+        name = self._names.get(key)
+        if name is None:
+            name = '%s.%s.%s' % (event, self._prefix, operation_name)
+            self._names[key] = name
+        return name
+
+
 class BaseEventHooks(object):
+    def has_handlers(self, event_name):
+        """Whether any handler would be called for an event.
+
+        Callers can use this to skip building kwargs and emitting an
+        event nobody is listening to.  Implementations that cannot tell
+        cheaply must return True.
+
+        """
+        return True
+
     def emit(self, event_name, **kwargs):
         """Call all handlers subscribed to an event.
 
@@ -169,7 +203,7 @@ class HierarchicalEmitter(BaseEventHooks):
     def __init__(self):
         # We keep a reference to the handlers for quick
         # read only access (we never modify self._handlers).
-        # A cache of event name to handler list.
+        # A cache of event name to compiled dispatch plan.
         self._lookup_cache = {}
         self._handlers = _PrefixTrie()
         # This is used to ensure that unique_id's are only
@@ -195,30 +229,51 @@ class HierarchicalEmitter(BaseEventHooks):
         :return: List of (handler, response) tuples from all processed
                  handlers.
         """
-        responses = []
-        # Invoke the event handlers from most specific
-        # to least specific, each time stripping off a dot.
-        handlers_to_call = self._lookup_cache.get(event_name)
-        if handlers_to_call is None:
-            handlers_to_call = self._handlers.prefix_search(event_name)
-            self._lookup_cache[event_name] = handlers_to_call
-        elif not handlers_to_call:
+        plan = self._lookup_cache.get(event_name)
+        if plan is None:
+            plan = self._compile_plan(event_name)
+        if not plan:
             # Short circuit and return an empty response is we have
             # no handlers to call.  This is the common case where
             # for the majority of signals, nothing is listening.
             return []
         kwargs['event_name'] = event_name
+        debug = logger.isEnabledFor(logging.DEBUG)
         responses = []
-        for handler in handlers_to_call:
-            logger.debug('Event %s: calling handler %s', event_name, handler)
-            response = handler(**kwargs)
-            if asyncio.iscoroutine(response):
-                response = yield from response
+        for handler, is_coroutine_function in plan:
+            if debug:
+                logger.debug('Event %s: calling handler %s',
+                             event_name, handler)
+            if is_coroutine_function:
+                response = yield from handler(**kwargs)
+            else:
+                response = handler(**kwargs)
+                # Plain callables may still hand back a coroutine
+                # (partials, mocks, ...), so check the result.
+                if asyncio.iscoroutine(response):
+                    response = yield from response
             responses.append((handler, response))
             if stop_on_response and response is not None:
                 return responses
         return responses
 
+    def _compile_plan(self, event_name):
+        # The dispatch plan for an event is the ordered tuple of
+        # (handler, is_coroutine_function) pairs, invoked from most
+        # specific to least specific.  Plans are cached until the
+        # registrations change.
+        plan = tuple(
+            (handler, asyncio.iscoroutinefunction(handler))
+            for handler in self._handlers.prefix_search(event_name))
+        self._lookup_cache[event_name] = plan
+        return plan
+
+    def has_handlers(self, event_name):
+        plan = self._lookup_cache.get(event_name)
+        if plan is None:
+            plan = self._compile_plan(event_name)
+        return bool(plan)
+
     @asyncio.coroutine
     def emit(self, event_name, **kwargs):
         """
@@ -379,7 +434,34 @@ class _PrefixTrie(object):
         # to more nodes.  So 'foo.bar' would have a 'foo' node with
         # a 'bar' node as a child of foo.
         # {'foo': {'children': {'bar': {...}}}}.
-        self._root = {'chunk': None, 'children': {}, 'values': None}
+        # Nodes are shared between copies of a trie (copy-on-write), so
+        # each node also records the trie that owns it.  Only nodes
+        # owned by this trie may be modified in place.
+        self._owner = object()
+        self._root = self._new_node(None)
+
+    def _new_node(self, chunk):
+        return {'chunk': chunk, 'values': None, 'children': {},
+                'owner': self._owner}
+
+    def _writable(self, node):
+        # Return a version of ``node`` this trie may modify, copying it
+        # (but not its children) if it is shared with another trie.
+        if node['owner'] is self._owner:
+            return node
+        values = node['values']
+        if values is not None:
+            values = copy.copy(values)
+        return {'chunk': node['chunk'], 'values': values,
+                'children': node['children'].copy(), 'owner': self._owner}
+
+    def _writable_child(self, parent, part):
+        # ``parent`` must already be writable.
+        child = parent['children'][part]
+        writable = self._writable(child)
+        if writable is not child:
+            parent['children'][part] = writable
+        return writable
 
     def append_item(self, key, value, section=_MIDDLE):
         """Add an item to a key.
@@ -388,14 +470,14 @@ class _PrefixTrie(object):
         value is appended to the list for the key.
         """
         key_parts = key.split('.')
-        current = self._root
+        current = self._root = self._writable(self._root)
         for part in key_parts:
             if part not in current['children']:
-                new_child = {'chunk': part, 'values': None, 'children': {}}
+                new_child = self._new_node(part)
                 current['children'][part] = new_child
                 current = new_child
             else:
-                current = current['children'][part]
+                current = self._writable_child(current, part)
         if current['values'] is None:
             current['values'] = NodeList([], [], [])
         current['values'][section].append(value)
@@ -454,7 +536,7 @@ class _PrefixTrie(object):
 
         """
         key_parts = key.split('.')
-        current = self._root
+        current = self._root = self._writable(self._root)
         self._remove_item(current, key_parts, value, index=0)
 
     def _remove_item(self, current_node, key_parts, value, index):
@@ -463,6 +545,8 @@ class _PrefixTrie(object):
         elif index < len(key_parts):
             next_node = current_node['children'].get(key_parts[index])
             if next_node is not None:
+                next_node = self._writable_child(current_node,
+                                                 key_parts[index])
                 self._remove_item(next_node, key_parts, value, index + 1)
                 if index == len(key_parts) - 1:
                     node_list = next_node['values']
@@ -483,25 +567,11 @@ class _PrefixTrie(object):
                     "key is not in trie: %s" % '.'.join(key_parts))
 
     def __copy__(self):
-        # The fact that we're using a nested dict under the covers
-        # is an implementation detail, and the user shouldn't have
-        # to know that they'd normally need a deepcopy so we expose
-        # __copy__ instead of __deepcopy__.
+        # The copy shares every node with this trie.  Neither trie owns
+        # the shared nodes any more, so whichever one is modified next
+        # copies just the nodes along the modified key's path.  Copying
+        # is O(1) regardless of how many handlers are registered.
         new_copy = self.__class__()
-        copied_attrs = self._recursive_copy(self.__dict__)
-        new_copy.__dict__ = copied_attrs
+        new_copy._root = self._root
+        self._owner = object()
         return new_copy
-
-    def _recursive_copy(self, node):
-        # We can't use copy.deepcopy because we actually only want to copy
-        # the structure of the trie, not the handlers themselves.
-        # Each node has a chunk, children, and values.
-        copied_node = {}
-        for key, value in node.items():
-            if isinstance(value, NodeList):
-                copied_node[key] = copy.copy(value)
-            elif isinstance(value, dict):
-                copied_node[key] = self._recursive_copy(value)
-            else:
-                copied_node[key] = value
-        return copied_node
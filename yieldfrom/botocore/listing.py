@@ -0,0 +1,211 @@
+# Copyright 2015 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+"""Parallel, prefix partitioned listing of S3 buckets.
+
+ListObjects pagination is sequential, each page needs the marker from
+the previous one.  ``PrefixPartitionedLister`` lists the top level of a
+prefix with a ``Delimiter`` to discover its common prefixes, then lists
+each common prefix with its own paginator, several at a time, and merges
+everything into a single stream of ``Contents`` entries.
+
+"""
+import asyncio
+import logging
+
+from .compat import StopAsyncIteration
+
+
+logger = logging.getLogger(__name__)
+
+LEXICOGRAPHIC = 'lexicographic'
+ARRIVAL = 'arrival'
+LISTING_ORDERS = (LEXICOGRAPHIC, ARRIVAL)
+
+
+class PrefixPartitionedLister(object):
+    """Lists the objects under a prefix, one paginator per common prefix.
+
+    Iterate asynchronously to get each ``Contents`` entry of the listing::
+
+        lister = PrefixPartitionedLister(s3_client, 'mybucket')
+        obj = yield from lister.next()
+        while obj is not None:
+            print(obj['Key'])
+            obj = yield from lister.next()
+
+    :param client: An S3 client.
+    :param bucket: The bucket to list.
+    :param prefix: Only list keys starting with this prefix.
+    :param delimiter: The delimiter used to discover the common prefixes
+        the listing is partitioned on.  Only the first level below
+        ``prefix`` is partitioned.
+    :param max_concurrency: The maximum number of common prefixes listed
+        at the same time.
+    :param order: ``'lexicographic'`` (the default) produces the keys
+        in the same order as a sequential listing would.
+        ``'arrival'`` produces them as soon as any partition returns
+        them, which keeps every partition busy.
+    :param page_size: ``MaxKeys`` to use for each ListObjects request.
+    :param max_buffered_items: How many entries each partition (or, in
+        arrival order, the whole listing) may buffer ahead of the
+        consumer before its paginator waits.
+
+    """
+    def __init__(self, client, bucket, prefix='', delimiter='/',
+                 max_concurrency=10, order=LEXICOGRAPHIC, page_size=None,
+                 max_buffered_items=1000):
+        if order not in LISTING_ORDERS:
+            raise ValueError("Invalid listing order: %s, valid values are: "
+                             "%s" % (order, ', '.join(LISTING_ORDERS)))
+        self._client = client
+        self._bucket = bucket
+        self._prefix = prefix
+        self._delimiter = delimiter
+        self._order = order
+        self._page_size = page_size
+        self._max_buffered_items = max_buffered_items
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks = set()
+        # In lexicographic order the discovery listing feeds ``_segments``
+        # with top level objects and one queue per partition, in key
+        # order.  In arrival order every producer feeds ``_segments``
+        # directly.
+        self._segments = None
+        self._current = None
+        self._pending = 0
+        #: The common prefixes discovered so far.
+        self.partitions = []
+
+    def __aiter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __anext__(self):
+        if self._segments is None:
+            self._start()
+        while True:
+            source = self._current
+            if source is None:
+                source = self._segments
+            kind, value = yield from source.get()
+            if kind == 'item':
+                return value
+            elif kind == 'partition':
+                self._current = value
+            elif kind == 'error':
+                self.close()
+                raise value
+            elif source is self._current:
+                # The partition being drained is done.
+                self._current = None
+            else:
+                self._pending -= 1
+                if not self._pending:
+                    raise StopAsyncIteration()
+
+    @asyncio.coroutine
+    def next(self):
+        """Return the next ``Contents`` entry, or None when done."""
+        try:
+            return (yield from self.__anext__())
+        except StopAsyncIteration:
+            return None
+
+    def close(self):
+        """Cancel any listing still in progress."""
+        for task in list(self._tasks):
+            task.cancel()
+
+    def _start(self):
+        self._segments = asyncio.Queue(maxsize=self._max_buffered_items)
+        self._pending = 1
+        self._spawn(self._discover())
+
+    def _spawn(self, coro):
+        task = asyncio.Task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _paginate(self, **kwargs):
+        paginator = self._client.get_paginator('list_objects')
+        pagination_config = {}
+        if self._page_size is not None:
+            pagination_config['PageSize'] = self._page_size
+        return paginator.paginate(Bucket=self._bucket,
+                                  PaginationConfig=pagination_config,
+                                  **kwargs)
+
+    @asyncio.coroutine
+    def _discover(self):
+        try:
+            pages = self._paginate(Prefix=self._prefix,
+                                   Delimiter=self._delimiter)
+            page = yield from pages.next()
+            while page:
+                for kind, value in self._merge_page(page):
+                    if kind == 'prefix':
+                        yield from self._start_partition(value)
+                    else:
+                        yield from self._segments.put(('item', value))
+                page = yield from pages.next()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            yield from self._segments.put(('error', e))
+        yield from self._segments.put(('done', None))
+
+    def _merge_page(self, page):
+        # S3 returns Contents and CommonPrefixes as two sorted lists.
+        # Every key under a common prefix sorts together, right where
+        # the prefix itself sorts, so merging the two lists by name gives
+        # the order of a full, sequential listing.
+        entries = [(obj['Key'], 'item', obj)
+                   for obj in page.get('Contents') or ()]
+        entries.extend((common['Prefix'], 'prefix', common['Prefix'])
+                       for common in page.get('CommonPrefixes') or ())
+        entries.sort(key=lambda entry: entry[0])
+        return [(kind, value) for _, kind, value in entries]
+
+    @asyncio.coroutine
+    def _start_partition(self, prefix):
+        # Partitions are started in key order, so the one the consumer
+        # is draining always holds a slot and the listing can't deadlock
+        # on full partition queues.
+        yield from self._semaphore.acquire()
+        logger.debug("Listing partition %s of s3://%s", prefix, self._bucket)
+        self.partitions.append(prefix)
+        if self._order == LEXICOGRAPHIC:
+            queue = asyncio.Queue(maxsize=self._max_buffered_items)
+            yield from self._segments.put(('partition', queue))
+        else:
+            queue = self._segments
+            self._pending += 1
+        self._spawn(self._list_partition(prefix, queue))
+
+    @asyncio.coroutine
+    def _list_partition(self, prefix, queue):
+        try:
+            try:
+                pages = self._paginate(Prefix=prefix)
+                page = yield from pages.next()
+                while page:
+                    for obj in page.get('Contents') or ():
+                        yield from queue.put(('item', obj))
+                    page = yield from pages.next()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                yield from queue.put(('error', e))
+            yield from queue.put(('done', None))
+        finally:
+            self._semaphore.release()
@@ -85,6 +85,9 @@ class Shape(object):
             shape_resolver = UnresolvableShapeMap()
         self._shape_resolver = shape_resolver
         self._cache = {}
+        # The parsers, serializers and validators compiled for this shape,
+        # keyed by their compiler.  They live exactly as long as the shape.
+        self.compiled = {}
 
     @CachedProperty
     def serialization(self):
@@ -151,6 +154,41 @@ class Shape(object):
         """
         return self.metadata.get('required', [])
 
+    def compile(self, compiled, get_compiler):
+        """Compile this shape with the compiler ``get_compiler`` returns.
+
+        This is how the parsers, serializers and validators compile
+        their shapes.  ``get_compiler(shape)`` returns a
+        ``compiler(shape, compiled)`` that compiles ``shape`` into a
+        function, compiling its member shapes with this method in turn.
+
+        :param compiled: The functions compiled for the current top level
+            shape, keyed by the shapes they were compiled for.  Member
+            shapes are resolved into new objects on every reference, so
+            they are keyed by their name, serialization and metadata,
+            which is also what ends the compilation of recursive shapes.
+        :param get_compiler: Returns the compiler of a shape.
+
+        :return: The compiled function.
+
+        """
+        key = (self.name, self.type_name,
+               tuple(sorted((name, repr(value))
+                            for name, value in self.serialization.items())),
+               tuple(sorted((name, repr(value))
+                            for name, value in self.metadata.items())))
+        function = compiled.get(key)
+        if function is not None:
+            return function
+        # Recursive references go through this forwarder, as the shape's
+        # own function doesn't exist until its members are compiled.
+        resolved = []
+        compiled[key] = lambda *args: resolved[0](*args)
+        function = get_compiler(self)(self, compiled)
+        resolved.append(function)
+        compiled[key] = function
+        return function
+
     def _resolve_shape_ref(self, shape_ref):
         return self._shape_resolver.resolve_shape_ref(shape_ref)
 
@@ -0,0 +1,779 @@
+# Copyright 2015 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+"""Concurrent multipart uploads and ranged downloads.
+
+Large files are uploaded in parts, several at a time.  Each part is
+read from the file only when it is about to be uploaded, with
+``os.pread`` or through an ``mmap`` of the file, so only the parts in
+flight are ever held in memory, never the whole file.  Large objects
+are downloaded the same way, as concurrent ranged GETs that are
+written at their offsets in the file as they arrive.
+
+"""
+import asyncio
+import functools
+import logging
+import mmap
+import os
+import time
+
+from .exceptions import IncompleteReadError, RangeMismatchError
+from .utils import combine_tree_hashes
+from .utils import TREE_HASH_CHUNK_SIZE, _TreeHash
+
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+GLACIER_DEFAULT_PART_SIZE = 8 * MB
+GLACIER_MAX_PART_SIZE = 4096 * MB
+GLACIER_MAX_PARTS = 10000
+S3_DEFAULT_PART_SIZE = 8 * MB
+S3_MIN_PART_SIZE = 5 * MB
+S3_MAX_PART_SIZE = 5 * 1024 * MB
+S3_MAX_PARTS = 10000
+# The CreateMultipartUpload arguments every UploadPart needs as well.
+S3_PART_ARGS = ['RequestPayer', 'SSECustomerAlgorithm', 'SSECustomerKey',
+                'SSECustomerKeyMD5']
+# The arguments of UploadPart that CompleteMultipartUpload and
+# AbortMultipartUpload need as well.
+S3_UPLOAD_ARGS = ['Bucket', 'Key', 'UploadId', 'RequestPayer']
+# The GetObject arguments HeadObject takes as well.
+S3_HEAD_ARGS = ['VersionId', 'RequestPayer', 'SSECustomerAlgorithm',
+                'SSECustomerKey', 'SSECustomerKeyMD5']
+# The size of the reads off the body of a ranged GET.
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+
+class PartReader(object):
+    """Reads byte ranges of a file, independently of its position.
+
+    :param fileobj: A file object opened in binary mode, with a
+        ``fileno()``.  Its position is neither used nor changed, so
+        ranges can be read from several threads at once.
+
+    """
+    def __init__(self, fileobj):
+        self._fileno = fileobj.fileno()
+        #: The size of the file, in bytes.
+        self.size = os.fstat(self._fileno).st_size
+        self._mmap = None
+        if not hasattr(os, 'pread'):
+            self._map()
+
+    def _map(self):
+        if self._mmap is None and self.size:
+            self._mmap = mmap.mmap(self._fileno, 0, access=mmap.ACCESS_READ)
+
+    def read(self, offset, size):
+        """Return ``size`` bytes of the file, starting at ``offset``."""
+        if self._mmap is not None:
+            return self._mmap[offset:offset + size]
+        chunks = []
+        while size > 0:
+            chunk = os.pread(self._fileno, size, offset)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            offset += len(chunk)
+            size -= len(chunk)
+        if len(chunks) == 1:
+            return chunks[0]
+        return b''.join(chunks)
+
+    def view(self, offset, size):
+        """Return a ``MappedPart`` of ``size`` bytes, starting at ``offset``.
+
+        The part has to be closed before the reader is.
+
+        """
+        self._map()
+        if self._mmap is None:
+            return MappedPart(b'', 0, 0)
+        return MappedPart(self._mmap, offset, size)
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+class PartWriter(object):
+    """Writes byte ranges of a file, independently of its position.
+
+    The file is preallocated to its final size first, so ranges can be
+    written in any order, from several threads at once, with
+    ``os.pwrite`` or through an ``mmap`` where ``pwrite`` isn't
+    available.
+
+    :param fileobj: A file object opened for writing in binary mode,
+        with a ``fileno()``.
+    :param size: The final size of the file, in bytes.
+
+    """
+    def __init__(self, fileobj, size):
+        self._fileno = fileobj.fileno()
+        self.size = size
+        os.ftruncate(self._fileno, size)
+        if hasattr(os, 'posix_fallocate') and size:
+            try:
+                os.posix_fallocate(self._fileno, 0, size)
+            except OSError:
+                # Not supported by every file system, the file is
+                # still the right size without it.
+                logger.debug("Could not preallocate %s bytes", size,
+                             exc_info=True)
+        self._mmap = None
+        if not hasattr(os, 'pwrite') and size:
+            self._mmap = mmap.mmap(self._fileno, size,
+                                   access=mmap.ACCESS_WRITE)
+
+    def write(self, offset, data):
+        """Write the bytes like object ``data`` at ``offset``."""
+        if self._mmap is not None:
+            self._mmap[offset:offset + len(data)] = data
+            return
+        with memoryview(data) as view:
+            while view:
+                written = os.pwrite(self._fileno, view, offset)
+                view = view[written:]
+                offset += written
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+class MappedPart(object):
+    """A seekable, read only file like object over part of a buffer.
+
+    The part is a ``memoryview`` of the buffer, usually an ``mmap`` of
+    the file, and every ``read()`` copies only the bytes it returns, so
+    the part is never copied into memory as a whole.
+
+    """
+    def __init__(self, buffer, offset, size):
+        self._view = memoryview(buffer)[offset:offset + size]
+        self._position = 0
+
+    def __len__(self):
+        return len(self._view)
+
+    def read(self, amt=None):
+        start = self._position
+        end = len(self._view)
+        if amt is not None and amt >= 0:
+            end = min(end, start + amt)
+        self._position = max(start, end)
+        return self._view[start:end].tobytes()
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._position
+        elif whence == 2:
+            offset += len(self._view)
+        if offset < 0:
+            raise ValueError("Negative seek position %s" % offset)
+        self._position = offset
+        return offset
+
+    def tell(self):
+        return self._position
+
+    def getbuffer(self):
+        """A view of the whole part, like ``io.BytesIO.getbuffer()``.
+
+        The connection sends the part from this view, without reading it.
+
+        """
+        return self._view
+
+    def close(self):
+        self._view.release()
+
+
+class TransferStats(object):
+    """The progress of a transfer, passed to its ``callback``."""
+
+    def __init__(self, total_bytes):
+        #: The size of the file, in bytes.
+        self.total_bytes = total_bytes
+        #: The bytes of the parts transferred so far.
+        self.bytes_transferred = 0
+        #: The number of parts transferred so far.
+        self.parts_transferred = 0
+        #: The number of part transfers retried.
+        self.retries = 0
+        self.start_time = time.time()
+
+    @property
+    def elapsed(self):
+        """The seconds since the upload started."""
+        return time.time() - self.start_time
+
+    @property
+    def throughput(self):
+        """The bytes transferred per second so far."""
+        elapsed = self.elapsed
+        if not elapsed:
+            return 0.0
+        return self.bytes_transferred / elapsed
+
+
+def glacier_part_size(archive_size, part_size=None):
+    """Choose the part size of a Glacier multipart upload.
+
+    Glacier parts are a power of two number of megabytes, up to 4GB, and
+    an archive has at most 10,000 of them.  The part size is
+    ``part_size`` (8MB by default), doubled for as long as the archive
+    would otherwise need more parts than that.
+
+    :raises ValueError: If ``part_size`` isn't a valid part size, or the
+        archive is too large for any.
+
+    """
+    if part_size is None:
+        part_size = GLACIER_DEFAULT_PART_SIZE
+    megabytes, remainder = divmod(part_size, MB)
+    if remainder or megabytes < 1 or megabytes & (megabytes - 1) or \
+            part_size > GLACIER_MAX_PART_SIZE:
+        raise ValueError("Invalid Glacier part size: %s, it must be a power "
+                         "of two number of megabytes, from 1MB to 4GB."
+                         % part_size)
+    while archive_size > part_size * GLACIER_MAX_PARTS:
+        part_size *= 2
+    if part_size > GLACIER_MAX_PART_SIZE:
+        raise ValueError("Archive too large for a multipart upload: %s bytes"
+                         % archive_size)
+    return part_size
+
+
+def s3_part_size(object_size, part_size=None):
+    """Choose the part size of an S3 multipart upload.
+
+    S3 parts, except the last, are from 5MB to 5GB, and an object has at
+    most 10,000 of them.  The part size is ``part_size`` (8MB by
+    default), or larger if the object would otherwise need more parts
+    than that.
+
+    :raises ValueError: If ``part_size`` isn't a valid part size, or the
+        object is too large for any.
+
+    """
+    if part_size is None:
+        part_size = S3_DEFAULT_PART_SIZE
+    if not S3_MIN_PART_SIZE <= part_size <= S3_MAX_PART_SIZE:
+        raise ValueError("Invalid S3 part size: %s, it must be from 5MB to "
+                         "5GB." % part_size)
+    part_size = max(part_size, -(-object_size // S3_MAX_PARTS))
+    if part_size > S3_MAX_PART_SIZE:
+        raise ValueError("Object too large for a multipart upload: %s bytes"
+                         % object_size)
+    return part_size
+
+
+class _PartTransfer(object):
+    # Transfers the parts of a file concurrently, retrying each of them.
+
+    def __init__(self, client, part_size, max_concurrency,
+                 max_in_flight_bytes, max_part_attempts, retry_delay,
+                 callback):
+        self._client = client
+        self._part_size = part_size
+        self._max_concurrency = max_concurrency
+        self._max_in_flight_bytes = max_in_flight_bytes
+        self._max_part_attempts = max_part_attempts
+        self._retry_delay = retry_delay
+        self._callback = callback
+
+    @asyncio.coroutine
+    def _transfer_parts(self, size, part_size, offsets, transfer_part,
+                        stats):
+        # Calls ``transfer_part(index, offset, size, stats)`` for every
+        # part, and returns their results in order.
+        results = [None] * len(offsets)
+        parts = iter(offsets)
+        concurrency = max(1, min(self._max_concurrency,
+                                 self._max_in_flight_bytes // part_size))
+        # Every worker transfers one part at a time, taking the next part
+        # from the shared iterator, so no more than ``concurrency`` parts
+        # are ever in flight.
+        workers = [
+            asyncio.Task(self._transfer_worker(size, part_size, parts,
+                                               transfer_part, results,
+                                               stats))
+            for _ in range(concurrency)]
+        try:
+            yield from asyncio.gather(*workers)
+        except BaseException:
+            for worker in workers:
+                worker.cancel()
+            # Let the cancelled workers close their parts before the
+            # file is.
+            yield from asyncio.wait(workers)
+            raise
+        return results
+
+    @asyncio.coroutine
+    def _transfer_worker(self, size, part_size, parts, transfer_part,
+                         results, stats):
+        for offset in parts:
+            length = min(part_size, size - offset)
+            index = offset // part_size
+            results[index] = yield from transfer_part(index, offset, length,
+                                                      stats)
+            stats.bytes_transferred += length
+            stats.parts_transferred += 1
+            if self._callback is not None:
+                self._callback(stats)
+
+    @asyncio.coroutine
+    def _call_with_retries(self, call, stats, description):
+        # ``call`` returns a new coroutine for every attempt.
+        attempt = 1
+        while True:
+            try:
+                return (yield from call())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt >= self._max_part_attempts:
+                    raise
+                delay = self._retry_delay * 2 ** (attempt - 1)
+                logger.debug("Retrying %s in %s seconds after: %s",
+                             description, delay, e)
+                attempt += 1
+                stats.retries += 1
+                yield from asyncio.sleep(delay)
+
+
+class _MultipartUploader(_PartTransfer):
+    # Subclasses choose the part size and make the service's calls.
+
+    @asyncio.coroutine
+    def _upload_file(self, fileobj, *args):
+        if isinstance(fileobj, str):
+            with open(fileobj, 'rb') as f:
+                return (yield from self._upload_file(f, *args))
+        reader = PartReader(fileobj)
+        try:
+            return (yield from self._upload(reader, *args))
+        finally:
+            reader.close()
+
+    @asyncio.coroutine
+    def _upload(self, reader, *args):
+        part_size = self._choose_part_size(reader.size)
+        upload = yield from self._initiate(part_size, *args)
+        upload_id = self._upload_id(upload)
+        logger.debug("Uploading %s bytes in %s byte parts, upload id: %s",
+                     reader.size, part_size, upload_id)
+        stats = TransferStats(reader.size)
+        try:
+            results = yield from self._transfer_parts(
+                reader.size, part_size,
+                self._part_offsets(reader.size, part_size),
+                functools.partial(self._upload_part, reader, upload), stats)
+        except BaseException:
+            yield from self._abort_quietly(upload)
+            raise
+        response = yield from self._complete(upload, reader.size, part_size,
+                                             results)
+        logger.debug("Uploaded %s bytes in %.3f seconds, %.0f bytes/second, "
+                     "%s retries, upload id: %s", stats.bytes_transferred,
+                     stats.elapsed, stats.throughput, stats.retries,
+                     upload_id)
+        return response
+
+    def _part_offsets(self, size, part_size):
+        return range(0, size, part_size)
+
+    @asyncio.coroutine
+    def _abort_quietly(self, upload):
+        try:
+            yield from self._abort(upload)
+        except Exception:
+            logger.debug("Failed to abort upload %s", self._upload_id(upload),
+                         exc_info=True)
+
+
+class GlacierMultipartUploader(_MultipartUploader):
+    """Uploads a file to a Glacier vault as a multipart archive.
+
+    The file is split into parts that are uploaded concurrently, and the
+    archive's tree hash is combined from the tree hashes of the parts::
+
+        uploader = GlacierMultipartUploader(glacier_client, 'myvault')
+        response = yield from uploader.upload('/path/to/archive.tar')
+        print(response['archiveId'])
+
+    :param client: A Glacier client.
+    :param vault_name: The vault to upload archives to.
+    :param account_id: The ``accountId`` of the vault, ``'-'`` for the
+        account of the client's credentials.
+    :param part_size: The part size in bytes, a power of two number of
+        megabytes.  See ``glacier_part_size``.
+    :param max_concurrency: The maximum number of parts uploaded at the
+        same time.
+    :param max_in_flight_bytes: The maximum number of bytes of parts read
+        and not yet uploaded.  Fewer parts are uploaded at a time if
+        ``max_concurrency`` parts would exceed it, but always at least one.
+    :param max_part_attempts: How many times each part is tried before the
+        upload fails.  A part's data is read once for all its attempts.
+    :param retry_delay: The delay, in seconds, before retrying a part the
+        first time.  It is doubled for every further attempt.
+    :param callback: Called with the ``TransferStats`` of the upload after
+        every part uploaded.
+    :param executor: The ``concurrent.futures`` executor parts are read and
+        hashed in.  Defaults to the event loop's default executor.
+
+    """
+    def __init__(self, client, vault_name, account_id='-', part_size=None,
+                 max_concurrency=4, max_in_flight_bytes=64 * MB,
+                 max_part_attempts=3, retry_delay=1, callback=None,
+                 executor=None):
+        super(GlacierMultipartUploader, self).__init__(
+            client, part_size, max_concurrency, max_in_flight_bytes,
+            max_part_attempts, retry_delay, callback)
+        self._vault_name = vault_name
+        self._account_id = account_id
+        self._executor = executor
+
+    @asyncio.coroutine
+    def upload(self, fileobj, description=None):
+        """Upload a file as a new archive.
+
+        :param fileobj: The name of the file, or a file object opened in
+            binary mode with a ``fileno()``.  The whole file is uploaded,
+            whatever its current position.
+        :param description: The archive description.
+
+        :return: The CompleteMultipartUpload response, with the
+            ``archiveId``, ``checksum`` and ``location`` of the archive.
+
+        :raises ValueError: If the file is empty.  Glacier doesn't complete
+            multipart uploads without parts.
+
+        """
+        return (yield from self._upload_file(fileobj, description))
+
+    def _choose_part_size(self, size):
+        # Called before the upload is initiated.
+        if not size:
+            raise ValueError("Empty archives can't be uploaded as a "
+                             "multipart upload")
+        return glacier_part_size(size, self._part_size)
+
+    def _upload_id(self, upload):
+        return upload['uploadId']
+
+    @asyncio.coroutine
+    def _initiate(self, part_size, description):
+        params = {'accountId': self._account_id,
+                  'vaultName': self._vault_name,
+                  'partSize': str(part_size)}
+        if description is not None:
+            params['archiveDescription'] = description
+        response = yield from self._client.initiate_multipart_upload(
+            **params)
+        return {'accountId': self._account_id,
+                'vaultName': self._vault_name,
+                'uploadId': response['uploadId']}
+
+    @asyncio.coroutine
+    def _upload_part(self, reader, upload, index, offset, size, stats):
+        loop = asyncio.get_event_loop()
+        data, tree_hash = yield from loop.run_in_executor(
+            self._executor, self._read_part, reader, offset, size)
+        content_range = 'bytes %s-%s/*' % (offset, offset + size - 1)
+        yield from self._call_with_retries(
+            lambda: self._client.upload_multipart_part(
+                range=content_range, checksum=tree_hash, body=data,
+                **upload),
+            stats, 'part %s of upload %s' % (content_range,
+                                             upload['uploadId']))
+        return tree_hash
+
+    def _read_part(self, reader, offset, size):
+        # Only the tree hash: the SHA-256 of the body is calculated once
+        # by the add_glacier_checksums handler.
+        data = reader.read(offset, size)
+        tree_hash = _TreeHash()
+        with memoryview(data) as view:
+            for start in range(0, len(view), TREE_HASH_CHUNK_SIZE):
+                tree_hash.add_leaf(view[start:start + TREE_HASH_CHUNK_SIZE])
+        return data, tree_hash.hexdigest()
+
+    @asyncio.coroutine
+    def _complete(self, upload, size, part_size, tree_hashes):
+        return (yield from self._client.complete_multipart_upload(
+            archiveSize=str(size),
+            checksum=combine_tree_hashes(tree_hashes, part_size), **upload))
+
+    @asyncio.coroutine
+    def _abort(self, upload):
+        yield from self._client.abort_multipart_upload(**upload)
+
+
+class S3MultipartUploader(_MultipartUploader):
+    """Uploads a file to an S3 bucket as a multipart upload.
+
+    The file is split into parts that are uploaded concurrently.  Each
+    part's body is a ``MappedPart`` of an ``mmap`` of the file, so parts
+    are sent from the page cache without being copied into memory::
+
+        uploader = S3MultipartUploader(s3_client, 'mybucket')
+        response = yield from uploader.upload('/path/to/file', 'mykey')
+        print(response['ETag'])
+
+    :param client: An S3 client.
+    :param bucket: The bucket to upload objects to.
+    :param part_size: The part size in bytes.  See ``s3_part_size``.
+    :param max_concurrency: The maximum number of parts uploaded at the
+        same time.
+    :param max_in_flight_bytes: The maximum number of bytes of parts being
+        uploaded.  Fewer parts are uploaded at a time if
+        ``max_concurrency`` parts would exceed it, but always at least one.
+    :param max_part_attempts: How many times each part is tried before the
+        upload fails.
+    :param retry_delay: The delay, in seconds, before retrying a part the
+        first time.  It is doubled for every further attempt.
+    :param callback: Called with the ``TransferStats`` of the upload after
+        every part uploaded.
+
+    """
+    def __init__(self, client, bucket, part_size=None, max_concurrency=4,
+                 max_in_flight_bytes=64 * MB, max_part_attempts=3,
+                 retry_delay=1, callback=None):
+        super(S3MultipartUploader, self).__init__(
+            client, part_size, max_concurrency, max_in_flight_bytes,
+            max_part_attempts, retry_delay, callback)
+        self._bucket = bucket
+
+    @asyncio.coroutine
+    def upload(self, fileobj, key, extra_args=None):
+        """Upload a file as an object.
+
+        :param fileobj: The name of the file, or a file object opened in
+            binary mode with a ``fileno()``.  The whole file is uploaded,
+            whatever its current position.
+        :param key: The key of the object.
+        :param extra_args: More CreateMultipartUpload arguments, such as
+            ``ContentType`` or ``Metadata``.  The ones UploadPart needs as
+            well, such as ``SSECustomerKey``, are passed to it too.
+
+        :return: The CompleteMultipartUpload response, with the
+            ``ETag`` and ``Location`` of the object.
+
+        """
+        return (yield from self._upload_file(fileobj, key, extra_args or {}))
+
+    def _choose_part_size(self, size):
+        return s3_part_size(size, self._part_size)
+
+    def _upload_id(self, upload):
+        return upload['UploadId']
+
+    def _part_offsets(self, size, part_size):
+        # An empty file is still uploaded as one, empty, part.
+        return range(0, max(size, 1), part_size)
+
+    @asyncio.coroutine
+    def _initiate(self, part_size, key, extra_args):
+        response = yield from self._client.create_multipart_upload(
+            Bucket=self._bucket, Key=key, **extra_args)
+        # The arguments of every UploadPart.
+        upload = dict((name, extra_args[name]) for name in S3_PART_ARGS
+                      if name in extra_args)
+        upload.update(Bucket=self._bucket, Key=key,
+                      UploadId=response['UploadId'])
+        return upload
+
+    def _upload_args(self, upload):
+        return dict((name, upload[name]) for name in S3_UPLOAD_ARGS
+                    if name in upload)
+
+    @asyncio.coroutine
+    def _upload_part(self, reader, upload, index, offset, size, stats):
+        part = reader.view(offset, size)
+        try:
+            def send():
+                # Retries send the part again from its start.
+                part.seek(0)
+                return self._client.upload_part(
+                    PartNumber=index + 1, Body=part, **upload)
+            response = yield from self._call_with_retries(
+                send, stats, 'part %s of upload %s' % (index + 1,
+                                                       upload['UploadId']))
+        finally:
+            part.close()
+        return {'ETag': response['ETag'], 'PartNumber': index + 1}
+
+    @asyncio.coroutine
+    def _complete(self, upload, size, part_size, parts):
+        return (yield from self._client.complete_multipart_upload(
+            MultipartUpload={'Parts': parts}, **self._upload_args(upload)))
+
+    @asyncio.coroutine
+    def _abort(self, upload):
+        yield from self._client.abort_multipart_upload(
+            **self._upload_args(upload))
+
+
+class S3RangedDownloader(_PartTransfer):
+    """Downloads an S3 object to a file with concurrent ranged GETs.
+
+    The file is preallocated to the size of the object, and every range
+    is written at its offset as its body is read, so the object is never
+    assembled in memory::
+
+        downloader = S3RangedDownloader(s3_client, 'mybucket')
+        yield from downloader.download('mykey', '/path/to/file')
+
+    :param client: An S3 client.
+    :param bucket: The bucket to download objects from.
+    :param part_size: The size of the ranges, in bytes.
+    :param max_concurrency: The maximum number of ranges downloaded at the
+        same time.
+    :param max_in_flight_bytes: The maximum number of bytes of ranges being
+        downloaded.  Fewer ranges are downloaded at a time if
+        ``max_concurrency`` ranges would exceed it, but always at least one.
+    :param max_part_attempts: How many times each range is tried before the
+        download fails.
+    :param retry_delay: The delay, in seconds, before retrying a range the
+        first time.  It is doubled for every further attempt.
+    :param callback: Called with the ``TransferStats`` of the download
+        after every range downloaded.
+    :param executor: The ``concurrent.futures`` executor the ranges are
+        written to the file in.  Defaults to the event loop's default
+        executor.
+
+    """
+    def __init__(self, client, bucket, part_size=S3_DEFAULT_PART_SIZE,
+                 max_concurrency=4, max_in_flight_bytes=64 * MB,
+                 max_part_attempts=3, retry_delay=1, callback=None,
+                 executor=None):
+        if part_size < 1:
+            raise ValueError("Invalid part size: %s" % part_size)
+        super(S3RangedDownloader, self).__init__(
+            client, part_size, max_concurrency, max_in_flight_bytes,
+            max_part_attempts, retry_delay, callback)
+        self._bucket = bucket
+        self._executor = executor
+
+    @asyncio.coroutine
+    def download(self, key, filename, extra_args=None):
+        """Download an object to a file.
+
+        :param key: The key of the object.
+        :param filename: The name of the file to write.  It is replaced if
+            it exists, and removed again if the download fails.
+        :param extra_args: More GetObject arguments, such as
+            ``VersionId``, ``SSECustomerKey`` or ``ResponseContentType``.
+            Those HeadObject takes as well are passed to it too.
+
+        :return: The HeadObject response of the object.
+
+        :raises IncompleteReadError: If a range is shorter than its
+            ``Content-Length``.
+        :raises RangeMismatchError: If a response isn't the range asked
+            for, such as the whole object from a server ignoring the
+            ``Range`` header.
+
+        """
+        params = dict(extra_args or {}, Bucket=self._bucket, Key=key)
+        head_params = dict((name, params[name]) for name in S3_HEAD_ARGS
+                           if name in params)
+        head = yield from self._client.head_object(
+            Bucket=self._bucket, Key=key, **head_params)
+        size = head['ContentLength']
+        if 'ETag' in head:
+            # Every range has to be of the same version of the object.
+            params['IfMatch'] = head['ETag']
+        stats = TransferStats(size)
+        f = open(filename, 'wb')
+        try:
+            with f:
+                writer = PartWriter(f, size)
+                try:
+                    yield from self._transfer_parts(
+                        size, self._part_size,
+                        range(0, size, self._part_size),
+                        functools.partial(self._download_part, writer,
+                                          params),
+                        stats)
+                finally:
+                    writer.close()
+        except BaseException:
+            os.remove(filename)
+            raise
+        logger.debug("Downloaded %s bytes in %.3f seconds, %.0f bytes/second, "
+                     "%s retries: %s", stats.bytes_transferred, stats.elapsed,
+                     stats.throughput, stats.retries, key)
+        return head
+
+    @asyncio.coroutine
+    def _download_part(self, writer, params, index, offset, size, stats):
+        content_range = 'bytes=%s-%s' % (offset, offset + size - 1)
+        yield from self._call_with_retries(
+            lambda: self._get_range(writer, params, offset, size,
+                                    content_range),
+            stats, 'range %s of %s' % (content_range, params['Key']))
+
+    @asyncio.coroutine
+    def _get_range(self, writer, params, offset, size, content_range):
+        response = yield from self._client.get_object(Range=content_range,
+                                                      **params)
+        body = response['Body']
+        try:
+            self._check_range(response, size, content_range)
+            loop = asyncio.get_event_loop()
+            position = offset
+            end = offset + size
+            while position < end:
+                chunk = yield from body.read(
+                    min(DOWNLOAD_CHUNK_SIZE, end - position))
+                if not chunk:
+                    # A short range would leave a hole in the file.
+                    raise IncompleteReadError(actual_bytes=position - offset,
+                                              expected_bytes=size)
+                yield from loop.run_in_executor(self._executor, writer.write,
+                                                position, chunk)
+                position += len(chunk)
+            # The body checks its Content-Length once it is exhausted.
+            if (yield from body.read(1)):
+                raise RangeMismatchError(
+                    range=content_range,
+                    reason='more than %s bytes returned' % size)
+        except BaseException:
+            # Whatever is left of the body is never read, so the
+            # connection can't be reused.
+            body.close()
+            raise
+
+    def _check_range(self, response, size, content_range):
+        # Checked before anything is written, as a server ignoring the
+        # Range header answers with the whole object, which would
+        # overwrite the ranges after this one.
+        status_code = response.get('ResponseMetadata', {}).get(
+            'HTTPStatusCode')
+        if status_code != 206:
+            raise RangeMismatchError(
+                range=content_range,
+                reason='status %s instead of 206' % status_code)
+        if response.get('ContentLength') != size:
+            raise RangeMismatchError(
+                range=content_range,
+                reason='Content-Length %s instead of %s' % (
+                    response.get('ContentLength'), size))
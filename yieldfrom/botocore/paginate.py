@@ -12,12 +12,15 @@
 # language governing permissions and limitations under the License.
 
 #from itertools import tee
+import base64
 import collections
+import datetime
 import asyncio
+import weakref
 
 import jmespath
 from .exceptions import PaginationError
-from .compat import zip
+from .compat import zip, json, StopAsyncIteration
 from .utils import set_value_from_jmespath, merge_dicts
 
 
@@ -55,7 +58,7 @@ class PageIterator(object):
 
     def __init__(self, method, input_token, output_token, more_results,
                  result_keys, non_aggregate_keys, limit_key, max_items,
-                 starting_token, page_size, op_kwargs):
+                 starting_token, page_size, op_kwargs, prefetch=None):
         self._method = method
         self._op_kwargs = op_kwargs
         self._input_token = input_token
@@ -70,6 +73,10 @@ class PageIterator(object):
         self._resume_token = None
         self._non_aggregate_key_exprs = non_aggregate_keys
         self._non_aggregate_part = {}
+        # Number of pages that may be buffered ahead of the consumer.
+        self._prefetch = prefetch
+        self._prefetch_task = None
+        self._prefetch_queue = None
 
         self._iter_init()
 
@@ -103,8 +110,93 @@ class PageIterator(object):
         self._is_complete = False
         self._inject_starting_params(self._current_kwargs)
 
+    def __aiter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __anext__(self):
+        page = yield from self.next()
+        if not page:
+            raise StopAsyncIteration()
+        return page
+
     @asyncio.coroutine
     def next(self):
+        if self._prefetch:
+            return (yield from self._next_prefetched())
+        return (yield from self._next_page())
+
+    def close(self):
+        """Stop prefetching and discard any pages fetched ahead.
+
+        The iterator starts over from the first page on the next call
+        to ``next()``.  Prefetching also stops once the iterator is
+        garbage collected, but that is only as soon as it is dropped in
+        CPython, so stop it explicitly when leaving early::
+
+            pages = paginator.paginate(PaginationConfig={'Prefetch': 2})
+            try:
+                page = yield from pages.next()
+                while page and not found(page):
+                    page = yield from pages.next()
+            finally:
+                pages.close()
+
+        """
+        if self._prefetch_task is not None:
+            self._prefetch_task.cancel()
+            self._prefetch_task = None
+            self._prefetch_queue = None
+            self._iter_init()
+
+    def __del__(self):
+        task = getattr(self, '_prefetch_task', None)
+        if task is not None and not task.done():
+            task.cancel()
+
+    @asyncio.coroutine
+    def _next_prefetched(self):
+        if self._prefetch_task is None:
+            self._prefetch_queue = asyncio.Queue(maxsize=self._prefetch)
+            self._prefetch_task = asyncio.Task(self._prefetch_pages(
+                weakref.ref(self), self._prefetch_queue))
+        page, error = yield from self._prefetch_queue.get()
+        if error is not None or not page:
+            # The producer has finished, the next call starts over just
+            # like the non-prefetching iterator does.
+            self._prefetch_task = None
+            self._prefetch_queue = None
+            if error is not None:
+                raise error
+        return page
+
+    @staticmethod
+    @asyncio.coroutine
+    def _prefetch_pages(iterator_ref, queue):
+        # Each request needs the token from the previous page, so the
+        # requests themselves are still sequential.  What prefetching
+        # buys is that they run ahead of the consumer, buffering up to
+        # ``prefetch`` pages while the caller processes earlier ones.
+        # The iterator is only referenced during a request, so that it
+        # can be collected, and cancel this task, while it waits for
+        # the consumer.
+        while True:
+            iterator = iterator_ref()
+            if iterator is None:
+                return
+            try:
+                page = yield from iterator._next_page()
+            except Exception as e:
+                yield from queue.put((None, e))
+                return
+            finally:
+                del iterator
+            yield from queue.put((page, None))
+            if not page:
+                return
+
+    @asyncio.coroutine
+    def _next_page(self):
         if self._is_complete:
             self._iter_init()
             return None
@@ -168,23 +260,26 @@ class PageIterator(object):
         :type expression: str
         :param expression: JMESPath expression to apply to each page.
 
-        :return: Returns an iterator that yields the individual
-            elements of applying a JMESPath expression to each page of
-            results.
+        :return: Returns a list of the individual elements of applying
+            a JMESPath expression to each page of results.
         """
-        compiled = jmespath.compile(expression)
-        out = []
-        page = yield from self.next()
-        while page:
-            results = compiled.search(page)
-            if isinstance(results, list):
-                for element in results:
-                    out.append(element)
-            else:
-                # Yield result directly if it is not a list.
-                out.append(results)
-            page = yield from self.next()
-        return out
+        return (yield from self.iter_search(expression))
+
+    def iter_search(self, expression):
+        """Applies a JMESPath expression to a paginator, asynchronously
+
+        Like ``search()``, but returns an asynchronous iterator that
+        yields the elements as each page arrives::
+
+            search = page_iterator.iter_search('Contents[].Key')
+            key = yield from search.__anext__()
+
+        :type expression: str
+        :param expression: JMESPath expression to apply to each page.
+
+        :return: A ``SearchIterator``.
+        """
+        return SearchIterator(self, expression)
 
     def _make_request(self, current_kwargs):
         return self._method(**current_kwargs)
@@ -333,6 +428,30 @@ class PageIterator(object):
             complete_result['NextToken'] = self.resume_token
         return complete_result
 
+    def stream_full_result(self, sink=None):
+        """Stream the result key items instead of building the full result.
+
+        Unlike ``build_full_result()``, pages are not accumulated.  Each
+        ``(result_key, item)`` pair is produced as its page arrives and
+        only the non-aggregate keys and the resume token are kept, so
+        peak memory is bounded by a single page::
+
+            stream = page_iterator.stream_full_result()
+            while True:
+                try:
+                    result_key, item = yield from stream.__anext__()
+                except StopAsyncIteration:
+                    break
+            summary = stream.result()
+
+        ``yield from`` the stream to drain it, which returns the same
+        summary.  Every item is also passed to ``sink.write(result_key,
+        item)`` if a ``sink`` (such as an ``NDJSONSink``) is given.
+
+        :rtype: FullResultStream
+        """
+        return FullResultStream(self, sink=sink)
+
     def _parse_starting_token(self):
         if self._starting_token is None:
             return None
@@ -417,6 +536,11 @@ class Paginator(object):
         this object will yield a single page of a response
         at a time.
 
+        ``PaginationConfig`` accepts ``MaxItems``, ``PageSize``,
+        ``StartingToken`` and ``Prefetch``.  ``Prefetch=N`` fetches
+        pages in a background task, buffering up to N pages ahead of the
+        consumer, so request latency overlaps with processing.
+
         """
         page_params = self._extract_paging_params(kwargs)
         return self.PAGE_ITERATOR_CLS(
@@ -427,7 +551,7 @@ class Paginator(object):
             page_params['MaxItems'],
             page_params['StartingToken'],
             page_params['PageSize'],
-            kwargs)
+            kwargs, prefetch=page_params['Prefetch'])
 
     def _extract_paging_params(self, kwargs):
         pagination_config = kwargs.pop('PaginationConfig', {})
@@ -437,10 +561,14 @@ class Paginator(object):
         page_size = pagination_config.get('PageSize', None)
         if page_size is not None:
             page_size = int(page_size)
+        prefetch = pagination_config.get('Prefetch', None)
+        if prefetch is not None:
+            prefetch = int(prefetch)
         return {
             'MaxItems': max_items,
             'StartingToken': pagination_config.get('StartingToken', None),
             'PageSize': page_size,
+            'Prefetch': prefetch,
         }
 
 
@@ -461,20 +589,175 @@ class ResultKeyIterator(object):
     def __init__(self, pages_iterator, result_key):
         self._pages_iterator = pages_iterator
         self.result_key = result_key
-        self._cache_results = []
+        self._cache_results = collections.deque()
+
+    def __aiter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __anext__(self):
+        while not self._cache_results:
+            page = yield from self._pages_iterator.next()
+            if not page:
+                raise StopAsyncIteration()
+            results = self.result_key.search(page)
+            if results:
+                self._cache_results.extend(results)
+        return self._cache_results.popleft()
 
     @asyncio.coroutine
     def next(self):
-        if self._cache_results:
-            return self._cache_results.pop(0)
-        r = yield from self._pages_iterator.next()
-        if not r:
+        try:
+            return (yield from self.__anext__())
+        except StopAsyncIteration:
             return None
-        # _, page = r
-        page = r
-        results = self.result_key.search(page)
-        if results is None:
-            results = []
-        self._cache_results.extend(results)
-        return (yield from self.next())
 
+
+class SearchIterator(object):
+    """Iterates over the results of a JMESPath search over pages.
+
+    Returned by ``PageIterator.iter_search()``.  Iterate it
+    asynchronously to get the elements as each page arrives, or
+    ``yield from`` the object to get a list of every element.
+
+    :param pages_iterator: An iterator that will give you
+        pages of results (a ``PageIterator`` class).
+    :param expression: The JMESPath expression to apply to each page.
+
+    """
+    def __init__(self, pages_iterator, expression):
+        self._pages_iterator = pages_iterator
+        self._compiled = jmespath.compile(expression)
+        self._cache_results = collections.deque()
+
+    def __iter__(self):
+        return self._collect()
+
+    __await__ = __iter__
+
+    def _collect(self):
+        out = []
+        while True:
+            try:
+                element = yield from self.__anext__()
+            except StopAsyncIteration:
+                return out
+            out.append(element)
+
+    def __aiter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __anext__(self):
+        while not self._cache_results:
+            page = yield from self._pages_iterator.next()
+            if not page:
+                raise StopAsyncIteration()
+            results = self._compiled.search(page)
+            if isinstance(results, list):
+                self._cache_results.extend(results)
+            else:
+                # Yield result directly if it is not a list.
+                self._cache_results.append(results)
+        return self._cache_results.popleft()
+
+
+class FullResultStream(object):
+    """Streams the result key items of paginated responses.
+
+    Returned by ``PageIterator.stream_full_result()``.  Iterating
+    asynchronously gives ``(result_key, item)`` tuples, where
+    ``result_key`` is the result key's JMESPath expression.  Once the
+    stream is exhausted, ``result()`` gives what ``build_full_result()``
+    would have returned, minus the result keys.
+
+    :param pages_iterator: A ``PageIterator``.
+    :param sink: Optional object with a ``write(result_key, item)`` method
+        that is called with every item as it is produced.
+
+    """
+    def __init__(self, pages_iterator, sink=None):
+        self._pages_iterator = pages_iterator
+        self._sink = sink
+        self._cache_results = collections.deque()
+
+    def __iter__(self):
+        return self._drain()
+
+    __await__ = __iter__
+
+    def _drain(self):
+        while True:
+            try:
+                yield from self.__anext__()
+            except StopAsyncIteration:
+                return self.result()
+
+    def __aiter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __anext__(self):
+        while not self._cache_results:
+            response = yield from self._pages_iterator.next()
+            if not response:
+                raise StopAsyncIteration()
+            page = response
+            # Same handling of (http_response, parsed) tuples as
+            # build_full_result().
+            if isinstance(response, tuple) and len(response) == 2:
+                page = response[1]
+            for result_expression in self._pages_iterator.result_keys:
+                result_value = result_expression.search(page)
+                if result_value:
+                    key = result_expression.expression
+                    self._cache_results.extend(
+                        (key, value) for value in result_value)
+        item = self._cache_results.popleft()
+        if self._sink is not None:
+            self._sink.write(*item)
+        return item
+
+    def result(self):
+        """The non-aggregate part of the full result and its resume token."""
+        result = {}
+        merge_dicts(result, self._pages_iterator.non_aggregate_part)
+        if self._pages_iterator.resume_token is not None:
+            result['NextToken'] = self._pages_iterator.resume_token
+        return result
+
+
+def _json_default(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        # Blobs, as the JSON serializer sends them.
+        return base64.b64encode(value).decode('utf-8')
+    raise TypeError("%r is not JSON serializable" % (value,))
+
+
+class NDJSONSink(object):
+    """Writes streamed result items to a file as newline-delimited JSON.
+
+    Each item is written (one JSON document per line) as soon as it is
+    produced, so nothing but the current page is held in memory.
+    Timestamps are written in ISO 8601 format, and blobs as base64
+    encoded strings.
+
+    :param fileobj: A text-mode file-like object.
+    :param include_result_key: If True, each line is
+        ``{result_key: item}`` instead of the bare item.  Useful when a
+        paginator has more than one result key.
+
+    """
+    def __init__(self, fileobj, include_result_key=False):
+        self._fileobj = fileobj
+        self._include_result_key = include_result_key
+        self.items_written = 0
+
+    def write(self, result_key, item):
+        if self._include_result_key:
+            item = {result_key: item}
+        self._fileobj.write(json.dumps(item, default=_json_default))
+        self._fileobj.write('\n')
+        self.items_written += 1
@@ -92,6 +92,7 @@ Each call to ``parse()`` returns a dict has this form::
 """
 import re
 import base64
+import codecs
 import json
 import xml.etree.cElementTree
 import logging
@@ -105,6 +106,10 @@ LOG = logging.getLogger(__name__)
 
 DEFAULT_TIMESTAMP_PARSER = parse_timestamp
 
+# The number of distinct (namespaced) tags remembered per compiled
+# XML structure.
+_MAX_CACHED_TAGS = 256
+
 
 class ResponseParserFactory(object):
     def __init__(self):
@@ -151,6 +156,57 @@ def _text_content(func):
     return _get_text_content
 
 
+def _xml_text(node_or_string):
+    # The same as _text_content, for the compiled parsers.
+    if hasattr(node_or_string, 'text'):
+        text = node_or_string.text
+        if text is None:
+            return ''
+        return text
+    return node_or_string
+
+
+def _parse_unchanged(parser, value):
+    return value
+
+
+def _parse_xml_string(parser, node):
+    return _xml_text(node)
+
+
+def _parse_xml_integer(parser, node):
+    return int(_xml_text(node))
+
+
+def _parse_xml_float(parser, node):
+    return float(_xml_text(node))
+
+
+def _parse_xml_boolean(parser, node):
+    return _xml_text(node) == 'true'
+
+
+def _parse_xml_timestamp(parser, node):
+    return parser._timestamp_parser(_xml_text(node))
+
+
+def _parse_xml_blob(parser, node):
+    return parser._blob_parser(_xml_text(node))
+
+
+_XML_SCALAR_PARSERS = {
+    'string': _parse_xml_string,
+    'character': _parse_xml_string,
+    'integer': _parse_xml_integer,
+    'long': _parse_xml_integer,
+    'float': _parse_xml_float,
+    'double': _parse_xml_float,
+    'boolean': _parse_xml_boolean,
+    'timestamp': _parse_xml_timestamp,
+    'blob': _parse_xml_blob,
+}
+
+
 class ResponseParserError(Exception):
     pass
 
@@ -214,6 +270,40 @@ class ResponseParser(object):
                 response['status_code'])
         return parsed
 
+    def create_incremental_parser(self, shape, result_key):
+        """Create a parser that is fed the response body in chunks.
+
+        The incremental parser produces the members of the ``result_key``
+        list of ``shape`` as soon as each one has been received.  Once
+        the whole body has been fed, its ``parsed_body`` can be used as
+        the ``body`` of the response passed to ``parse()``, which then
+        parses everything except the already produced list members.
+
+        :param shape: The model shape describing the expected output.
+        :param result_key: The dotted path of member names leading to a
+            list member of ``shape``, e.g. ``Contents`` or
+            ``DistributionList.Items``.
+
+        """
+        raise NotImplementedError(
+            "%s.create_incremental_parser" % self.__class__.__name__)
+
+    def _resolve_result_key(self, shape, result_key):
+        # Returns the (member_name, member_shape) pairs leading from shape
+        # to the result list.
+        resolved = []
+        for member_name in result_key.split('.'):
+            if shape is None or shape.type_name != 'structure' or \
+                    member_name not in shape.members:
+                raise ValueError("Result key %s does not name a member of "
+                                 "the output shape" % result_key)
+            shape = shape.members[member_name]
+            resolved.append((member_name, shape))
+        if shape.type_name != 'list':
+            raise ValueError("Result key %s is not a list (%s)" %
+                             (result_key, shape.type_name))
+        return resolved
+
     def _do_parse(self, response, shape):
         raise NotImplementedError("%s._do_parse" % self.__class__.__name__)
 
@@ -222,9 +312,51 @@ class ResponseParser(object):
             "%s._do_error_parse" % self.__class__.__name__)
 
     def _parse_shape(self, shape, node):
-        handler = getattr(self, '_handle_%s' % shape.type_name,
-                          self._default_handle)
-        return handler(shape, node)
+        return self._compiled_handler(shape)(self, node)
+
+    def _compiled_handler(self, shape):
+        # Returns a function(parser, node) that parses ``shape``.  The
+        # function is compiled the first time a parser class parses the
+        # shape: the handlers of the nested shapes, member names and
+        # serialization details are all resolved once, instead of on
+        # every node of every response.  The function is kept on the
+        # shape, and an operation's output shape is cached on its
+        # OperationModel.
+        handler = shape.compiled.get(self.__class__)
+        if handler is None:
+            handler = shape.compiled[self.__class__] = self._compile_shape(
+                shape, {})
+        return handler
+
+    def _compile_shape(self, shape, compiled):
+        return shape.compile(compiled, self._get_compiler)
+
+    def _get_compiler(self, shape):
+        return getattr(self, '_compile_%s' % shape.type_name,
+                       self._compile_default)
+
+    def _compile_default(self, shape, compiled):
+        handler = getattr(self.__class__, '_handle_%s' % shape.type_name,
+                          None)
+        if handler is None:
+            if not self._overrides(ResponseParser, '_default_handle'):
+                return _parse_unchanged
+            handler = self.__class__._default_handle
+        return lambda parser, node: handler(parser, shape, node)
+
+    def _compile_list(self, shape, compiled):
+        if self._overrides(ResponseParser, '_handle_list'):
+            return self._compile_default(shape, compiled)
+        parse_member = self._compile_shape(shape.member, compiled)
+        if parse_member is _parse_unchanged:
+            return lambda parser, node: list(node)
+        return lambda parser, node: [parse_member(parser, item)
+                                     for item in node]
+
+    def _overrides(self, cls, name):
+        # Whether this parser's class replaces the ``name`` method of
+        # ``cls``, which the compiled form defined by ``cls`` would bypass.
+        return getattr(self.__class__, name) is not getattr(cls, name)
 
     def _handle_list(self, shape, node):
         # Enough implementations share list serialization that it's moved
@@ -269,6 +401,99 @@ class BaseXMLResponseParser(ResponseParser):
     def _node_tag(self, node):
         return self._namespace_re.sub('', node.tag)
 
+    def _compile_structure(self, shape, compiled):
+        if self._overrides(BaseXMLResponseParser, '_handle_structure'):
+            return self._compile_default(shape, compiled)
+        members = []
+        for member_name, member_shape in shape.members.items():
+            if 'location' in member_shape.serialization:
+                # All members with locations are handled separately.
+                continue
+            members.append((
+                member_name, self._member_key_name(member_shape, member_name),
+                self._compile_shape(member_shape, compiled)))
+        xml_names = set(xml_name for _, xml_name, _ in members)
+        # Maps namespaced tags to their names, saving a regex
+        # substitution per child node.
+        tag_names = {}
+
+        def parse_structure(parser, node):
+            # This is _build_name_to_xml_node(), minus the nodes that
+            # aren't members of the shape.
+            xml_dict = {}
+            for item in node:
+                tag = item.tag
+                name = tag_names.get(tag)
+                if name is None:
+                    name = parser._node_tag(item)
+                    if len(tag_names) < _MAX_CACHED_TAGS:
+                        tag_names[tag] = name
+                if name not in xml_names:
+                    continue
+                existing = xml_dict.get(name)
+                if existing is None:
+                    xml_dict[name] = item
+                elif isinstance(existing, list):
+                    existing.append(item)
+                else:
+                    xml_dict[name] = [existing, item]
+            parsed = {}
+            for member_name, xml_name, parse_member in members:
+                member_node = xml_dict.get(xml_name)
+                if member_node is not None:
+                    parsed[member_name] = parse_member(parser, member_node)
+            return parsed
+        return parse_structure
+
+    def _compile_list(self, shape, compiled):
+        if self._overrides(BaseXMLResponseParser, '_handle_list'):
+            return self._compile_default(shape, compiled)
+        parse_member = self._compile_shape(shape.member, compiled)
+        if not shape.serialization.get('flattened'):
+            return lambda parser, node: [parse_member(parser, item)
+                                         for item in node]
+
+        def parse_flattened_list(parser, node):
+            if not isinstance(node, list):
+                node = [node]
+            return [parse_member(parser, item) for item in node]
+        return parse_flattened_list
+
+    def _compile_map(self, shape, compiled):
+        if self._overrides(BaseXMLResponseParser, '_handle_map'):
+            return self._compile_default(shape, compiled)
+        key_location_name = shape.key.serialization.get('name') or 'key'
+        value_location_name = shape.value.serialization.get('name') or 'value'
+        parse_key = self._compile_shape(shape.key, compiled)
+        parse_value = self._compile_shape(shape.value, compiled)
+        flattened = shape.serialization.get('flattened')
+
+        def parse_map(parser, node):
+            parsed = {}
+            if flattened and not isinstance(node, list):
+                node = [node]
+            for keyval_node in node:
+                for single_pair in keyval_node:
+                    tag_name = parser._node_tag(single_pair)
+                    if tag_name == key_location_name:
+                        key_name = parse_key(parser, single_pair)
+                    elif tag_name == value_location_name:
+                        val_name = parse_value(parser, single_pair)
+                    else:
+                        raise ResponseParserError(
+                            "Unknown tag: %s" % tag_name)
+                parsed[key_name] = val_name
+            return parsed
+        return parse_map
+
+    def _compile_default(self, shape, compiled):
+        parse_scalar = _XML_SCALAR_PARSERS.get(shape.type_name)
+        if parse_scalar is None or self._overrides(
+                BaseXMLResponseParser, '_handle_%s' % shape.type_name):
+            return super(BaseXMLResponseParser, self)._compile_default(
+                shape, compiled)
+        return parse_scalar
+
     def _handle_list(self, shape, node):
         # When we use _build_name_to_xml_node, repeated elements are aggregated
         # into a list.  However, we can't tell the difference between a scalar
@@ -329,7 +554,32 @@ class BaseXMLResponseParser(ResponseParser):
                 xml_dict[key] = item
         return xml_dict
 
+    def create_incremental_parser(self, shape, result_key):
+        resolved = self._resolve_result_key(shape, result_key)
+        container_path = self._incremental_root_path(shape)
+        for member_name, member_shape in resolved[:-1]:
+            container_path.append(
+                self._member_key_name(member_shape, member_name))
+        list_name, list_shape = resolved[-1]
+        item_tag = None
+        if list_shape.serialization.get('flattened'):
+            # Flattened list members are repeated directly within the
+            # parent structure.
+            item_tag = self._member_key_name(list_shape, list_name)
+        else:
+            container_path.append(
+                self._member_key_name(list_shape, list_name))
+        return IncrementalXMLParser(self, list_shape.member, container_path,
+                                    item_tag)
+
+    def _incremental_root_path(self, shape):
+        # Tags between the document element and the output structure.
+        return []
+
     def _parse_xml_string_to_dom(self, xml_string):
+        if hasattr(xml_string, 'tag'):
+            # Already parsed by an IncrementalXMLParser.
+            return xml_string
         try:
             parser = xml.etree.cElementTree.XMLParser(
                 target=xml.etree.cElementTree.TreeBuilder(),
@@ -415,6 +665,11 @@ class QueryParser(BaseXMLResponseParser):
         self._inject_response_metadata(root, parsed)
         return parsed
 
+    def _incremental_root_path(self, shape):
+        if 'resultWrapper' in shape.serialization:
+            return [shape.serialization['resultWrapper']]
+        return []
+
     def _find_result_wrapped_shape(self, element_name, xml_root_node):
         mapping = self._build_name_to_xml_node(xml_root_node)
         return mapping[element_name]
@@ -488,6 +743,45 @@ class BaseJSONParser(ResponseParser):
     def _handle_timestamp(self, shape, value):
         return self._timestamp_parser(value)
 
+    def _compile_structure(self, shape, compiled):
+        if self._overrides(BaseJSONParser, '_handle_structure'):
+            return self._compile_default(shape, compiled)
+        members = [
+            (member_name, member_shape.serialization.get('name', member_name),
+             self._compile_shape(member_shape, compiled))
+            for member_name, member_shape in shape.members.items()]
+
+        def parse_structure(parser, value):
+            final_parsed = {}
+            for member_name, json_name, parse_member in members:
+                raw_value = value.get(json_name)
+                if raw_value is not None:
+                    final_parsed[member_name] = parse_member(parser,
+                                                             raw_value)
+            return final_parsed
+        return parse_structure
+
+    def _compile_map(self, shape, compiled):
+        if self._overrides(BaseJSONParser, '_handle_map'):
+            return self._compile_default(shape, compiled)
+        parse_key = self._compile_shape(shape.key, compiled)
+        parse_value = self._compile_shape(shape.value, compiled)
+        if parse_key is _parse_unchanged and parse_value is _parse_unchanged:
+            return lambda parser, value: dict(value)
+        return lambda parser, value: dict(
+            (parse_key(parser, key), parse_value(parser, val))
+            for key, val in value.items())
+
+    def create_incremental_parser(self, shape, result_key):
+        resolved = self._resolve_result_key(shape, result_key)
+        return IncrementalJSONParser(
+            self, resolved[-1][1].member, self._incremental_key_path(
+                shape, resolved))
+
+    def _incremental_key_path(self, shape, resolved):
+        return [member_shape.serialization.get('name', member_name)
+                for member_name, member_shape in resolved]
+
 
 class JSONParser(BaseJSONParser):
     """Response parse for the "json" protocol."""
@@ -624,6 +918,19 @@ class BaseRestParser(ResponseParser):
 
 class RestJSONParser(BaseRestParser, BaseJSONParser):
 
+    def _incremental_key_path(self, shape, resolved):
+        if 'payload' in shape.serialization:
+            # The body is the payload member, not the output structure.
+            if resolved[0][0] != shape.serialization['payload']:
+                raise ValueError("Result key is not part of the response "
+                                 "payload: %s" % resolved[0][0])
+            resolved = resolved[1:]
+        elif resolved[0][1].serialization.get('location'):
+            raise ValueError("Result key is not part of the response "
+                             "body: %s" % resolved[0][0])
+        return super(RestJSONParser, self)._incremental_key_path(
+            shape, resolved)
+
     def _initial_body_parse(self, body_contents):
         if not body_contents:
             return {}
@@ -651,6 +958,9 @@ class RestJSONParser(BaseRestParser, BaseJSONParser):
 class RestXMLParser(BaseRestParser, BaseXMLResponseParser):
 
     def _initial_body_parse(self, xml_string):
+        if hasattr(xml_string, 'tag'):
+            # Already parsed by an IncrementalXMLParser.
+            return xml_string
         if not xml_string:
             return xml.etree.cElementTree.Element('')
         return self._parse_xml_string_to_dom(xml_string)
@@ -711,6 +1021,240 @@ class RestXMLParser(BaseRestParser, BaseXMLResponseParser):
         return default
 
 
+class IncrementalXMLParser(object):
+    """Parses an XML response body fed to it in chunks.
+
+    Members of the result list are parsed as soon as their closing tag
+    has been fed, and are then removed from the tree so memory use stays
+    bounded by a single member (plus whatever else the response holds).
+    Create instances with ``create_incremental_parser()``.
+
+    """
+    def __init__(self, response_parser, member_shape, container_path,
+                 item_tag=None):
+        self._response_parser = response_parser
+        self._member_shape = member_shape
+        # Tags (without namespaces) from below the document element to
+        # the element whose children are the list members.
+        self._container_path = container_path
+        self._item_tag = item_tag
+        self._pull_parser = xml.etree.cElementTree.XMLPullParser(
+            events=('start', 'end'))
+        self._elements = []
+        self._tags = []
+        self._root = None
+
+    def feed(self, chunk):
+        """Feed the next chunk of the body, returning completed members."""
+        try:
+            self._pull_parser.feed(chunk)
+        except XMLParseError as e:
+            raise ResponseParserError(
+                "Unable to parse response (%s), invalid XML received" % e)
+        return self._read_events()
+
+    def close(self):
+        """Signal the end of the body, returning any remaining members."""
+        try:
+            self._pull_parser.close()
+        except XMLParseError as e:
+            raise ResponseParserError(
+                "Unable to parse response (%s), invalid XML received" % e)
+        return self._read_events()
+
+    @property
+    def parsed_body(self):
+        """The document, minus the members already produced."""
+        return self._root
+
+    def _read_events(self):
+        items = []
+        node_tag = self._response_parser._node_tag
+        for event, element in self._pull_parser.read_events():
+            if event == 'start':
+                if self._root is None:
+                    self._root = element
+                else:
+                    self._tags.append(node_tag(element))
+                self._elements.append(element)
+                continue
+            self._elements.pop()
+            if element is self._root:
+                continue
+            tag = self._tags.pop()
+            if self._tags == self._container_path and \
+                    (self._item_tag is None or tag == self._item_tag):
+                items.append(self._response_parser._parse_shape(
+                    self._member_shape, element))
+                self._elements[-1].remove(element)
+        return items
+
+
+class IncrementalJSONParser(object):
+    """Parses a JSON response body fed to it in chunks.
+
+    Only the objects leading to the result list are scanned as the body
+    arrives.  Each member of the list is decoded as soon as it is
+    complete and is not kept afterwards.  The rest of the document is
+    kept as is, with ``null`` in place of the list, so that the regular
+    parser can parse it from ``parsed_body``.  Create instances with
+    ``create_incremental_parser()``.
+
+    """
+    _WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, response_parser, member_shape, key_path):
+        self._response_parser = response_parser
+        self._member_shape = member_shape
+        # The JSON keys from the document object to the result list.
+        self._key_path = key_path
+        self._text_decoder = codecs.getincrementaldecoder(
+            response_parser.DEFAULT_ENCODING)()
+        self._json_decoder = json.JSONDecoder()
+        self._text = ''
+        self._rest = []
+        self._depth = 0
+        self._state = 'start'
+        self._closed = False
+
+    def feed(self, chunk):
+        """Feed the next chunk of the body, returning completed members."""
+        try:
+            self._text += self._text_decoder.decode(chunk)
+        except UnicodeDecodeError as e:
+            raise ResponseParserError(
+                "Unable to parse response (%s), invalid JSON received" % e)
+        return self._scan()
+
+    def close(self):
+        """Signal the end of the body, returning any remaining members."""
+        self._closed = True
+        try:
+            self._text += self._text_decoder.decode(b'', final=True)
+        except UnicodeDecodeError as e:
+            raise ResponseParserError(
+                "Unable to parse response (%s), invalid JSON received" % e)
+        items = self._scan()
+        if self._state in ('members', 'items'):
+            raise ResponseParserError(
+                "Unable to parse response, incomplete JSON received")
+        return items
+
+    @property
+    def parsed_body(self):
+        """The document, minus the members already produced."""
+        return ''.join(self._rest).encode(
+            self._response_parser.DEFAULT_ENCODING)
+
+    def _scan(self):
+        items = []
+        text = self._text
+        pos = 0
+        while pos < len(text):
+            start = pos
+            pos = self._WHITESPACE.match(text, pos).end()
+            if pos == len(text):
+                if self._state != 'items':
+                    self._rest.append(text[start:pos])
+                break
+            char = text[pos]
+            if self._state == 'start':
+                if char == '{':
+                    pos += 1
+                    self._state = 'members'
+                else:
+                    # Not an object, there's nothing to stream.
+                    self._state = 'tail'
+                self._rest.append(text[start:pos])
+            elif self._state == 'members':
+                list_start = None
+                if char == ',':
+                    pos += 1
+                elif char != '"':
+                    # The end of an object on the path to the list, or
+                    # something unexpected for the regular parser to
+                    # report.
+                    self._state = 'tail'
+                else:
+                    scanned = self._scan_member(pos)
+                    if scanned is None:
+                        pos = start
+                        break
+                    pos, list_start = scanned
+                if list_start is None:
+                    self._rest.append(text[start:pos])
+                else:
+                    self._rest.append(text[start:list_start] + 'null')
+            elif self._state == 'items':
+                if char == ',':
+                    pos += 1
+                elif char == ']':
+                    pos += 1
+                    self._state = 'tail'
+                else:
+                    decoded = self._decode_value(pos)
+                    if decoded is None:
+                        pos = start
+                        break
+                    value, pos = decoded
+                    items.append(self._response_parser._parse_shape(
+                        self._member_shape, value))
+            else:
+                self._rest.append(text[start:])
+                pos = len(text)
+        self._text = text[pos:]
+        return items
+
+    def _scan_member(self, pos):
+        # Scans a "key": value pair starting at pos.  Returns where the
+        # scan stopped and, if the value is the result list, where it
+        # starts.  Returns None if more of the body is needed.
+        text = self._text
+        decoded = self._decode_value(pos)
+        if decoded is None:
+            return None
+        key, pos = decoded
+        pos = self._WHITESPACE.match(text, pos).end()
+        if pos == len(text):
+            return None
+        if text[pos] != ':':
+            self._state = 'tail'
+            return pos, None
+        pos = self._WHITESPACE.match(text, pos + 1).end()
+        if pos == len(text):
+            return None
+        if key != self._key_path[self._depth]:
+            decoded = self._decode_value(pos)
+            if decoded is None:
+                return None
+            return decoded[1], None
+        if self._depth == len(self._key_path) - 1 and text[pos] == '[':
+            self._state = 'items'
+            return pos + 1, pos
+        if self._depth < len(self._key_path) - 1 and text[pos] == '{':
+            self._depth += 1
+            return pos + 1, None
+        # A null, or a type the regular parser will complain about.
+        self._state = 'tail'
+        return pos, None
+
+    def _decode_value(self, pos):
+        # Returns (value, end), or None if the value may not be complete
+        # yet.  A value ending right at the end of the text so far (a
+        # number, say) could still continue in the next chunk.
+        try:
+            value, end = self._json_decoder.raw_decode(self._text, pos)
+        except ValueError as e:
+            if self._closed:
+                raise ResponseParserError(
+                    "Unable to parse response (%s), invalid JSON "
+                    "received" % e)
+            return None
+        if end == len(self._text) and not self._closed:
+            return None
+        return value, end
+
+
 PROTOCOL_PARSERS = {
     'ec2': EC2QueryParser,
     'query': QueryParser,
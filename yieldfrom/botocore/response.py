@@ -13,18 +13,26 @@
 # language governing permissions and limitations under the License.
 
 import sys
+import collections
 import xml.etree.cElementTree
 import logging
+from binascii import crc32
 
 from . import ScalarTypes
 from .hooks import first_non_none_response
 from .compat import json, set_socket_timeout, XMLParseError
+from .compat import StopAsyncIteration
 from .exceptions import IncompleteReadError
 from . import parsers
 import asyncio
 
 logger = logging.getLogger(__name__)
 
+# Size of the chunks read off the socket when parsing incrementally.
+INCREMENTAL_READ_SIZE = 64 * 1024
+# Size of the chunks a StreamingBody is iterated in by default.
+DEFAULT_CHUNK_SIZE = 1024
+
 
 class StreamingBody(object):
     """Wrapper class for an http response body.
@@ -36,6 +44,10 @@ class StreamingBody(object):
         * Auto validation of content length, if the amount of bytes
           we read does not match the content length, an exception
           is raised.
+        * Asynchronous iteration over chunks (``async for`` or
+          ``iter_chunks()``) and lines (``iter_lines()``).
+        * ``readinto()``, which fills a buffer owned by the caller, so
+          one buffer can be reused for a whole body.
 
     """
     def __init__(self, raw_stream, content_length):
@@ -83,6 +95,51 @@ class StreamingBody(object):
             self._verify_content_length()
         return chunk
 
+    @asyncio.coroutine
+    def readinto(self, b):
+        """Read up to ``len(b)`` bytes into the writable buffer ``b``.
+
+        Returns the number of bytes read, 0 once the body is exhausted,
+        when the content length is verified as with ``read()``.
+
+        """
+        with memoryview(b).cast('B') as view:
+            if not view.nbytes:
+                return 0
+            chunk = yield from self._raw_stream.read(view.nbytes)
+            amount = len(chunk)
+            view[:amount] = chunk
+        self._amount_read += amount
+        if not amount:
+            self._verify_content_length()
+        return amount
+
+    def __aiter__(self):
+        """Iterate over the body in chunks of ``DEFAULT_CHUNK_SIZE``."""
+        return self.iter_chunks()
+
+    def iter_chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Return an asynchronous iterator over the body in chunks.
+
+        Every chunk but the last is ``chunk_size`` bytes, or less when
+        that is all the stream had ready.
+
+        """
+        return _ChunkIterator(self, chunk_size)
+
+    def iter_lines(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Return an asynchronous iterator over the lines of the body.
+
+        The lines are split as ``bytes.splitlines()`` does, and are given
+        without their line endings.
+
+        """
+        return _LineIterator(self, chunk_size)
+
+    def close(self):
+        """Close the underlying http response stream."""
+        self._raw_stream.close()
+
     def _verify_content_length(self):
         if self._content_length is not None and \
                 self._amount_read != int(self._content_length):
@@ -91,6 +148,78 @@ class StreamingBody(object):
                 expected_bytes=int(self._content_length))
 
 
+class _ChunkIterator(object):
+    def __init__(self, body, chunk_size):
+        self._body = body
+        self._chunk_size = chunk_size
+
+    def __aiter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __anext__(self):
+        chunk = yield from self._body.read(self._chunk_size)
+        if not chunk:
+            raise StopAsyncIteration()
+        return chunk
+
+    @asyncio.coroutine
+    def next(self):
+        """Return the next chunk, or None once the body is exhausted."""
+        try:
+            return (yield from self.__anext__())
+        except StopAsyncIteration:
+            return None
+
+
+class _LineIterator(object):
+    def __init__(self, body, chunk_size):
+        self._chunks = _ChunkIterator(body, chunk_size)
+        # The lines split off but not returned yet, and the start of the
+        # line after them.
+        self._lines = collections.deque()
+        self._pending = bytearray()
+        self._done = False
+
+    def __aiter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __anext__(self):
+        while not self._lines:
+            if self._done:
+                raise StopAsyncIteration()
+            chunk = yield from self._chunks.next()
+            if chunk is None:
+                self._done = True
+                # What is left may still be several lines, when a '\r'
+                # was held back for a '\n' that never came.
+                self._lines.extend(bytes(line)
+                                   for line in self._pending.splitlines())
+                continue
+            self._pending += chunk
+            if b'\n' not in chunk and b'\r' not in chunk:
+                continue
+            lines = self._pending.splitlines(True)
+            # Unless it ends with '\n', the last line may continue in the
+            # next chunk, even a '\r' may be the start of a '\r\n'.
+            if lines[-1].endswith(b'\n'):
+                self._pending = bytearray()
+            else:
+                self._pending = lines.pop()
+            self._lines.extend(bytes(line.splitlines()[0])
+                               for line in lines)
+        return self._lines.popleft()
+
+    @asyncio.coroutine
+    def next(self):
+        """Return the next line, or None once the body is exhausted."""
+        try:
+            return (yield from self.__anext__())
+        except StopAsyncIteration:
+            return None
+
+
 def _validate_content_length(expected_content_length, body_length):
     # See: https://github.com/kennethreitz/requests/issues/1855
     # Basically, our http library doesn't do this for us, so we have
@@ -123,3 +252,124 @@ def get_response(operation_model, http_response):
     parser = parsers.create_parser(protocol)
     return http_response, parser.parse(response_dict,
                                        operation_model.output_shape)
+
+
+class ResultItemStream(object):
+    """The result list items of one API call, produced while it is parsed.
+
+    Iterating asynchronously gives each member of the ``result_key`` list
+    as soon as it has been parsed off the wire.  Once the stream is
+    exhausted, ``result()`` returns the rest of the parsed response
+    (``NextMarker``, ``IsTruncated``, ``ResponseMetadata`` and so on).
+    Created by ``client.stream_result_items()``.
+
+    :param result_key: The dotted member path of the list to stream.
+    :param max_buffered_items: How many items may be parsed ahead of the
+        consumer before reading off the socket pauses.
+
+    """
+    def __init__(self, result_key, max_buffered_items=1000):
+        self.result_key = result_key
+        #: The number of items produced so far.
+        self.item_count = 0
+        self._queue = asyncio.Queue(maxsize=max_buffered_items)
+        self._task = None
+        self._done = False
+        self._result = None
+
+    def start(self, coro):
+        """Run ``coro``, the API call feeding this stream, in a task."""
+        self._task = asyncio.Task(self._run(coro))
+
+    @asyncio.coroutine
+    def _run(self, coro):
+        try:
+            result = yield from coro
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            yield from self._queue.put(('error', e))
+        else:
+            yield from self._queue.put(('done', result))
+
+    @asyncio.coroutine
+    def put_items(self, items):
+        for item in items:
+            yield from self._queue.put(('item', item))
+        self.item_count += len(items)
+
+    def __aiter__(self):
+        return self
+
+    @asyncio.coroutine
+    def __anext__(self):
+        if self._done:
+            raise StopAsyncIteration()
+        kind, value = yield from self._queue.get()
+        if kind == 'item':
+            return value
+        self._done = True
+        if kind == 'error':
+            raise value
+        self._result = value
+        raise StopAsyncIteration()
+
+    @asyncio.coroutine
+    def next(self):
+        """Return the next item, or None once the stream is exhausted."""
+        try:
+            return (yield from self.__anext__())
+        except StopAsyncIteration:
+            return None
+
+    def result(self):
+        """The parsed response, without the streamed items."""
+        return self._result
+
+    def close(self):
+        """Abandon the stream, cancelling the request if still running."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._done = True
+
+
+@asyncio.coroutine
+def parse_response_incrementally(http_response, operation_model, parser,
+                                 result_stream):
+    """Parse a successful response while reading it off the socket.
+
+    The members of the ``result_stream``'s result key are put on the
+    stream as they are parsed, the rest of the response is parsed and
+    returned once the body is complete.  The CRC32 of the body is stored
+    as ``http_response.body_crc32`` since the body itself is not kept.
+
+    """
+    shape = operation_model.output_shape
+    incremental = parser.create_incremental_parser(
+        shape, result_stream.result_key)
+    raw = http_response.raw
+    checksum = 0
+    amount_read = 0
+    while True:
+        chunk = yield from raw.read(INCREMENTAL_READ_SIZE,
+                                    decode_content=True)
+        if not chunk:
+            break
+        amount_read += len(chunk)
+        checksum = crc32(chunk, checksum)
+        items = incremental.feed(chunk)
+        if items:
+            yield from result_stream.put_items(items)
+    items = incremental.close()
+    if items:
+        yield from result_stream.put_items(items)
+    if not http_response.headers.get('content-encoding'):
+        _validate_content_length(
+            http_response.headers.get('content-length'), amount_read)
+    http_response.body_crc32 = checksum & 0xffffffff
+    response_dict = {
+        'headers': http_response.headers,
+        'status_code': http_response.status_code,
+        'body': incremental.parsed_body,
+    }
+    return parser.parse(response_dict, shape)
@@ -12,6 +12,7 @@
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
 
+import time
 import random
 import functools
 import logging
@@ -21,6 +22,7 @@ from yieldfrom.requests import ConnectionError, Timeout
 from yieldfrom.urllib3.exceptions import ClosedPoolError
 
 from .exceptions import ChecksumError, EndpointConnectionError
+from .exceptions import InvalidRetryModeError
 import asyncio
 import types
 
@@ -37,6 +39,21 @@ EXCEPTION_MAP = {
     ],
 }
 
+# Error codes that mean the service wants us to slow down.  These drive
+# the send rate limiting of the adaptive retry mode.
+THROTTLING_ERROR_CODES = frozenset([
+    'Throttling', 'ThrottlingException', 'ThrottledException',
+    'RequestThrottledException', 'TooManyRequestsException',
+    'ProvisionedThroughputExceededException', 'TransactionInProgressException',
+    'RequestLimitExceeded', 'BandwidthLimitExceeded', 'LimitExceededException',
+    'RequestThrottled', 'SlowDown', 'PriorRequestNotComplete',
+    'EC2ThrottledException',
+])
+RETRY_MODES = ('legacy', 'adaptive')
+JITTER_TYPES = ('full', 'decorrelated')
+# The longest an adaptive retry will sleep between attempts.
+MAX_BACKOFF = 20
+
 
 def delay_exponential(base, growth_factor, attempts):
     """Calculate time to sleep based on exponential function.
@@ -71,6 +88,63 @@ def create_exponential_delay_function(base, growth_factor):
         delay_exponential, base=base, growth_factor=growth_factor)
 
 
+def delay_full_jitter(base, growth_factor, max_delay, attempts):
+    """Calculate a random time to sleep with "full jitter".
+
+    The format is::
+
+        random(0, min(max_delay, base * growth_factor ^ (attempts - 1)))
+
+    Spreading the delay over the whole range keeps clients that were
+    throttled at the same moment from retrying at the same moment.
+
+    """
+    ceiling = min(max_delay, base * (growth_factor ** (attempts - 1)))
+    return random.uniform(0, ceiling)
+
+
+def delay_decorrelated_jitter(base, growth_factor, max_delay, attempts):
+    """Calculate a random time to sleep with "decorrelated jitter".
+
+    Decorrelated jitter draws each delay from ``random(base, previous * 3)``.
+    Retry actions only see the attempt number, so the previous delay is
+    taken to be the upper bound of the previous attempt's range::
+
+        random(base, min(max_delay, base * 3 ^ (attempts - 1)))
+
+    ``growth_factor`` is accepted for symmetry with the other delay
+    functions; the range always grows by a factor of three.
+
+    """
+    ceiling = min(max_delay, base * (3 ** (attempts - 1)))
+    return random.uniform(min(base, ceiling), ceiling)
+
+
+def create_jittered_delay_function(jitter, base, growth_factor,
+                                   max_delay=MAX_BACKOFF):
+    """Create a jittered delay function based on the attempts."""
+    if jitter == 'full':
+        delay_function = delay_full_jitter
+    elif jitter == 'decorrelated':
+        delay_function = delay_decorrelated_jitter
+    else:
+        raise InvalidRetryModeError(name='retry_jitter', value=jitter,
+                                    valid_values=', '.join(JITTER_TYPES))
+    return functools.partial(delay_function, base=base,
+                             growth_factor=growth_factor,
+                             max_delay=max_delay)
+
+
+def is_throttling_error(response=None, caught_exception=None):
+    """Determine whether a response is the service asking us to slow down."""
+    if response is None:
+        return False
+    if response[0].status_code == 429:
+        return True
+    error_code = response[1].get('Error', {}).get('Code')
+    return error_code in THROTTLING_ERROR_CODES
+
+
 def create_retry_handler(config, operation_name=None):
     checker = create_checker_from_retry_config(
         config, operation_name=operation_name)
@@ -79,6 +153,33 @@ def create_retry_handler(config, operation_name=None):
     return RetryHandler(checker=checker, action=action)
 
 
+def create_adaptive_retry_handler(config, operation_name=None, jitter='full',
+                                  retry_quota=None, rate_limiter=None):
+    """Create a retry handler for the "adaptive" retry mode.
+
+    Whether to retry is still decided by the checkers from the retry
+    config, but the delay is jittered, every retry draws on a
+    ``RetryQuota``, and throttling responses slow down the rate at which
+    requests are sent through a ``ClientRateLimiter``.
+
+    """
+    checker = create_checker_from_retry_config(
+        config, operation_name=operation_name)
+    delay_config = config['__default__']['delay']
+    base = delay_config['base']
+    if base == 'rand':
+        base = 1
+    action = create_jittered_delay_function(
+        jitter, base=base, growth_factor=delay_config['growth_factor'])
+    if retry_quota is None:
+        retry_quota = RetryQuota()
+    if rate_limiter is None:
+        rate_limiter = ClientRateLimiter()
+    return AdaptiveRetryHandler(checker=checker, action=action,
+                                retry_quota=retry_quota,
+                                rate_limiter=rate_limiter)
+
+
 def create_retry_action_from_config(config, operation_name=None):
     # The spec has the possibility of supporting per policy
     # actions, but right now, we assume this comes from the
@@ -191,6 +292,194 @@ class RetryHandler(object):
         logger.debug("No retry needed.")
 
 
+class AdaptiveRetryHandler(RetryHandler):
+    """Retry handler for the "adaptive" retry mode.
+
+    In addition to the ``checker`` and ``action`` of a ``RetryHandler``,
+    this takes a ``retry_quota`` shared by every request made through the
+    handler, and a ``rate_limiter`` that is told about every response.
+    Once the quota is drained, failed requests are no longer retried until
+    successful responses refill it.
+
+    The rate limiter is only consulted before a request is sent if
+    ``on_request_created`` is registered for the ``request-created`` event.
+
+    """
+
+    def __init__(self, checker, action, retry_quota, rate_limiter):
+        super(AdaptiveRetryHandler, self).__init__(checker, action)
+        self.retry_quota = retry_quota
+        self.rate_limiter = rate_limiter
+
+    @asyncio.coroutine
+    def __call__(self, attempts, response, caught_exception, **kwargs):
+        self.rate_limiter.update(
+            is_throttling_error(response, caught_exception))
+        checker_res = yield from self._checker(
+            attempts, response, caught_exception)
+        if not checker_res:
+            if response is not None and response[0].status_code < 300:
+                self.retry_quota.release(attempts)
+            logger.debug("No retry needed.")
+            return None
+        if not self.retry_quota.acquire(caught_exception):
+            logger.debug("Retry needed, but the retry quota is exhausted.")
+            return None
+        result = self._action(attempts=attempts)
+        logger.debug("Retry needed, action of: %s", result)
+        return result
+
+    @asyncio.coroutine
+    def on_request_created(self, **kwargs):
+        yield from self.rate_limiter.acquire()
+
+
+class RetryQuota(object):
+    """Token bucket that bounds how many retries a client may make.
+
+    Each retry costs ``retry_cost`` tokens (``timeout_retry_cost`` when
+    the failure was a connection error or timeout).  A successful first
+    attempt adds ``no_retry_increment`` tokens back and a request that
+    succeeds after retrying refunds its retry cost, up to ``capacity``.
+
+    When the service is healthy the bucket stays full and retries behave
+    as usual.  During an outage the bucket drains, and retries stop
+    instead of piling extra load on the service.
+
+    """
+
+    def __init__(self, capacity=500, retry_cost=5, timeout_retry_cost=10,
+                 no_retry_increment=1):
+        self.capacity = capacity
+        self.available = capacity
+        self.retry_cost = retry_cost
+        self.timeout_retry_cost = timeout_retry_cost
+        self.no_retry_increment = no_retry_increment
+
+    def acquire(self, caught_exception=None):
+        if isinstance(caught_exception, tuple(
+                EXCEPTION_MAP['GENERAL_CONNECTION_ERROR'])):
+            cost = self.timeout_retry_cost
+        else:
+            cost = self.retry_cost
+        if cost > self.available:
+            return False
+        self.available -= cost
+        return True
+
+    def release(self, attempts):
+        if attempts > 1:
+            amount = self.retry_cost
+        else:
+            amount = self.no_retry_increment
+        self.available = min(self.capacity, self.available + amount)
+
+
+class ClientRateLimiter(object):
+    """AIMD limit on how fast a client sends requests.
+
+    The limiter is disabled until the first throttling response is seen.
+    Each throttling response then cuts the allowed send rate to
+    ``decrease_factor`` times the measured send rate (multiplicative
+    decrease), and while responses succeed it rises by ``increment``
+    requests per second every second (additive increase), up to twice the
+    measured send rate.  ``acquire`` waits until sending another request
+    fits within the allowed rate.
+
+    """
+    # Send rate is measured over buckets of this many seconds and
+    # smoothed across buckets.
+    _MEASUREMENT_INTERVAL = 0.5
+    _SMOOTHING = 0.8
+    # How far above the measured send rate the allowed rate may rise.
+    _MAX_RATE_FACTOR = 2
+
+    def __init__(self, min_rate=0.5, increment=0.5, decrease_factor=0.7):
+        self.min_rate = min_rate
+        self.increment = increment
+        self.decrease_factor = decrease_factor
+        self.enabled = False
+        self.fill_rate = None
+        self.measured_rate = 0.0
+        self._tokens = 0.0
+        self._last_refill = None
+        self._last_increase = None
+        self._bucket_start = time.monotonic()
+        self._bucket_count = 0
+
+    @asyncio.coroutine
+    def acquire(self):
+        self._record_send()
+        if not self.enabled:
+            return
+        self._refill()
+        while self._tokens < 1:
+            yield from asyncio.sleep((1 - self._tokens) / self.fill_rate)
+            self._refill()
+        self._tokens -= 1
+
+    def update(self, throttled):
+        if throttled:
+            if self.enabled:
+                rate = min(self._send_rate(), self.fill_rate)
+            else:
+                rate = self._send_rate()
+                self.enabled = True
+                self._last_refill = time.monotonic()
+            self._set_fill_rate(max(self.min_rate,
+                                    rate * self.decrease_factor))
+            self._last_increase = time.monotonic()
+            logger.debug("Throttled, reducing send rate to %s requests "
+                         "per second.", self.fill_rate)
+        elif self.enabled:
+            self._refill()
+            # The increase is per second, not per response, or the rate
+            # would grow with itself.  It stops at a multiple of the rate
+            # actually sent, so an idle client doesn't build up a rate it
+            # never used.
+            now = time.monotonic()
+            rate = self.fill_rate + \
+                self.increment * (now - self._last_increase)
+            self._last_increase = now
+            max_rate = max(self.min_rate,
+                           self._send_rate() * self._MAX_RATE_FACTOR)
+            self._set_fill_rate(max(self.fill_rate, min(rate, max_rate)))
+
+    def _set_fill_rate(self, rate):
+        self.fill_rate = rate
+        self._tokens = min(self._tokens, self._max_tokens())
+
+    def _max_tokens(self):
+        return max(self.fill_rate, 1)
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(self._max_tokens(),
+                           self._tokens + elapsed * self.fill_rate)
+        self._last_refill = now
+
+    def _send_rate(self):
+        if self.measured_rate:
+            return self.measured_rate
+        # Throttled before a full measurement interval has passed, so
+        # estimate from the requests sent so far.
+        elapsed = time.monotonic() - self._bucket_start
+        return self._bucket_count / max(elapsed, self._MEASUREMENT_INTERVAL)
+
+    def _record_send(self):
+        now = time.monotonic()
+        elapsed = now - self._bucket_start
+        if elapsed >= self._MEASUREMENT_INTERVAL:
+            current_rate = self._bucket_count / elapsed
+            self.measured_rate = (
+                current_rate * self._SMOOTHING +
+                self.measured_rate * (1 - self._SMOOTHING))
+            self._bucket_start = now
+            self._bucket_count = 0
+        self._bucket_count += 1
+
+
 class BaseChecker(object):
     """Base class for retry checkers.
 
@@ -340,8 +629,12 @@ class CRC32Checker(BaseChecker):
             logger.debug("crc32 check skipped, the %s header is not "
                          "in the http response.", self._header_name)
         else:
-            content = yield from response[0].content
-            actual_crc32 = crc32(content) & 0xffffffff
+            # Incrementally parsed responses don't keep their body, the
+            # checksum was computed while it was read.
+            actual_crc32 = http_response.body_crc32
+            if actual_crc32 is None:
+                content = yield from response[0].content
+                actual_crc32 = crc32(content) & 0xffffffff
             if not actual_crc32 == int(expected_crc):
                 logger.debug(
                     "retry needed: crc32 check failed, expected != actual: "
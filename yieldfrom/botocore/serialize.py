@@ -56,12 +56,14 @@ ISO8601 = '%Y-%m-%dT%H:%M:%SZ'
 ISO8601_MICRO = '%Y-%m-%dT%H:%M:%S.%fZ'
 
 
-def create_serializer(protocol_name, include_validation=True):
+def create_serializer(protocol_name, include_validation=True,
+                      validation_level=validate.FULL_VALIDATION):
     # TODO: Unknown protocols.
     serializer = SERIALIZERS[protocol_name]()
-    if include_validation:
-        validator = validate.ParamValidator()
-    return validate.ParamValidationDecorator(validator, serializer)
+    if include_validation and validation_level != validate.NO_VALIDATION:
+        validator = validate.ParamValidator(level=validation_level)
+        serializer = validate.ParamValidationDecorator(validator, serializer)
+    return serializer
 
 
 class Serializer(object):
@@ -158,6 +160,40 @@ class Serializer(object):
         return base64.b64encode(value).strip().decode(
             self.DEFAULT_ENCODING)
 
+    # Compiled serializers.  Every shape is compiled, once per serializer
+    # class, into a function(serializer, serialized, value, name) that
+    # serializes ``value`` into ``serialized`` (a dict, or an XML node)
+    # under ``name`` (a prefix, key or tag).  Handlers, member names and
+    # flattening are all resolved up front.
+
+    def _compiled(self, shape, kind, compile_plan):
+        # Plans are kept on the shape, and an operation's input shape is
+        # cached on its OperationModel.
+        key = (self.__class__, kind)
+        plan = shape.compiled.get(key)
+        if plan is None:
+            plan = shape.compiled[key] = compile_plan(shape)
+        return plan
+
+    def _compiled_serializer(self, shape):
+        return self._compiled(shape, 'serializer',
+                              lambda shape: self._compile_shape(shape, {}))
+
+    def _compile_shape(self, shape, compiled):
+        return shape.compile(compiled, self._get_compiler)
+
+    def _get_compiler(self, shape):
+        return getattr(self, '_compile_%s' % shape.type_name,
+                       self._compile_default)
+
+    def _compile_default(self, shape, compiled):
+        raise NotImplementedError('_compile_default')
+
+    def _overrides(self, cls, name):
+        # Whether this serializer's class replaces the ``name`` method of
+        # ``cls``, which the compiled form defined by ``cls`` would bypass.
+        return getattr(self.__class__, name) is not getattr(cls, name)
+
 
 class QuerySerializer(Serializer):
 
@@ -186,9 +222,86 @@ class QuerySerializer(Serializer):
         #        input.
         # prefix: The incrementally built up prefix for the serialized
         #         key (i.e Foo.bar.members.1).
-        method = getattr(self, '_serialize_type_%s' % shape.type_name,
-                         self._default_serialize)
-        method(serialized, value, shape, prefix=prefix)
+        self._compiled_serializer(shape)(self, serialized, value, prefix)
+
+    def _compile_default(self, shape, compiled):
+        method = getattr(self.__class__,
+                         '_serialize_type_%s' % shape.type_name, None)
+        if method is None:
+            if not self._overrides(QuerySerializer, '_default_serialize'):
+                return _assign_value
+            method = self.__class__._default_serialize
+        return lambda serializer, serialized, value, prefix: method(
+            serializer, serialized, value, shape, prefix=prefix)
+
+    def _compile_structure(self, shape, compiled):
+        if self._overrides(QuerySerializer, '_serialize_type_structure'):
+            return self._compile_default(shape, compiled)
+        members = {}
+        for key, member_shape in shape.members.items():
+            members[key] = (self._get_serialized_name(member_shape, key),
+                            self._compile_shape(member_shape, compiled))
+
+        def serialize_structure(serializer, serialized, value, prefix):
+            for key, value in value.items():
+                member_prefix, serialize_member = members[key]
+                if prefix:
+                    member_prefix = '%s.%s' % (prefix, member_prefix)
+                serialize_member(serializer, serialized, value,
+                                 member_prefix)
+        return serialize_structure
+
+    def _compile_list(self, shape, compiled):
+        if self._overrides(QuerySerializer, '_serialize_type_list'):
+            return self._compile_default(shape, compiled)
+        flattened = self._is_shape_flattened(shape)
+        name = None
+        if flattened and shape.member.serialization.get('name'):
+            name = self._get_serialized_name(shape.member, default_name='')
+        serialize_member = self._compile_shape(shape.member, compiled)
+
+        def serialize_list(serializer, serialized, value, prefix):
+            if not value:
+                # The query protocol serializes empty lists.
+                serialized[prefix] = ''
+                return
+            if not flattened:
+                list_prefix = '%s.member' % prefix
+            elif name is not None:
+                # Replace '.Original' with '.{name}'.
+                list_prefix = '.'.join(prefix.split('.')[:-1] + [name])
+            else:
+                list_prefix = prefix
+            for i, element in enumerate(value, 1):
+                serialize_member(serializer, serialized, element,
+                                 '%s.%s' % (list_prefix, i))
+        return serialize_list
+
+    def _compile_map(self, shape, compiled):
+        if self._overrides(QuerySerializer, '_serialize_type_map'):
+            return self._compile_default(shape, compiled)
+        flattened = self._is_shape_flattened(shape)
+        key_suffix = self._get_serialized_name(shape.key, default_name='key')
+        value_suffix = self._get_serialized_name(shape.value, 'value')
+        serialize_key = self._compile_shape(shape.key, compiled)
+        serialize_value = self._compile_shape(shape.value, compiled)
+
+        def serialize_map(serializer, serialized, value, prefix):
+            if flattened:
+                full_prefix = prefix
+            else:
+                full_prefix = '%s.entry' % prefix
+            for i, key in enumerate(value, 1):
+                serialize_key(serializer, serialized, key,
+                              '%s.%s.%s' % (full_prefix, i, key_suffix))
+                serialize_value(serializer, serialized, value[key],
+                                '%s.%s.%s' % (full_prefix, i, value_suffix))
+        return serialize_map
+
+    def _compile_boolean(self, shape, compiled):
+        if self._overrides(QuerySerializer, '_serialize_type_boolean'):
+            return self._compile_default(shape, compiled)
+        return _assign_boolean
 
     def _serialize_type_structure(self, serialized, value, shape, prefix=''):
         members = shape.members
@@ -281,6 +394,17 @@ class EC2Serializer(QuerySerializer):
             element_shape = shape.member
             self._serialize(serialized, element, element_shape, element_prefix)
 
+    def _compile_list(self, shape, compiled):
+        if self._overrides(EC2Serializer, '_serialize_type_list'):
+            return self._compile_default(shape, compiled)
+        serialize_member = self._compile_shape(shape.member, compiled)
+
+        def serialize_list(serializer, serialized, value, prefix):
+            for i, element in enumerate(value, 1):
+                serialize_member(serializer, serialized, element,
+                                 '%s.%s' % (prefix, i))
+        return serialize_list
+
 
 class JSONSerializer(Serializer):
     TIMESTAMP_FORMAT = 'unixtimestamp'
@@ -304,9 +428,69 @@ class JSONSerializer(Serializer):
         return serialized
 
     def _serialize(self, serialized, value, shape, key=None):
-        method = getattr(self, '_serialize_type_%s' % shape.type_name,
-                         self._default_serialize)
-        method(serialized, value, shape, key)
+        self._compiled_serializer(shape)(self, serialized, value, key)
+
+    def _compile_default(self, shape, compiled):
+        method = getattr(self.__class__,
+                         '_serialize_type_%s' % shape.type_name, None)
+        if method is None:
+            if not self._overrides(JSONSerializer, '_default_serialize'):
+                return _assign_value
+            method = self.__class__._default_serialize
+        return lambda serializer, serialized, value, key: method(
+            serializer, serialized, value, shape, key)
+
+    def _compile_structure(self, shape, compiled):
+        if self._overrides(JSONSerializer, '_serialize_type_structure'):
+            return self._compile_default(shape, compiled)
+        members = dict(
+            (key, self._compile_shape(member_shape, compiled))
+            for key, member_shape in shape.members.items())
+
+        def serialize_structure(serializer, serialized, value, key):
+            if key is not None:
+                # See _serialize_type_structure().
+                new_serialized = serializer.MAP_TYPE()
+                serialized[key] = new_serialized
+                serialized = new_serialized
+            for member_key, member_value in value.items():
+                members[member_key](serializer, serialized, member_value,
+                                    member_key)
+        return serialize_structure
+
+    def _compile_map(self, shape, compiled):
+        if self._overrides(JSONSerializer, '_serialize_type_map'):
+            return self._compile_default(shape, compiled)
+        serialize_value = self._compile_shape(shape.value, compiled)
+
+        def serialize_map(serializer, serialized, value, key):
+            map_obj = serializer.MAP_TYPE()
+            serialized[key] = map_obj
+            if serialize_value is _assign_value:
+                map_obj.update(value.items())
+                return
+            for sub_key, sub_value in value.items():
+                serialize_value(serializer, map_obj, sub_value, sub_key)
+        return serialize_map
+
+    def _compile_list(self, shape, compiled):
+        if self._overrides(JSONSerializer, '_serialize_type_list'):
+            return self._compile_default(shape, compiled)
+        serialize_member = self._compile_shape(shape.member, compiled)
+        if serialize_member is _assign_value:
+            return _assign_list
+
+        def serialize_list(serializer, serialized, value, key):
+            list_obj = []
+            serialized[key] = list_obj
+            # See _serialize_type_list(), the wrapper is only read
+            # right after each item is serialized, so it can be reused.
+            wrapper = {}
+            for list_item in value:
+                serialize_member(serializer, wrapper, list_item,
+                                 '__current__')
+                list_obj.append(wrapper['__current__'])
+        return serialize_list
 
     def _serialize_type_structure(self, serialized, value, shape, key):
         if key is not None:
@@ -390,12 +574,14 @@ class BaseRestSerializer(Serializer):
             'body_kwargs': self.MAP_TYPE(),
             'headers': self.MAP_TYPE(),
         }
+        member_locations = self._compiled(shape, 'locations',
+                                          self._compile_member_locations)
         for param_name, param_value in parameters.items():
             if param_value is None:
                 # Don't serialize any parameter with a None value.
                 continue
             self._partition_parameters(partitioned, param_name, param_value,
-                                       shape_members)
+                                       member_locations)
         serialized['url_path'] = self._render_uri_template(
             operation_model.http['requestUri'],
             partitioned['uri_path_kwargs'])
@@ -454,26 +640,33 @@ class BaseRestSerializer(Serializer):
                 partitioned['body_kwargs'], shape)
 
     def _encode_payload(self, body):
-        if isinstance(body, six.text_type):
+        if isinstance(body, str):
             return body.encode(self.DEFAULT_ENCODING)
         return body
 
+    def _compile_member_locations(self, shape):
+        # Maps the name of each member of the input shape to its
+        # (location, wire name, member shape).
+        member_locations = {}
+        for param_name, member in shape.members.items():
+            member_locations[param_name] = (
+                member.serialization.get('location'),
+                member.serialization.get('name', param_name), member)
+        return member_locations
+
     def _partition_parameters(self, partitioned, param_name,
-                              param_value, shape_members):
+                              param_value, member_locations):
         # This takes the user provided input parameter (``param``)
         # and figures out where they go in the request dict.
         # Some params are HTTP headers, some are used in the URI, some
         # are in the request body.  This method deals with this.
-        member = shape_members[param_name]
-        location = member.serialization.get('location')
-        key_name = member.serialization.get('name', param_name)
+        location, key_name, member = member_locations[param_name]
         if location == 'uri':
             partitioned['uri_path_kwargs'][key_name] = param_value
         elif location == 'querystring':
             partitioned['query_string_kwargs'][key_name] = param_value
         elif location == 'header':
-            shape = shape_members[param_name]
-            value = self._convert_header_value(shape, param_value)
+            value = self._convert_header_value(member, param_value)
             partitioned['headers'][key_name] = value
         elif location == 'headers':
             # 'headers' is a bit of an oddball.  The ``key_name``
@@ -525,9 +718,91 @@ class RestXMLSerializer(BaseRestSerializer):
         return ElementTree.tostring(real_root, encoding=self.DEFAULT_ENCODING)
 
     def _serialize(self, shape, params, xmlnode, name):
-        method = getattr(self, '_serialize_type_%s' % shape.type_name,
-                         self._default_serialize)
-        method(xmlnode, params, shape, name)
+        self._compiled_serializer(shape)(self, xmlnode, params, name)
+
+    def _compile_default(self, shape, compiled):
+        method = getattr(self.__class__,
+                         '_serialize_type_%s' % shape.type_name,
+                         self.__class__._default_serialize)
+        if method is RestXMLSerializer._default_serialize:
+            return _xml_text_node
+        return lambda serializer, xmlnode, params, name: method(
+            serializer, xmlnode, params, shape, name)
+
+    def _compile_structure(self, shape, compiled):
+        if self._overrides(RestXMLSerializer, '_serialize_type_structure'):
+            return self._compile_default(shape, compiled)
+        namespace = None
+        if 'xmlNamespace' in shape.serialization:
+            namespace_metadata = shape.serialization['xmlNamespace']
+            attribute_name = 'xmlns'
+            if namespace_metadata.get('prefix'):
+                attribute_name += ':%s' % namespace_metadata['prefix']
+            namespace = (attribute_name, namespace_metadata['uri'])
+        members = {}
+        for key, member_shape in shape.members.items():
+            serialization = member_shape.serialization
+            members[key] = (
+                serialization.get('name', key),
+                serialization if serialization.get('xmlAttribute') else None,
+                self._compile_shape(member_shape, compiled))
+
+        def serialize_structure(serializer, xmlnode, params, name):
+            structure_node = ElementTree.SubElement(xmlnode, name)
+            if namespace is not None:
+                structure_node.attrib[namespace[0]] = namespace[1]
+            for key, value in params.items():
+                member_name, attribute, serialize_member = members[key]
+                if value is None:
+                    # Don't serialize any param whose value is None.
+                    return
+                if attribute is not None:
+                    # xmlAttributes must have a serialization name.
+                    structure_node.attrib[attribute['name']] = value
+                    continue
+                serialize_member(serializer, structure_node, value,
+                                 member_name)
+        return serialize_structure
+
+    def _compile_list(self, shape, compiled):
+        if self._overrides(RestXMLSerializer, '_serialize_type_list'):
+            return self._compile_default(shape, compiled)
+        flattened = shape.serialization.get('flattened')
+        element_name = shape.member.serialization.get('name', 'member')
+        serialize_member = self._compile_shape(shape.member, compiled)
+
+        def serialize_list(serializer, xmlnode, params, name):
+            if flattened:
+                list_node = xmlnode
+                item_name = name
+            else:
+                list_node = ElementTree.SubElement(xmlnode, name)
+                item_name = element_name
+            for item in params:
+                serialize_member(serializer, list_node, item, item_name)
+        return serialize_list
+
+    def _compile_map(self, shape, compiled):
+        if self._overrides(RestXMLSerializer, '_serialize_type_map'):
+            return self._compile_default(shape, compiled)
+        key_name = self._get_serialized_name(shape.key, default_name='key')
+        val_name = self._get_serialized_name(shape.value,
+                                             default_name='value')
+        serialize_key = self._compile_shape(shape.key, compiled)
+        serialize_value = self._compile_shape(shape.value, compiled)
+
+        def serialize_map(serializer, xmlnode, params, name):
+            node = ElementTree.SubElement(xmlnode, name)
+            for key, value in params.items():
+                entry_node = ElementTree.SubElement(node, 'entry')
+                serialize_key(serializer, entry_node, key, key_name)
+                serialize_value(serializer, entry_node, value, val_name)
+        return serialize_map
+
+    def _compile_boolean(self, shape, compiled):
+        if self._overrides(RestXMLSerializer, '_serialize_type_boolean'):
+            return self._compile_default(shape, compiled)
+        return _xml_boolean_node
 
     def _serialize_type_structure(self, xmlnode, params, shape, name):
         structure_node = ElementTree.SubElement(xmlnode, name)
@@ -609,6 +884,33 @@ class RestXMLSerializer(BaseRestSerializer):
         node.text = str(params)
 
 
+def _assign_value(serializer, serialized, value, name):
+    serialized[name] = value
+
+
+def _assign_list(serializer, serialized, value, name):
+    serialized[name] = list(value)
+
+
+def _assign_boolean(serializer, serialized, value, name):
+    if value:
+        serialized[name] = 'true'
+    else:
+        serialized[name] = 'false'
+
+
+def _xml_text_node(serializer, xmlnode, params, name):
+    ElementTree.SubElement(xmlnode, name).text = str(params)
+
+
+def _xml_boolean_node(serializer, xmlnode, params, name):
+    node = ElementTree.SubElement(xmlnode, name)
+    if params:
+        node.text = 'true'
+    else:
+        node.text = 'false'
+
+
 SERIALIZERS = {
     'ec2': EC2Serializer,
     'query': QuerySerializer,
@@ -154,6 +154,7 @@ class Session(object):
         self._register_endpoint_resolver()
         self._register_event_emitter()
         self._register_response_parser_factory()
+        self._register_client_class_cache()
 
     def _register_event_emitter(self):
         self._components.register_component('event_emitter', self._events)
@@ -177,6 +178,11 @@ class Session(object):
         self._components.register_component('response_parser_factory',
                                             ResponseParserFactory())
 
+    def _register_client_class_cache(self):
+        # Client classes aren't cached unless a ClientClassCache is
+        # registered in place of this.
+        self._components.register_component('client_class_cache', None)
+
     def _reset_components(self):
         self._register_components()
 
@@ -631,6 +637,7 @@ class Session(object):
         """
         self._events.register(event_name, handler, unique_id,
                               unique_id_uses_count=unique_id_uses_count)
+        self._invalidate_client_classes(event_name)
 
     def unregister(self, event_name, handler=None, unique_id=None,
                    unique_id_uses_count=False):
@@ -665,6 +672,21 @@ class Session(object):
         self._events.unregister(event_name, handler=handler,
                                 unique_id=unique_id,
                                 unique_id_uses_count=unique_id_uses_count)
+        self._invalidate_client_classes(event_name)
+
+    def _invalidate_client_classes(self, event_name):
+        # Cached client classes were built with the creating-client-class
+        # handlers registered at the time, so they are rebuilt when
+        # those handlers change.
+        if not event_name.startswith('creating-client-class') or \
+                not hasattr(self, '_components'):
+            # The builtin handlers are registered before the components.
+            return
+        cache = self._components.get_component('client_class_cache')
+        if cache is None:
+            return
+        service_name = event_name[len('creating-client-class.'):]
+        cache.invalidate(service_name or None)
 
     def emit(self, event_name, **kwargs):
         return (yield from self._events.emit(event_name, **kwargs))
@@ -771,9 +793,11 @@ class Session(object):
         else:
             credentials = yield from self.get_credentials()
         endpoint_resolver = self.get_component('endpoint_resolver')
+        client_class_cache = self.get_component('client_class_cache')
         client_creator = botoclient.ClientCreator(
             loader, endpoint_resolver, self.user_agent(), event_emitter,
-            retryhandler, translate, response_parser_factory)
+            retryhandler, translate, response_parser_factory,
+            client_class_cache=client_class_cache)
         client = yield from client_creator.create_client(
             service_name, region_name, use_ssl, endpoint_url, verify,
             credentials, scoped_config=self.get_scoped_config(),
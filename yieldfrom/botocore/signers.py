@@ -21,6 +21,7 @@ from .awsrequest import create_request_object, prepare_request_dict
 from .exceptions import UnknownClientMethodError, UnsupportedSignatureVersionError
 from .utils import fix_s3_host
 from .exceptions import UnknownSignatureVersionError
+from .hooks import EventNameCache
 
 
 class RequestSigner(object):
@@ -50,15 +51,22 @@ class RequestSigner(object):
     :param credentials: User credentials with which to sign requests.
     :type event_emitter: :py:class:`~botocore.hooks.BaseEventHooks`
     :param event_emitter: Extension mechanism to fire events.
+    :type payload_hasher: :py:class:`~botocore.utils.PayloadHasher`
+    :param payload_hasher: Hashes large request bodies off the event
+                           loop before they are signed.  By default
+                           bodies are hashed by the signer itself.
     """
     def __init__(self, service_name, region_name, signing_name,
-                 signature_version, credentials, event_emitter):
+                 signature_version, credentials, event_emitter,
+                 payload_hasher=None):
         self._service_name = service_name
+        self._event_names = EventNameCache(service_name)
         self._region_name = region_name
         self._signing_name = signing_name
         self._signature_version = signature_version
         self._credentials = credentials
         self._event_emitter = event_emitter
+        self._payload_hasher = payload_hasher
 
         # Used to cache auth instances since one request signer
         # can be used for many requests in a single client.
@@ -76,6 +84,10 @@ class RequestSigner(object):
     def signing_name(self):
         return self._signing_name
 
+    @property
+    def payload_hasher(self):
+        return self._payload_hasher
+
     @asyncio.coroutine
     def sign(self, operation_name, request):
         """
@@ -92,24 +104,30 @@ class RequestSigner(object):
         # Allow overriding signature version. A response of a blank
         # string means no signing is performed. A response of ``None``
         # means that the default signing method is used.
-        handler, response = yield from self._event_emitter.emit_until_response(
-            'choose-signer.{0}.{1}'.format(self._service_name, operation_name),
-            signing_name=self._signing_name, region_name=self._region_name,
-            signature_version=signature_version)
-        if response is not None:
-            signature_version = response
+        event_name = self._event_names.get('choose-signer', operation_name)
+        if self._event_emitter.has_handlers(event_name):
+            handler, response = (
+                yield from self._event_emitter.emit_until_response(
+                    event_name, signing_name=self._signing_name,
+                    region_name=self._region_name,
+                    signature_version=signature_version))
+            if response is not None:
+                signature_version = response
 
         # Allow mutating request before signing
-        yield from self._event_emitter.emit(
-            'before-sign.{0}.{1}'.format(self._service_name, operation_name),
-            request=request, signing_name=self._signing_name,
-            region_name=self._region_name,
-            signature_version=signature_version, request_signer=self)
+        event_name = self._event_names.get('before-sign', operation_name)
+        if self._event_emitter.has_handlers(event_name):
+            yield from self._event_emitter.emit(
+                event_name, request=request, signing_name=self._signing_name,
+                region_name=self._region_name,
+                signature_version=signature_version, request_signer=self)
 
         # Sign the request if the signature version isn't None or blank
         if signature_version != UNSIGNED:
             signer = self.get_auth(self._signing_name, self._region_name,
                                     signature_version)
+            if self._payload_hasher is not None:
+                yield from signer.hash_payload(request, self._payload_hasher)
             signer.add_auth(request=request)
 
     def get_auth(self, signing_name, region_name, signature_version=None,
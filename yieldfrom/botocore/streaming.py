@@ -0,0 +1,240 @@
+# Copyright 2015 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+"""Request bodies read from asynchronous sources.
+
+An ``AsyncRequestBody`` sends the data of an asynchronous iterator, such
+as an async generator or the ``StreamingBody`` of another GetObject, as
+it is produced.  Signed with SigV4, the body is sent ``aws-chunked``,
+every chunk signed as it is sent, so there is no pass over the data
+before the request.  The data sent is kept for retries, in memory up to
+a threshold and in a temporary file beyond it.
+
+"""
+import asyncio
+import logging
+import tempfile
+
+from .compat import StopAsyncIteration
+from .exceptions import IncompleteReadError, UnseekableStreamError
+
+
+logger = logging.getLogger(__name__)
+
+# The size of the data in every aws-chunked chunk but the last.  S3
+# needs at least 8KB.
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# How much of the data sent is kept in memory for retries before the
+# rest of it goes to a temporary file.
+DEFAULT_SPILL_THRESHOLD = 8 * 1024 * 1024
+# ';chunk-signature=' and the hex signature of every chunk.
+_CHUNK_SIGNATURE_LENGTH = 17 + 64
+
+
+def is_async_source(body):
+    """Whether ``body`` is an asynchronous iterator of bytes."""
+    return hasattr(body, '__aiter__') and not isinstance(
+        body, AsyncRequestBody)
+
+
+class AsyncRequestBody(object):
+    """A request body read from an asynchronous iterator of bytes.
+
+    :param source: An object with ``__aiter__``, such as an async
+        generator, that produces the bytes of the body.  Objects with an
+        ``iter_chunks(size)`` method, like a ``StreamingBody``, are read
+        with it instead.
+    :param content_length: The number of bytes ``source`` produces.  It
+        has to be known before the request is sent.
+    :param spill_threshold: How many bytes of the data sent are kept in
+        memory for retries.  The rest is kept in a temporary file.
+    :param replayable: Whether the data sent is kept at all.  Without it
+        the body can't be sent again, and a retry raises
+        ``UnseekableStreamError``.
+    :param chunk_size: The size of the data in every ``aws-chunked``
+        chunk but the last.
+
+    """
+    def __init__(self, source, content_length,
+                 spill_threshold=DEFAULT_SPILL_THRESHOLD, replayable=True,
+                 chunk_size=DEFAULT_CHUNK_SIZE):
+        self.content_length = content_length
+        self._source = source
+        self._chunk_size = chunk_size
+        self._iterator = None
+        # The last bytes the source produced, and how many of them were
+        # sent.  They are dropped only once all of them are sent, rather
+        # than copied on every read.
+        self._pending = b''
+        self._pending_offset = 0
+        # How many bytes were taken from the source, and the position of
+        # the data being sent.  The position is behind the source on a
+        # retry, and those bytes are sent again from the spool.
+        self._source_read = 0
+        self._position = 0
+        self._spool = None
+        if replayable:
+            self._spool = tempfile.SpooledTemporaryFile(
+                max_size=spill_threshold)
+        # Set by ``sign_chunks``.
+        self._sign_chunk = None
+        self._seed_signature = None
+        self._previous_signature = None
+        # The aws-chunked output not returned by ``read()`` yet.
+        self._output = []
+        self._finished = False
+
+    def __len__(self):
+        # The Content-Length of the request.
+        if self._sign_chunk is None:
+            return self.content_length
+        full_chunks, last_chunk = divmod(self.content_length,
+                                         self._chunk_size)
+        length = full_chunks * _chunk_length(self._chunk_size)
+        if last_chunk:
+            length += _chunk_length(last_chunk)
+        return length + _chunk_length(0)
+
+    def sign_chunks(self, sign_chunk, seed_signature):
+        """Send the body ``aws-chunked``, with a signature for every chunk.
+
+        :param sign_chunk: Called with the signature of the previous chunk
+            and the data of a chunk, returns the chunk's signature.
+        :param seed_signature: The signature of the request, the previous
+            signature of the first chunk.
+
+        """
+        self._sign_chunk = sign_chunk
+        self._seed_signature = seed_signature
+        self._previous_signature = seed_signature
+
+    def seek(self, offset, whence=0):
+        """Rewind the body, to send it again.
+
+        Only rewinding to the start is supported.  There is no ``tell()``,
+        so that the Content-Length is taken from ``len()`` instead of by
+        seeking to the end.
+
+        """
+        if offset != 0 or whence != 0 or \
+                (self._position and self._spool is None):
+            raise UnseekableStreamError(stream_object=self)
+        self._position = 0
+        self._output = []
+        self._finished = False
+        self._previous_signature = self._seed_signature
+        return 0
+
+    def close(self):
+        if self._spool is not None:
+            self._spool.close()
+
+    @asyncio.coroutine
+    def read(self, amt=None):
+        """Read up to ``amt`` bytes of the body, all of it by default."""
+        if amt is None or amt < 0:
+            chunks = []
+            chunk = yield from self.read(self._chunk_size)
+            while chunk:
+                chunks.append(chunk)
+                chunk = yield from self.read(self._chunk_size)
+            return b''.join(chunks)
+        if self._sign_chunk is None:
+            return (yield from self._read_data(amt))
+        while not self._output and not self._finished:
+            data = yield from self._read_exactly(self._chunk_size)
+            self._output = self._encode_chunk(data)
+            self._finished = not data
+        if not self._output:
+            return b''
+        chunk = self._output[0]
+        if len(chunk) > amt:
+            self._output[0] = chunk[amt:]
+            return chunk[:amt]
+        del self._output[0]
+        return chunk
+
+    def _encode_chunk(self, data):
+        signature = self._sign_chunk(self._previous_signature, data)
+        self._previous_signature = signature
+        header = '%x;chunk-signature=%s\r\n' % (len(data), signature)
+        if not data:
+            return [header.encode('ascii') + b'\r\n']
+        return [header.encode('ascii'), data, b'\r\n']
+
+    @asyncio.coroutine
+    def _read_exactly(self, amt):
+        chunks = []
+        remaining = amt
+        while remaining:
+            data = yield from self._read_data(remaining)
+            if not data:
+                break
+            chunks.append(data)
+            remaining -= len(data)
+        if len(chunks) == 1:
+            return chunks[0]
+        return b''.join(chunks)
+
+    @asyncio.coroutine
+    def _read_data(self, amt):
+        if self._position < self._source_read:
+            # Sent before, so it is sent again from the spool.
+            self._spool.seek(self._position)
+            data = self._spool.read(min(amt, self._source_read -
+                                        self._position))
+            self._position += len(data)
+            return data
+        if self._pending_offset == len(self._pending):
+            self._pending = yield from self._next_from_source()
+            self._pending_offset = 0
+            if not self._pending:
+                if self._source_read != self.content_length:
+                    raise IncompleteReadError(
+                        actual_bytes=self._source_read,
+                        expected_bytes=self.content_length)
+                return b''
+        start = self._pending_offset
+        if start == 0 and amt >= len(self._pending):
+            data = self._pending
+        else:
+            data = self._pending[start:start + amt]
+        self._pending_offset += len(data)
+        self._source_read += len(data)
+        self._position += len(data)
+        if self._source_read > self.content_length:
+            raise IncompleteReadError(actual_bytes=self._source_read,
+                                      expected_bytes=self.content_length)
+        if self._spool is not None:
+            self._spool.seek(0, 2)
+            self._spool.write(data)
+        return data
+
+    @asyncio.coroutine
+    def _next_from_source(self):
+        if self._iterator is None:
+            if hasattr(self._source, 'iter_chunks'):
+                self._iterator = self._source.iter_chunks(self._chunk_size)
+            else:
+                self._iterator = self._source.__aiter__()
+        while True:
+            try:
+                data = yield from self._iterator.__anext__()
+            except StopAsyncIteration:
+                return b''
+            if data:
+                return bytes(data)
+
+
+def _chunk_length(size):
+    # The length of an aws-chunked chunk with ``size`` bytes of data.
+    return (len('%x' % size) + _CHUNK_SIGNATURE_LENGTH + 2 + size + 2)
@@ -15,6 +15,7 @@ import logging
 import datetime
 import hashlib
 import binascii
+import mmap
 import asyncio
 import functools
 
@@ -22,7 +23,7 @@ import dateutil.parser
 from dateutil.tz import tzlocal, tzutc
 
 from .exceptions import InvalidExpressionError, ConfigNotFound
-from .compat import json, quote, zip_longest, urlsplit, urlunsplit
+from .compat import json, quote, urlsplit, urlunsplit
 from yieldfrom import requests
 from .compat import OrderedDict
 
@@ -39,6 +40,11 @@ RESTRICTED_REGIONS = [
     'us-gov-west-1',
     'fips-us-gov-west-1',
 ]
+# Request bodies of at least this many bytes are hashed in a thread pool,
+# see ``PayloadHasher``.
+DEFAULT_HASHING_THRESHOLD = 1024 * 1024
+# The size of the leaves of Glacier tree hashes.
+TREE_HASH_CHUNK_SIZE = 1024 * 1024
 
 
 class _RetriesExceededError(Exception):
@@ -397,40 +403,162 @@ def calculate_tree_hash(body):
     :returns: The hex version of the calculated tree hash
 
     """
-    chunks = []
-    required_chunk_size = 1024 * 1024
-    sha256 = hashlib.sha256
-    for chunk in iter(lambda: body.read(required_chunk_size), b''):
-        chunks.append(sha256(chunk).digest())
-    if not chunks:
-        return sha256(b'').hexdigest()
-    while len(chunks) > 1:
-        new_chunks = []
-        for first, second in _in_pairs(chunks):
-            if second is not None:
-                new_chunks.append(sha256(first + second).digest())
-            else:
-                # We're at the end of the list and there's no pair left.
-                new_chunks.append(first)
-        chunks = new_chunks
-    return binascii.hexlify(chunks[0]).decode('ascii')
-
-
-def _in_pairs(iterable):
-    # Creates iterator that iterates over the list in pairs:
-    # for a, b in _in_pairs([0, 1, 2, 3, 4]):
-    #     print(a, b)
-    #
-    # will print:
-    # 0, 1
-    # 2, 3
-    # 4, None
-    shared_iter = iter(iterable)
-    # Note that zip_longest is a compat import that uses
-    # the itertools izip_longest.  This creates an iterator,
-    # this call below does _not_ immediately create the list
-    # of pairs.
-    return zip_longest(shared_iter, shared_iter)
+    tree_hash = _TreeHash()
+    for chunk in iter(lambda: body.read(TREE_HASH_CHUNK_SIZE), b''):
+        tree_hash.add_leaf(chunk)
+    return tree_hash.hexdigest()
+
+
+def calculate_glacier_checksums(body):
+    """Calculate the sha256 checksum and the tree hash of a body at once.
+
+    Glacier uploads need both checksums of the same data.  This reads
+    ``body`` once and feeds every chunk to both of them, instead of
+    reading it for ``calculate_sha256`` and again for
+    ``calculate_tree_hash``.
+
+    :param body: A file like object, with the same constraints as the
+        ``body`` param in calculate_sha256, or a bytes like object such
+        as an ``mmap.mmap`` of the file to upload.  The chunks of bytes
+        like objects, and of an ``mmap`` from its current position, are
+        hashed in place without being copied.
+
+    :rtype: tuple
+    :returns: The hex versions of the sha256 checksum and the tree hash.
+
+    """
+    checksum = hashlib.sha256()
+    tree_hash = _TreeHash()
+    if isinstance(body, (bytes, bytearray, memoryview, mmap.mmap)):
+        start = body.tell() if isinstance(body, mmap.mmap) else 0
+        with memoryview(body) as view:
+            for offset in range(start, len(view), TREE_HASH_CHUNK_SIZE):
+                chunk = view[offset:offset + TREE_HASH_CHUNK_SIZE]
+                checksum.update(chunk)
+                tree_hash.add_leaf(chunk)
+                chunk.release()
+        if isinstance(body, mmap.mmap):
+            body.seek(0, 2)
+    else:
+        for chunk in iter(lambda: body.read(TREE_HASH_CHUNK_SIZE), b''):
+            checksum.update(chunk)
+            tree_hash.add_leaf(chunk)
+    return checksum.hexdigest(), tree_hash.hexdigest()
+
+
+def combine_tree_hashes(part_tree_hashes, part_size):
+    """Calculate the tree hash of an archive from the tree hashes of its parts.
+
+    Multipart uploads to Glacier use parts of a power of two number of
+    megabytes, so the tree hash of every part is the root of a subtree of
+    the archive's tree hash, which can be calculated from them without
+    reading the data again.
+
+    :param part_tree_hashes: The hex tree hashes of the parts, in order.
+        Only the last part may be smaller than ``part_size``.
+    :param part_size: The part size of the upload, in bytes.
+
+    :rtype: str
+    :returns: The hex version of the archive's tree hash.
+
+    """
+    leaves, remainder = divmod(part_size, TREE_HASH_CHUNK_SIZE)
+    if remainder or leaves < 1 or leaves & (leaves - 1):
+        raise ValueError("The part size must be a power of two number of "
+                         "megabytes, not %s bytes." % part_size)
+    height = leaves.bit_length() - 1
+    tree_hash = _TreeHash()
+    for part_tree_hash in part_tree_hashes:
+        # A smaller last part's root is carried up to ``height``
+        # unchanged, so it combines like a full one.
+        tree_hash.add_digest(binascii.unhexlify(part_tree_hash), height)
+    return tree_hash.hexdigest()
+
+
+class _TreeHash(object):
+    # Builds a tree hash as its leaves are added.  Adjacent subtrees of
+    # the same height are combined as soon as both exist, like carries in
+    # a binary counter, so at most one digest per tree level is kept
+    # instead of the digest of every leaf.
+    def __init__(self):
+        self._subtrees = []
+
+    def add_leaf(self, data):
+        self.add_digest(hashlib.sha256(data).digest())
+
+    def add_digest(self, digest, height=0):
+        subtrees = self._subtrees
+        while subtrees and subtrees[-1][0] == height:
+            digest = hashlib.sha256(subtrees.pop()[1] + digest).digest()
+            height += 1
+        subtrees.append((height, digest))
+
+    def digest(self):
+        if not self._subtrees:
+            return hashlib.sha256(b'').digest()
+        # The subtrees left over are of decreasing heights.  An odd node
+        # out is carried up unchanged, so they combine right to left.
+        digest = self._subtrees[-1][1]
+        for _, left in reversed(self._subtrees[:-1]):
+            digest = hashlib.sha256(left + digest).digest()
+        return digest
+
+    def hexdigest(self):
+        return binascii.hexlify(self.digest()).decode('ascii')
+
+
+class PayloadHasher(object):
+    """Hashes request bodies off the event loop when they are large.
+
+    Checksums of request bodies are calculated before the request is
+    sent, by reading the whole body.  For a multi gigabyte upload that
+    would block every other coroutine for seconds, so bodies of at
+    least ``threshold`` bytes are hashed in ``executor`` instead, while
+    smaller ones, which hash faster than they could be handed to a
+    thread, are hashed in place by the caller.
+
+    :param threshold: The body size, in bytes, from which bodies are
+        hashed in the executor.
+    :param executor: The ``concurrent.futures`` executor bodies are
+        hashed in.  Defaults to the event loop's default executor.
+    :param loop: The event loop.  Defaults to the current event loop.
+
+    """
+    def __init__(self, threshold=DEFAULT_HASHING_THRESHOLD, executor=None,
+                 loop=None):
+        self.threshold = threshold
+        self._executor = executor
+        self._loop = loop
+
+    def should_offload(self, body):
+        """Whether ``body`` is large enough to be hashed in the executor.
+
+        Bodies of an unknown size are.
+
+        """
+        size = _remaining_size(body)
+        return size is None or size >= self.threshold
+
+    @asyncio.coroutine
+    def run(self, func, *args):
+        """Call ``func(*args)`` in the executor and return its result."""
+        loop = self._loop or asyncio.get_event_loop()
+        return (yield from loop.run_in_executor(self._executor, func, *args))
+
+
+def _remaining_size(body):
+    # The number of bytes left to read from ``body``, or None when that
+    # can't be told without reading it.
+    if isinstance(body, (bytes, bytearray, str)):
+        return len(body)
+    try:
+        position = body.tell()
+        body.seek(0, 2)
+        end = body.tell()
+        body.seek(position)
+    except (AttributeError, OSError, ValueError):
+        return None
+    return end - position
 
 
 class CachedProperty(object):
@@ -20,6 +20,12 @@ from .utils import parse_to_aware_datetime
 from .exceptions import ParamValidationError
 
 
+FULL_VALIDATION = 'full'
+TYPE_VALIDATION = 'type-only'
+NO_VALIDATION = 'off'
+VALIDATION_LEVELS = (FULL_VALIDATION, TYPE_VALIDATION, NO_VALIDATION)
+
+
 def validate_parameters(params, shape):
     """Validates input parameters against a schema.
 
@@ -137,7 +143,22 @@ class ValidationErrors(object):
 
 
 class ParamValidator(object):
-    """Validates parameters against a shape model."""
+    """Validates parameters against a shape model.
+
+    :param level: How thoroughly parameters are validated.  ``'full'``
+        (the default) checks every constraint of the model.
+        ``'type-only'`` checks that parameters are known, required ones
+        are present and every value has a valid type, but skips length
+        and range constraints and doesn't parse timestamp strings.
+        ``'off'`` doesn't validate at all.
+
+    """
+
+    def __init__(self, level=FULL_VALIDATION):
+        if level not in VALIDATION_LEVELS:
+            raise ValueError("Invalid validation level: %s, valid values "
+                             "are: %s" % (level, ', '.join(VALIDATION_LEVELS)))
+        self._level = level
 
     def validate(self, params, shape):
         """Validate parameters against a shape model.
@@ -154,11 +175,172 @@ class ParamValidator(object):
 
         """
         errors = ValidationErrors()
-        self._validate(params, shape, errors, name='')
+        if self._level != NO_VALIDATION:
+            self._validate(params, shape, errors, name='')
         return errors
 
     def _validate(self, params, shape, errors, name):
-        getattr(self, '_validate_%s' % shape.type_name)(params, shape, errors, name)
+        self._compiled_validator(shape)(self, params, errors, name)
+
+    def _compiled_validator(self, shape):
+        # Returns a function(validator, params, errors, name) validating
+        # ``shape``, with the member tables, type checks and range limits
+        # resolved once per validator class and level.  It's kept on the
+        # shape, like the compiled parsers and serializers.
+        key = (self.__class__, self._level)
+        validator = shape.compiled.get(key)
+        if validator is None:
+            validator = shape.compiled[key] = self._compile_shape(shape, {})
+        return validator
+
+    def _compile_shape(self, shape, compiled):
+        return shape.compile(compiled, self._get_compiler)
+
+    def _get_compiler(self, shape):
+        compiler = getattr(self, '_compile_%s' % shape.type_name, None)
+        if compiler is None or self._overrides('_validate_%s'
+                                               % shape.type_name):
+            compiler = self._compile_default
+        return compiler
+
+    def _overrides(self, name):
+        # Whether this validator's class replaces the ``name`` method,
+        # which the compiled form would bypass.
+        return getattr(self.__class__, name) is not getattr(ParamValidator,
+                                                            name)
+
+    def _compile_default(self, shape, compiled):
+        method_name = '_validate_%s' % shape.type_name
+
+        def validate(validator, param, errors, name):
+            getattr(validator, method_name)(param, shape, errors, name)
+        return validate
+
+    def _compile_range_check(self, shape, error_type):
+        # Returns None when the shape has no constraint to check.
+        metadata = shape.metadata
+        if self._level != FULL_VALIDATION or \
+                ('min' not in metadata and 'max' not in metadata):
+            return None
+        min_allowed = metadata.get('min', float('-inf'))
+        max_allowed = metadata.get('max', float('inf'))
+
+        def check_range(name, value, errors):
+            if value < min_allowed or value > max_allowed:
+                errors.report(name, error_type, param=value,
+                              valid_range=[min_allowed, max_allowed])
+        return check_range
+
+    def _compile_structure(self, shape, compiled):
+        # Member validators are compiled on the first valid value, as the
+        # member shapes were only ever resolved for dict values.
+        required = list(shape.metadata.get('required', []))
+        members = valid_names = None
+
+        def validate_structure(validator, params, errors, name):
+            nonlocal members, valid_names
+            if members is None:
+                valid_names = list(shape.members)
+                members = dict(
+                    (member_name, self._compile_shape(member_shape, compiled))
+                    for member_name, member_shape in shape.members.items())
+            for required_member in required:
+                if required_member not in params:
+                    errors.report(name, 'missing required field',
+                                  required_name=required_member,
+                                  user_params=params)
+            known_params = []
+            for param in params:
+                if param not in members:
+                    errors.report(name, 'unknown field', unknown_param=param,
+                                  valid_names=list(valid_names))
+                else:
+                    known_params.append(param)
+            for param in known_params:
+                members[param](validator, params[param], errors,
+                               '%s.%s' % (name, param))
+        return _type_checked((dict,), validate_structure)
+
+    def _compile_string(self, shape, compiled):
+        check_length = self._compile_range_check(shape, 'invalid length')
+        if check_length is None:
+            return _type_checked((str,))
+
+        def validate_string(validator, param, errors, name):
+            check_length(name, len(param), errors)
+        return _type_checked((str,), validate_string)
+
+    def _compile_list(self, shape, compiled):
+        # Likewise the element validator is compiled for the first non
+        # empty value.
+        member = None
+        check_length = self._compile_range_check(shape, 'invalid length')
+
+        def validate_list(validator, param, errors, name):
+            nonlocal member
+            if check_length is not None:
+                check_length(name, len(param), errors)
+            if member is None and param:
+                member = self._compile_shape(shape.member, compiled)
+            for i, item in enumerate(param):
+                member(validator, item, errors, '%s[%s]' % (name, i))
+        return _type_checked((list, tuple), validate_list)
+
+    def _compile_map(self, shape, compiled):
+        key_validator = value_validator = None
+
+        def validate_map(validator, param, errors, name):
+            nonlocal key_validator, value_validator
+            if key_validator is None and param:
+                key_validator = self._compile_shape(shape.key, compiled)
+                value_validator = self._compile_shape(shape.value, compiled)
+            for key, value in param.items():
+                key_validator(validator, key, errors,
+                              "%s (key: %s)" % (name, key))
+                value_validator(validator, value, errors,
+                                '%s.%s' % (name, key))
+        return _type_checked((dict,), validate_map)
+
+    def _compile_number(self, shape, valid_types):
+        check_range = self._compile_range_check(shape, 'invalid range')
+        if check_range is None:
+            return _type_checked(valid_types)
+
+        def validate_number(validator, param, errors, name):
+            check_range(name, param, errors)
+        return _type_checked(valid_types, validate_number)
+
+    def _compile_integer(self, shape, compiled):
+        return self._compile_number(shape, (int,))
+
+    _compile_long = _compile_integer
+
+    def _compile_double(self, shape, compiled):
+        return self._compile_number(shape, (float, decimal.Decimal, int))
+
+    _compile_float = _compile_double
+
+    def _compile_boolean(self, shape, compiled):
+        return _type_checked((bool,))
+
+    def _compile_blob(self, shape, compiled):
+        return _validate_blob
+
+    def _compile_timestamp(self, shape, compiled):
+        if self._level == FULL_VALIDATION:
+            is_valid_type = lambda validator, param: \
+                validator._type_check_datetime(param)
+        else:
+            # Anything parse_to_aware_datetime might accept, unparsed.
+            is_valid_type = lambda validator, param: isinstance(
+                param, (datetime, str, int, float))
+
+        def validate_timestamp(validator, param, errors, name):
+            if not is_valid_type(validator, param):
+                errors.report(name, 'invalid type', param=param,
+                              valid_types=[str(datetime),
+                                           'timestamp-string'])
+        return validate_timestamp
 
     @type_check(valid_types=(dict,))
     def _validate_structure(self, params, shape, errors, name):
@@ -258,6 +440,31 @@ class ParamValidator(object):
             return False
 
 
+def _type_checked(valid_types, validate=None):
+    # The compiled form of the ``type_check`` decorator.
+    valid_type_names = [str(t) for t in valid_types]
+
+    def validate_type(validator, param, errors, name):
+        if not isinstance(param, valid_types):
+            errors.report(name, 'invalid type', param=param,
+                          valid_types=list(valid_type_names))
+        elif validate is not None:
+            validate(validator, param, errors, name)
+    return validate_type
+
+
+def _validate_blob(validator, param, errors, name):
+    if isinstance(param, (bytes, bytearray, str)):
+        return
+    elif hasattr(param, 'read'):
+        # File like objects are also allowed for blob types.
+        return
+    else:
+        errors.report(name, 'invalid type', param=param,
+                      valid_types=[str(bytes), str(bytearray),
+                                   'file-like object'])
+
+
 class ParamValidationDecorator(object):
     def __init__(self, param_validator, serializer):
         self._param_validator = param_validator